@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark del flujo registro de influencer -> consumidor de campanas sobre
+el broker en memoria (sin Pulsar).
+
+Publica eventos InfluencerRegistrado con DespachadorInfluencers y los
+consume con varios consumidores Shared que reciben en lotes, igual que el
+consumidor de campanas. Reporta mensajes por segundo publicados y
+consumidos de punta a punta. Con ``--crear-campanas`` cada lote pasa
+además por el procesamiento real del consumidor (requiere PostgreSQL en
+DATABASE_URL).
+
+Uso:
+    python benchmarks/bench_pipeline_memoria.py --eventos 50000 --consumidores 4
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# El broker en memoria y sin spool en disco, antes de cargar la configuración
+os.environ['BROKER_TIPO'] = 'memoria'
+os.environ.setdefault('SPOOL_HABILITADO', 'false')
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import _pulsar
+
+from alpes_partners.config.settings import settings
+from alpes_partners.modulos.influencers.dominio.eventos import InfluencerRegistrado
+from alpes_partners.modulos.influencers.infraestructura.despachadores import DespachadorInfluencers
+from alpes_partners.modulos.influencers.infraestructura.schema.v1.eventos import EventoInfluencerRegistrado
+from alpes_partners.seedwork.infraestructura.broker import crear_cliente, politica_lote
+from alpes_partners.seedwork.infraestructura.schema.registro import schema_de
+
+CATEGORIAS = ['moda', 'belleza', 'tecnologia', 'deportes', 'gaming', 'viajes']
+
+
+def _evento(i: int) -> InfluencerRegistrado:
+    return InfluencerRegistrado(
+        influencer_id=str(uuid.uuid4()),
+        nombre=f"Influencer {i}",
+        email=f"influencer{i}@bench.local",
+        categorias=[CATEGORIAS[i % len(CATEGORIAS)], CATEGORIAS[(i + 1) % len(CATEGORIAS)]],
+        plataformas=['instagram'],
+        fecha_registro=datetime.utcnow()
+    )
+
+
+def _consumir(consumidor, esperados: int, recibidos: list, lock: threading.Lock, procesar) -> None:
+    while True:
+        with lock:
+            if recibidos[0] >= esperados:
+                return
+        mensajes = consumidor.batch_receive()
+        if not mensajes:
+            continue
+        if procesar:
+            procesar([(str(m.value().id), m.value()) for m in mensajes])
+        for mensaje in mensajes:
+            consumidor.acknowledge(mensaje)
+        with lock:
+            recibidos[0] += len(mensajes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--eventos', type=int, default=20_000)
+    parser.add_argument('--consumidores', type=int, default=4)
+    parser.add_argument('--crear-campanas', action='store_true',
+                        help="Procesa cada lote con el consumidor real de campanas (requiere PostgreSQL)")
+    args = parser.parse_args()
+
+    procesar = None
+    if args.crear_campanas:
+        from alpes_partners.modulos.campanas.infraestructura.consumidores import _procesar_eventos_influencer
+        procesar = _procesar_eventos_influencer
+
+    cliente = crear_cliente()
+    consumidores = [
+        cliente.subscribe(
+            settings.eventos_topico_influencers,
+            subscription_name='bench-campanas',
+            consumer_type=_pulsar.ConsumerType.Shared,
+            schema=schema_de(EventoInfluencerRegistrado),
+            batch_receive_policy=politica_lote(500, 200)
+        )
+        for _ in range(args.consumidores)
+    ]
+    eventos = [_evento(i) for i in range(args.eventos)]
+
+    recibidos, lock = [0], threading.Lock()
+    hilos = [
+        threading.Thread(target=_consumir, args=(consumidor, args.eventos, recibidos, lock, procesar), daemon=True)
+        for consumidor in consumidores
+    ]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+
+    despachador = DespachadorInfluencers()
+    for evento in eventos:
+        despachador.publicar_evento_influencer_registrado(evento, settings.eventos_topico_influencers)
+    publicado = time.perf_counter() - inicio
+
+    for hilo in hilos:
+        hilo.join()
+    total = time.perf_counter() - inicio
+    cliente.close()
+
+    print(f"{'eventos':>10}{'consumidores':>14}{'pub/s':>12}{'punta a punta/s':>18}{'segundos':>10}")
+    print(f"{args.eventos:>10}{args.consumidores:>14}{args.eventos / publicado:>12.0f}"
+          f"{args.eventos / total:>18.0f}{total:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark de publicación: envío síncrono sin lotes vs envío asíncrono con
+batching y compresión.
+
+Publica el mismo número de eventos CampanaCreada en un tópico temporal del
+broker indicado en PULSAR_ADDRESS (por defecto un standalone local) con
+cada configuración, y reporta mensajes por segundo y la latencia hasta el
+ack que registran las métricas del publicador.
+
+Uso:
+    python benchmarks/bench_publicador.py --mensajes 50000
+    python benchmarks/bench_publicador.py --mensajes 2000 --solo sync-sin-lotes
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from alpes_partners.modulos.campanas.infraestructura.schema.v1.eventos import (
+    EventoCampanaCreada, CampanaCreadaPayload
+)
+from alpes_partners.seedwork.infraestructura.publicadores import (
+    ConfiguracionProductor, PublicadorPulsar, obtener_cliente
+)
+from alpes_partners.seedwork.infraestructura.utils import time_millis
+
+
+ESCENARIOS = {
+    'sync-sin-lotes': (False, ConfiguracionProductor(batching=False, compresion='NONE')),
+    'async-lotes': (True, ConfiguracionProductor(compresion='NONE')),
+    'async-lotes-lz4': (True, ConfiguracionProductor(compresion='LZ4')),
+    'async-lotes-zstd': (True, ConfiguracionProductor(compresion='ZSTD')),
+}
+
+
+def _evento(i: int) -> EventoCampanaCreada:
+    return EventoCampanaCreada(
+        time=time_millis(),
+        specversion="1.0",
+        type="CampanaCreada",
+        datacontenttype="application/json",
+        service_name="bench-publicador",
+        data=CampanaCreadaPayload(
+            id_campana=str(uuid.uuid4()),
+            nombre=f"Campana benchmark {i}",
+            descripcion="Campana de prueba para medir el throughput del publicador " * 3,
+            tipo_comision="cpa",
+            valor_comision=12.5,
+            moneda="USD",
+            categorias_objetivo=["moda", "belleza", "lifestyle"],
+            fecha_inicio=time_millis()
+        )
+    )
+
+
+def ejecutar(nombre: str, mensajes: int, topico: str) -> dict:
+    asincrono, configuracion = ESCENARIOS[nombre]
+    publicador = PublicadorPulsar(topico, EventoCampanaCreada, f"bench-{nombre}", configuracion=configuracion)
+    eventos = [_evento(i) for i in range(mensajes)]
+
+    # Calentamiento: conexión y creación del productor fuera de la medición
+    publicador.publicar(_evento(-1))
+
+    inicio = time.perf_counter()
+    if asincrono:
+        for evento in eventos:
+            publicador.publicar_async(evento)
+        publicador.flush()
+    else:
+        for evento in eventos:
+            publicador.publicar(evento)
+    duracion = time.perf_counter() - inicio
+
+    publicador.cerrar()
+    metricas = publicador.metricas.resumen()
+    return {
+        'escenario': nombre,
+        'mensajes': mensajes,
+        'segundos': duracion,
+        'mensajes_por_segundo': mensajes / duracion if duracion else 0.0,
+        'latencia_promedio_ms': metricas['latencia_promedio_ms'],
+        'latencia_max_ms': metricas['latencia_max_ms'],
+        'fallidos': metricas['fallidos'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mensajes', type=int, default=20_000)
+    parser.add_argument('--solo', choices=list(ESCENARIOS), action='append',
+                        help="Escenario a ejecutar (repetible); por defecto todos")
+    args = parser.parse_args()
+
+    print(f"{'escenario':<20}{'mensajes':>10}{'segundos':>10}{'msg/s':>12}{'lat. prom (ms)':>16}"
+          f"{'lat. máx (ms)':>15}{'fallidos':>10}")
+    for nombre in args.solo or ESCENARIOS:
+        topico = f"bench-publicador-{uuid.uuid4().hex[:8]}"
+        r = ejecutar(nombre, args.mensajes, topico)
+        print(f"{r['escenario']:<20}{r['mensajes']:>10}{r['segundos']:>10.2f}{r['mensajes_por_segundo']:>12.0f}"
+              f"{r['latencia_promedio_ms']:>16.2f}{r['latencia_max_ms']:>15.2f}{r['fallidos']:>10}")
+
+    obtener_cliente().close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inserción: llaves primarias uuid4 (aleatorias) vs UUIDv7 (ordenadas por tiempo).
+
+Crea dos tablas temporales con la misma forma que una tabla de agregados,
+inserta el mismo número de filas en cada una y reporta filas por segundo
+y el tamaño final del índice de la llave primaria.
+
+Uso:
+    python benchmarks/bench_uuid_inserts.py --filas 500000 --lote 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sqlalchemy import create_engine, text
+
+from alpes_partners.config.settings import settings
+from alpes_partners.seedwork.dominio.identificadores import uuid7
+
+
+GENERADORES = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+def _crear_tabla(conexion, nombre: str) -> None:
+    conexion.execute(text(f"DROP TABLE IF EXISTS {nombre}"))
+    conexion.execute(text(
+        f"CREATE TABLE {nombre} ("
+        f"  id UUID PRIMARY KEY,"
+        f"  nombre VARCHAR(255) NOT NULL,"
+        f"  fecha_creacion TIMESTAMPTZ NOT NULL DEFAULT now()"
+        f")"
+    ))
+
+
+def ejecutar(motor, clave: str, filas: int, lote: int) -> dict:
+    generador = GENERADORES[clave]
+    tabla = f"bench_pk_{clave}"
+
+    with motor.begin() as conexion:
+        _crear_tabla(conexion, tabla)
+
+    sentencia = text(f"INSERT INTO {tabla} (id, nombre) VALUES (:id, :nombre)")
+    inicio = time.perf_counter()
+    insertadas = 0
+    while insertadas < filas:
+        n = min(lote, filas - insertadas)
+        parametros = [{'id': generador(), 'nombre': f"influencer-{insertadas + i}"} for i in range(n)]
+        with motor.begin() as conexion:
+            conexion.execute(sentencia, parametros)
+        insertadas += n
+    duracion = time.perf_counter() - inicio
+
+    with motor.connect() as conexion:
+        tamano_indice = conexion.execute(
+            text("SELECT pg_relation_size(:indice)"), {'indice': f"{tabla}_pkey"}
+        ).scalar()
+        conexion.execute(text(f"DROP TABLE {tabla}"))
+        conexion.commit()
+
+    return {
+        'clave': clave,
+        'filas': filas,
+        'segundos': duracion,
+        'filas_por_segundo': filas / duracion if duracion else 0.0,
+        'indice_mb': tamano_indice / (1024 * 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=200_000)
+    parser.add_argument('--lote', type=int, default=5_000)
+    parser.add_argument('--database-url', default=settings.database_url)
+    args = parser.parse_args()
+
+    motor = create_engine(args.database_url, insertmanyvalues_page_size=args.lote)
+
+    print(f"{'clave':<8}{'filas':>12}{'segundos':>12}{'filas/s':>14}{'índice PK (MB)':>18}")
+    for clave in GENERADORES:
+        r = ejecutar(motor, clave, args.filas, args.lote)
+        print(f"{r['clave']:<8}{r['filas']:>12}{r['segundos']:>12.2f}"
+              f"{r['filas_por_segundo']:>14.0f}{r['indice_mb']:>18.1f}")
+
+    motor.dispose()
+
+
+if __name__ == "__main__":
+    main()
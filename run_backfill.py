@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Script para completar columnas nuevas en bases de datos existentes.
+
+El schema se crea con create_all, que no altera tablas ya creadas: cada
+tarea agrega lo que falte y rellena los datos a partir de las columnas
+anteriores. Las tareas son idempotentes y se pueden volver a ejecutar.
+
+Uso:
+    python run_backfill.py --listar
+    python run_backfill.py afiliados-campanas
+    python run_backfill.py categorias-campanas
+    python run_backfill.py metricas-campanas
+    python run_backfill.py nombres-influencers
+    python run_backfill.py ranking-campanas
+    python run_backfill.py version-influencers
+"""
+
+import argparse
+import sys
+import os
+import logging
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _existe_columna(conexion, tabla: str, columna: str) -> bool:
+    from sqlalchemy import text
+    return conexion.execute(text(
+        "SELECT 1 FROM information_schema.columns WHERE table_name = :tabla AND column_name = :columna"
+    ), {'tabla': tabla, 'columna': columna}).first() is not None
+
+
+def _agregar_columnas_metricas(conexion) -> None:
+    from sqlalchemy import text
+    for columna, tipo in (('clics_totales', 'BIGINT'), ('conversiones_totales', 'BIGINT'),
+                          ('inversion_total', 'DOUBLE PRECISION'), ('ingresos_generados', 'DOUBLE PRECISION')):
+        conexion.execute(text(f"ALTER TABLE campanas ADD COLUMN IF NOT EXISTS {columna} {tipo} NOT NULL DEFAULT 0"))
+
+
+def backfill_metricas_campanas(conexion) -> int:
+    """Pasa los contadores del documento JSON ``metricas`` a sus columnas numéricas.
+
+    Los valores del JSON se suman a las columnas (que pueden tener deltas
+    aplicados desde el despliegue) y el documento queda en NULL, así una
+    segunda ejecución no vuelve a sumarlos.
+    """
+    from sqlalchemy import text
+
+    _agregar_columnas_metricas(conexion)
+
+    if not _existe_columna(conexion, 'campanas', 'metricas'):
+        return 0
+    # El modelo ya no escribe la columna: las inserciones fallarían con NOT NULL
+    conexion.execute(text("ALTER TABLE campanas ALTER COLUMN metricas DROP NOT NULL"))
+    resultado = conexion.execute(text("""
+        UPDATE campanas SET
+            clics_totales = clics_totales + COALESCE((metricas->>'clics_totales')::numeric, 0)::bigint,
+            conversiones_totales = conversiones_totales + COALESCE((metricas->>'conversiones_totales')::numeric, 0)::bigint,
+            inversion_total = inversion_total + COALESCE((metricas->>'inversion_total')::double precision, 0),
+            ingresos_generados = ingresos_generados + COALESCE((metricas->>'ingresos_generados')::double precision, 0),
+            metricas = NULL
+        WHERE metricas IS NOT NULL
+    """))
+    return resultado.rowcount
+
+
+def backfill_nombres_influencers(conexion, tamano_lote: int = 1000) -> int:
+    """Rellena ``nombre_normalizado`` (y sus índices) en influencers registrados antes de la búsqueda.
+
+    La normalización es la misma del mapeador (``normalizar_texto``), así que
+    se calcula en Python; se recorren en lotes por id solo las filas vacías.
+    """
+    from sqlalchemy import text
+    from alpes_partners.seedwork.infraestructura.utils import normalizar_texto
+
+    conexion.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    conexion.execute(text(
+        "ALTER TABLE influencers ADD COLUMN IF NOT EXISTS nombre_normalizado VARCHAR(255) NOT NULL DEFAULT ''"
+    ))
+    conexion.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_influencers_nombre_normalizado_trgm "
+        "ON influencers USING gin (nombre_normalizado gin_trgm_ops)"
+    ))
+    conexion.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_influencers_nombre_normalizado_prefijo "
+        "ON influencers (nombre_normalizado varchar_pattern_ops)"
+    ))
+
+    total = 0
+    ultimo = None
+    while True:
+        filas = conexion.execute(text(
+            "SELECT id, nombre FROM influencers "
+            "WHERE nombre_normalizado = '' AND (CAST(:ultimo AS uuid) IS NULL OR id > CAST(:ultimo AS uuid)) "
+            "ORDER BY id LIMIT :limite"
+        ), {'ultimo': ultimo, 'limite': tamano_lote}).all()
+        if not filas:
+            return total
+        conexion.execute(
+            text("UPDATE influencers SET nombre_normalizado = :normalizado WHERE id = :id"),
+            [{'id': fila.id, 'normalizado': normalizar_texto(fila.nombre)} for fila in filas]
+        )
+        total += len(filas)
+        ultimo = str(filas[-1].id)
+        logger.info(f"BACKFILL: {total} influencers normalizados")
+
+
+def backfill_afiliados_campanas(conexion) -> int:
+    """Pasa el arreglo JSON ``afiliados_asignados`` a la tabla ``campana_afiliados`` y a ``total_afiliados``.
+
+    El modelo ya no escribe la columna, así que primero se le quita el NOT
+    NULL (solo tenía default en Python). Los ids que no son uuid se
+    descartan y el arreglo queda en NULL, así una segunda ejecución no
+    vuelve a procesarlo.
+    """
+    from sqlalchemy import text
+    from alpes_partners.modulos.campanas.infraestructura.schema.campanas import CampanaAfiliados
+
+    CampanaAfiliados.__table__.create(conexion, checkfirst=True)
+    conexion.execute(text("ALTER TABLE campanas ADD COLUMN IF NOT EXISTS total_afiliados INTEGER NOT NULL DEFAULT 0"))
+
+    if not _existe_columna(conexion, 'campanas', 'afiliados_asignados'):
+        return 0
+    conexion.execute(text("ALTER TABLE campanas ALTER COLUMN afiliados_asignados DROP NOT NULL"))
+    conexion.execute(text("""
+        INSERT INTO campana_afiliados (campana_id, influencer_id)
+        SELECT c.id, a.valor::uuid
+        FROM campanas c
+        CROSS JOIN LATERAL json_array_elements_text(
+            CASE WHEN json_typeof(c.afiliados_asignados::json) = 'array'
+                 THEN c.afiliados_asignados::json ELSE '[]'::json END
+        ) AS a(valor)
+        WHERE a.valor ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+        ON CONFLICT DO NOTHING
+    """))
+    resultado = conexion.execute(text("""
+        UPDATE campanas c SET
+            total_afiliados = (SELECT count(*) FROM campana_afiliados ca WHERE ca.campana_id = c.id),
+            afiliados_asignados = NULL
+        WHERE c.afiliados_asignados IS NOT NULL
+    """))
+    return resultado.rowcount
+
+
+def backfill_categorias_campanas(conexion, tamano_lote: int = 1000) -> int:
+    """Rellena ``categorias`` (y su índice GIN) desde ``criterios_afiliado->categorias_requeridas``.
+
+    La normalización (minúsculas, sin espacios extremos ni duplicados) es la
+    del repositorio, así que se calcula en Python; se recorren en lotes por
+    id solo las filas con la columna vacía.
+    """
+    import json
+    from sqlalchemy import text
+    from alpes_partners.modulos.campanas.infraestructura.repositorios import RepositorioCampanasSQLAlchemy
+
+    conexion.execute(text("ALTER TABLE campanas ADD COLUMN IF NOT EXISTS categorias JSONB NOT NULL DEFAULT '[]'"))
+
+    total = 0
+    ultimo = None
+    while True:
+        filas = conexion.execute(text(
+            "SELECT id, criterios_afiliado::json->'categorias_requeridas' AS requeridas FROM campanas "
+            "WHERE categorias = '[]'::jsonb AND (CAST(:ultimo AS uuid) IS NULL OR id > CAST(:ultimo AS uuid)) "
+            "ORDER BY id LIMIT :limite"
+        ), {'ultimo': ultimo, 'limite': tamano_lote}).all()
+        if not filas:
+            break
+        valores = [
+            {'id': fila.id, 'categorias': json.dumps(RepositorioCampanasSQLAlchemy.normalizar_categorias(fila.requeridas))}
+            for fila in filas if isinstance(fila.requeridas, list) and fila.requeridas
+        ]
+        if valores:
+            conexion.execute(
+                text("UPDATE campanas SET categorias = CAST(:categorias AS jsonb) WHERE id = :id"), valores
+            )
+        total += len(valores)
+        ultimo = str(filas[-1].id)
+        logger.info(f"BACKFILL: {total} campanas con categorías")
+
+    # El índice se crea al final: mantenerlo durante las actualizaciones es más lento
+    conexion.execute(text("CREATE INDEX IF NOT EXISTS idx_campanas_categorias ON campanas USING gin (categorias)"))
+    return total
+
+
+def backfill_ranking_campanas(conexion) -> int:
+    """Agrega las columnas generadas ``roi`` y ``tasa_conversion`` y los índices de ranking.
+
+    Las fórmulas son las de ``schema/campanas.py``. Una columna generada se
+    calcula para todas las filas al agregarla, así que se retorna el número
+    de campanas si se agregó alguna.
+    """
+    from sqlalchemy import text
+
+    # Las columnas generadas dependen de los contadores numéricos
+    _agregar_columnas_metricas(conexion)
+
+    generadas = {
+        'roi': "CASE WHEN inversion_total = 0 THEN 0 "
+               "ELSE (ingresos_generados - inversion_total) / inversion_total * 100 END",
+        'tasa_conversion': "CASE WHEN clics_totales = 0 THEN 0 "
+                           "ELSE conversiones_totales::double precision / clics_totales * 100 END",
+    }
+    agregadas = 0
+    for columna, formula in generadas.items():
+        if not _existe_columna(conexion, 'campanas', columna):
+            conexion.execute(text(
+                f"ALTER TABLE campanas ADD COLUMN {columna} DOUBLE PRECISION GENERATED ALWAYS AS ({formula}) STORED"
+            ))
+            agregadas += 1
+
+    for indice, columna in (('idx_campanas_ranking_roi', 'roi'),
+                            ('idx_campanas_ranking_tasa_conversion', 'tasa_conversion'),
+                            ('idx_campanas_ranking_ingresos', 'ingresos_generados')):
+        conexion.execute(text(f"CREATE INDEX IF NOT EXISTS {indice} ON campanas ({columna} DESC, id)"))
+
+    if not agregadas:
+        return 0
+    return conexion.execute(text("SELECT count(*) FROM campanas")).scalar()
+
+
+def backfill_version_influencers(conexion) -> int:
+    """Convierte ``influencers.version`` de texto a entero (el bloqueo optimista compara enteros).
+
+    Solo altera la columna si ``information_schema`` todavía la reporta con
+    otro tipo; un valor no numérico queda en 1.
+    """
+    from sqlalchemy import text
+
+    tipo = conexion.execute(text(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = 'influencers' AND column_name = 'version'"
+    )).scalar()
+    if tipo is None or tipo == 'integer':
+        return 0
+    conexion.execute(text("""
+        ALTER TABLE influencers ALTER COLUMN version TYPE integer
+        USING CASE WHEN version::text ~ '^[0-9]+$' THEN version::text::integer ELSE 1 END
+    """))
+    return conexion.execute(text("SELECT count(*) FROM influencers")).scalar()
+
+
+TAREAS = {
+    'afiliados-campanas': backfill_afiliados_campanas,
+    'categorias-campanas': backfill_categorias_campanas,
+    'metricas-campanas': backfill_metricas_campanas,
+    'nombres-influencers': backfill_nombres_influencers,
+    'ranking-campanas': backfill_ranking_campanas,
+    'version-influencers': backfill_version_influencers,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('tarea', nargs='?', choices=sorted(TAREAS))
+    parser.add_argument('--listar', action='store_true', help="Lista las tareas disponibles")
+    args = parser.parse_args()
+
+    if args.listar or not args.tarea:
+        print('\n'.join(sorted(TAREAS)))
+        return
+
+    from alpes_partners.seedwork.infraestructura.database import engine
+
+    # Una transacción por tarea: si algo falla no queda a medias
+    with engine.begin() as conexion:
+        filas = TAREAS[args.tarea](conexion)
+    logger.info(f"BACKFILL: {args.tarea} completada - {filas} filas actualizadas")
+
+
+if __name__ == "__main__":
+    main()
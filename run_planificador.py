@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Script para ejecutar el planificador del ciclo de vida de campanas.
+"""
+
+import sys
+import os
+import logging
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Activa y finaliza campanas por fecha en ciclos periódicos."""
+    from alpes_partners.modulos.campanas.infraestructura.planificador import crear_planificador
+
+    try:
+        crear_planificador().ejecutar()
+    except KeyboardInterrupt:
+        logger.info("PLANIFICADOR: Deteniendo...")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,12 +19,14 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Import con manejo robusto para Docker
-suscribirse_a_eventos_influencers_desde_campanas = None
+registrar_consumidores_campanas = None
 
 try:
     logger.info("PULSAR: Intentando importar módulo de campanas...")
     logger.info("PULSAR: Paso 1 - Importando consumidores...")
-    from alpes_partners.modulos.campanas.infraestructura.consumidores import suscribirse_a_eventos_influencers_desde_campanas
+    from alpes_partners.modulos.campanas.infraestructura.consumidores import (
+        registrar_consumidores as registrar_consumidores_campanas
+    )
     logger.info("PULSAR: Módulo de campanas importado exitosamente")
 except ImportError as e:
     logger.error(f"PULSAR: Error detallado importando campanas: {e}")
@@ -36,19 +38,27 @@ except ImportError as e:
 
 
 def main():
-    """Ejecuta el consumidor de campañas para escuchar eventos de influencers."""
+    """Ejecuta en un mismo runtime los consumidores registrados por los módulos."""
     logger.info("PULSAR: Iniciando consumidor de Apache Pulsar...")
     
     try:
-        if suscribirse_a_eventos_influencers_desde_campanas is None:
+        if registrar_consumidores_campanas is None:
             logger.error("PULSAR: No se pudo cargar el consumidor de campañas")
             sys.exit(1)
         
-        logger.info("PULSAR: Iniciando consumidor de campañas...")
-        logger.info("PULSAR: Escuchando eventos de influencers para procesamiento en campañas...")
+        from alpes_partners.seedwork.infraestructura.consumidores import RuntimeConsumidores
+        from alpes_partners.seedwork.infraestructura.database import init_db_flask_tables
         
-        # Ejecutar directamente el consumidor de campañas
-        suscribirse_a_eventos_influencers_desde_campanas()
+        # El worker no levanta la app de Flask y puede arrancar antes que la API:
+        # crea las tablas que falten (registrar consumidores ya lee mensajes_procesados)
+        init_db_flask_tables()
+        
+        runtime = RuntimeConsumidores()
+        registrar_consumidores_campanas(runtime)
+        logger.info(f"PULSAR: Suscripciones registradas: {', '.join(s.nombre for s in runtime.suscripciones)}")
+        
+        # Bloquea hasta SIGINT/SIGTERM y luego drena los lotes en curso
+        runtime.ejecutar()
         
     except KeyboardInterrupt:
         logger.info("PULSAR: Deteniendo consumidor...")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir modelos de lectura reproduciendo tópicos de eventos.
+
+Uso:
+    python run_replay.py --listar
+    python run_replay.py sugerencias                       # desde el inicio o el último checkpoint
+    python run_replay.py sugerencias --desde 2026-01-01    # desde una fecha (o timestamp en ms)
+    python run_replay.py sugerencias --reiniciar           # descarta el checkpoint
+"""
+
+import argparse
+import sys
+import os
+import logging
+from datetime import datetime, timezone
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+# Módulos que registran proyecciones al importarse
+MODULOS_PROYECCIONES = (
+    'alpes_partners.modulos.sugerencias.infraestructura.proyecciones',
+)
+
+
+def _timestamp(valor: str) -> int:
+    """Timestamp en ms, o fecha ISO (UTC si no trae zona)."""
+    if valor.isdigit():
+        return int(valor)
+    fecha = datetime.fromisoformat(valor)
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return int(fecha.timestamp() * 1000)
+
+
+def main():
+    import importlib
+    from alpes_partners.config.settings import settings
+    from alpes_partners.seedwork.infraestructura.replay import CheckpointsReplay, Reproductor, registro_proyecciones
+
+    for modulo in MODULOS_PROYECCIONES:
+        importlib.import_module(modulo)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('proyeccion', nargs='?', choices=registro_proyecciones.nombres())
+    parser.add_argument('--listar', action='store_true', help="Lista las proyecciones registradas")
+    parser.add_argument('--desde', type=_timestamp, help="Fecha ISO o timestamp (ms) de inicio sin checkpoint")
+    parser.add_argument('--reiniciar', action='store_true', help="Descarta el checkpoint y reproduce desde --desde")
+    parser.add_argument('--tamano-lote', type=int, default=settings.replay_tamano_lote)
+    parser.add_argument('--intervalo-checkpoint', type=int, default=settings.replay_intervalo_checkpoint)
+    args = parser.parse_args()
+
+    if args.listar or not args.proyeccion:
+        print('\n'.join(registro_proyecciones.nombres()))
+        return
+
+    from alpes_partners.seedwork.infraestructura.broker import crear_cliente
+
+    cliente = crear_cliente()
+    try:
+        reproductor = Reproductor(
+            cliente, CheckpointsReplay(settings.replay_directorio_checkpoints),
+            tamano_lote=args.tamano_lote, intervalo_checkpoint=args.intervalo_checkpoint
+        )
+        reproductor.reproducir(
+            registro_proyecciones.crear(args.proyeccion), desde=args.desde, reiniciar=args.reiniciar
+        )
+    except KeyboardInterrupt:
+        logger.info("REPLAY: Interrumpido; se retoma desde el último checkpoint")
+    finally:
+        cliente.close()
+
+
+if __name__ == "__main__":
+    main()
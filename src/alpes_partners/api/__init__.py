@@ -34,7 +34,40 @@ def comenzar_consumidor():
     # # Suscripción a comandos (solo para desarrollo/testing)  
     # threading.Thread(target=influencers.suscribirse_a_comandos_influencers, daemon=True).start()
     
-    pass  # Los consumidores se ejecutan en el servicio pulsar-consumer
+    # El índice de sugerencias vive en el proceso de la API: se construye aquí
+    # y se mantiene al día leyendo los tópicos de eventos
+    import logging
+    from ..config.settings import settings
+    if settings.sugerencias_habilitadas:
+        from alpes_partners.modulos.sugerencias.infraestructura.proyecciones import construir_indice
+        try:
+            desde = construir_indice()
+            from alpes_partners.modulos.sugerencias.infraestructura.consumidores import suscribirse_a_eventos_sugerencias
+            suscribirse_a_eventos_sugerencias(desde)
+        except Exception as e:
+            logging.getLogger(__name__).error(f"SUGERENCIAS: No se pudo iniciar el índice de sugerencias: {e}")
+    
+    # Las escrituras de campanas ocurren en otros procesos: la cache de lecturas se invalida por eventos
+    from alpes_partners.modulos.campanas.infraestructura.cache import iniciar_invalidacion_cache
+    try:
+        iniciar_invalidacion_cache()
+    except Exception as e:
+        logging.getLogger(__name__).error(f"CAMPANAS: No se pudo iniciar la invalidación de cache: {e}")
+    
+    # Igual con las facetas de influencers: los registros llegan por eventos
+    from alpes_partners.modulos.influencers.infraestructura.cache import iniciar_invalidacion_facetas
+    try:
+        iniciar_invalidacion_facetas()
+    except Exception as e:
+        logging.getLogger(__name__).error(f"INFLUENCERS: No se pudo iniciar la invalidación de facetas: {e}")
+    
+    # Igual que las sugerencias, el motor de emparejamiento vive en el proceso de la API
+    if settings.emparejamiento_habilitado:
+        from alpes_partners.modulos.campanas.infraestructura.proyecciones import iniciar_motor
+        try:
+            iniciar_motor()
+        except Exception as e:
+            logging.getLogger(__name__).error(f"EMPAREJAMIENTO: No se pudo iniciar el motor de emparejamiento: {e}")
 
 def create_app(configuracion={}):
     # Init la aplicacion de Flask
@@ -64,9 +97,13 @@ def create_app(configuracion={}):
 
     # Importa Blueprints
     from . import influencers
+    from . import sugerencias
+    from . import campanas
 
     # Registro de Blueprints
     app.register_blueprint(influencers.bp)
+    app.register_blueprint(sugerencias.bp)
+    app.register_blueprint(campanas.bp)
 
     @app.route("/spec")
     def spec():
@@ -0,0 +1,243 @@
+import alpes_partners.seedwork.presentacion.api as api
+import json
+import logging
+import uuid
+
+from flask import request, Response
+from ..modulos.campanas.aplicacion.servicios import (
+    ServicioEmparejamiento, ServicioTracking, ServicioAfiliadosCampana, ServicioConsultaCampanas
+)
+from ..modulos.campanas.aplicacion.comandos.asignar_afiliados import (
+    AsignarAfiliadosCampana, RetirarAfiliadosCampana
+)
+from ..modulos.campanas.dominio.excepciones import CampanaNoEncontradaExcepcion, ParametrosCampanaInvalidosExcepcion
+from ..modulos.campanas.infraestructura.repositorios import RepositorioCampanasSQLAlchemy
+from ..modulos.campanas.infraestructura.proyecciones import motor_emparejamiento
+from ..modulos.campanas.infraestructura.metricas import iniciar_agregador_metricas
+from ..seedwork.aplicacion.comandos import ejecutar_commando
+from ..seedwork.dominio.excepciones import ExcepcionDominio
+
+logger = logging.getLogger(__name__)
+
+bp = api.crear_blueprint('campanas', '/campanas')
+
+
+def obtener_servicio_emparejamiento():
+    """Función helper para obtener el servicio de emparejamiento."""
+    return ServicioEmparejamiento(motor_emparejamiento)
+
+
+def obtener_servicio_tracking():
+    """Función helper para obtener el servicio de tracking (agregador del proceso)."""
+    return ServicioTracking(iniciar_agregador_metricas())
+
+
+def obtener_servicio_afiliados():
+    """Función helper para obtener el servicio de afiliados de campana."""
+    return ServicioAfiliadosCampana(RepositorioCampanasSQLAlchemy())
+
+
+def obtener_servicio_consultas():
+    """Función helper para obtener el servicio de consultas de campanas."""
+    return ServicioConsultaCampanas(RepositorioCampanasSQLAlchemy())
+
+
+def _es_uuid(valor) -> bool:
+    try:
+        uuid.UUID(str(valor))
+        return True
+    except ValueError:
+        return False
+
+
+def _parametros_pagina():
+    limite = min(max(request.args.get('limite', 100, type=int), 1), 1000)
+    despues_de = request.args.get('despues_de') or None
+    # El cursor se compara con columnas uuid: uno mal formado no debe llegar a la consulta
+    if despues_de is not None and not _es_uuid(despues_de):
+        raise ParametrosCampanaInvalidosExcepcion(f"Cursor inválido: {despues_de}")
+    return limite, despues_de
+
+
+@bp.route('/tracking', methods=('POST',))
+def registrar_eventos_tracking():
+    """Ingesta de clics y conversiones (un evento o una lista); se agregan en memoria."""
+    datos = request.get_json(silent=True)
+    eventos = datos if isinstance(datos, list) else [datos] if isinstance(datos, dict) else None
+    if not eventos:
+        return Response(
+            json.dumps({"error": "Se esperaba un evento o una lista de eventos"}),
+            status=400,
+            mimetype='application/json'
+        )
+    
+    try:
+        registrados = obtener_servicio_tracking().registrar_eventos(eventos)
+        return Response(
+            json.dumps({"mensaje": "Eventos aceptados", "eventos": registrados}),
+            status=202,
+            mimetype='application/json'
+        )
+    except ExcepcionDominio as e:
+        return Response(json.dumps({"error": str(e)}), status=400, mimetype='application/json')
+
+
+@bp.route('', methods=('GET',))
+def listar_campanas():
+    """Listado de campanas (proyección de columnas) paginado por cursor ``despues_de``."""
+    estado = request.args.get('estado') or None
+    try:
+        limite, despues_de = _parametros_pagina()
+        resultado = obtener_servicio_consultas().listar_campanas(limite=limite, despues_de=despues_de, estado=estado)
+        return Response(json.dumps(resultado), status=200, mimetype='application/json')
+    except ExcepcionDominio as e:
+        return Response(json.dumps({"error": str(e)}), status=400, mimetype='application/json')
+
+
+@bp.route('/<id_campana>', methods=('GET',))
+def obtener_campana(id_campana):
+    """Detalle de una campana."""
+    try:
+        campana = obtener_servicio_consultas().obtener_campana(id_campana)
+        return Response(json.dumps(campana), status=200, mimetype='application/json')
+    except CampanaNoEncontradaExcepcion as e:
+        return Response(json.dumps({"error": str(e)}), status=404, mimetype='application/json')
+
+
+@bp.route('/ranking', methods=('GET',))
+def ranking_campanas():
+    """Top de campanas por ``criterio`` (roi, tasa_conversion o ingresos), opcionalmente por ``estado``."""
+    criterio = request.args.get('criterio', 'roi')
+    limite = min(max(request.args.get('limite', 10, type=int), 1), 100)
+    estado = request.args.get('estado') or None
+    try:
+        ranking = obtener_servicio_consultas().ranking(criterio, limite=limite, estado=estado)
+        return Response(
+            json.dumps({'criterio': criterio, 'campanas': ranking}),
+            status=200,
+            mimetype='application/json'
+        )
+    except ExcepcionDominio as e:
+        return Response(json.dumps({"error": str(e)}), status=400, mimetype='application/json')
+
+
+@bp.route('/por-categoria', methods=('GET',))
+def campanas_por_categoria():
+    """Campanas con alguna de las categorías (``modo=todas`` exige todas), paginadas por cursor."""
+    categorias = [
+        categoria for valor in request.args.getlist('categoria') for categoria in valor.split(',') if categoria.strip()
+    ]
+    todas = request.args.get('modo', 'alguna') == 'todas'
+    try:
+        limite, despues_de = _parametros_pagina()
+        resultado = obtener_servicio_consultas().campanas_por_categorias(
+            categorias, todas=todas, limite=limite, despues_de=despues_de
+        )
+        return Response(json.dumps(resultado), status=200, mimetype='application/json')
+    except ExcepcionDominio as e:
+        return Response(json.dumps({"error": str(e)}), status=400, mimetype='application/json')
+
+
+@bp.route('/elegibles/influencer/<id_influencer>', methods=('GET',))
+def campanas_elegibles_para_influencer(id_influencer):
+    """Campanas activas cuyos criterios de afiliado cumple el influencer."""
+    try:
+        campanas = obtener_servicio_emparejamiento().campanas_elegibles(id_influencer)
+        return Response(
+            json.dumps({'influencer_id': id_influencer, 'campanas': campanas}),
+            status=200,
+            mimetype='application/json'
+        )
+    except ExcepcionDominio as e:
+        return Response(json.dumps({"error": str(e)}), status=404, mimetype='application/json')
+
+
+@bp.route('/<id_campana>/influencers-elegibles', methods=('GET',))
+def influencers_elegibles_para_campana(id_campana):
+    """Influencers que cumplen los criterios de una campana activa (paginado por cursor)."""
+    limite = min(max(request.args.get('limite', 100, type=int), 1), 1000)
+    cursor = max(request.args.get('cursor', 0, type=int), 0)
+    try:
+        resultado = obtener_servicio_emparejamiento().influencers_elegibles(id_campana, limite=limite, cursor=cursor)
+        return Response(
+            json.dumps({'campana_id': id_campana, **resultado}),
+            status=200,
+            mimetype='application/json'
+        )
+    except ExcepcionDominio as e:
+        return Response(json.dumps({"error": str(e)}), status=404, mimetype='application/json')
+
+
+@bp.route('/<id_campana>/afiliados', methods=('POST', 'DELETE'))
+def modificar_afiliados_campana(id_campana):
+    """Asigna (POST) o retira (DELETE) un lote de afiliados de una campana."""
+    datos = request.get_json(silent=True) or {}
+    influencer_ids = datos.get('influencer_ids')
+    if not isinstance(influencer_ids, list) or not influencer_ids:
+        return Response(
+            json.dumps({"error": "Se esperaba una lista no vacía en influencer_ids"}),
+            status=400,
+            mimetype='application/json'
+        )
+    if not _es_uuid(id_campana):
+        return Response(
+            json.dumps({"error": f"Id de campana inválido: {id_campana}"}),
+            status=400,
+            mimetype='application/json'
+        )
+    invalidos = [str(i) for i in influencer_ids if not _es_uuid(i)]
+    if invalidos:
+        return Response(
+            json.dumps({"error": f"influencer_ids inválidos: {', '.join(invalidos[:10])}"}),
+            status=400,
+            mimetype='application/json'
+        )
+    
+    tipo_comando = AsignarAfiliadosCampana if request.method == 'POST' else RetirarAfiliadosCampana
+    try:
+        ejecutar_commando(tipo_comando(campana_id=id_campana, influencer_ids=[str(i) for i in influencer_ids]))
+        return Response(
+            json.dumps({"mensaje": "Afiliados actualizados", "campana_id": id_campana}),
+            status=200,
+            mimetype='application/json'
+        )
+    except CampanaNoEncontradaExcepcion as e:
+        return Response(json.dumps({"error": str(e)}), status=404, mimetype='application/json')
+    except ExcepcionDominio as e:
+        return Response(json.dumps({"error": str(e)}), status=400, mimetype='application/json')
+
+
+@bp.route('/<id_campana>/afiliados', methods=('GET',))
+def afiliados_de_campana(id_campana):
+    """Afiliados asignados a una campana (paginado por cursor ``despues_de``)."""
+    try:
+        # Igual que el cursor, el id se compara con columnas uuid
+        if not _es_uuid(id_campana):
+            raise ParametrosCampanaInvalidosExcepcion(f"Id de campana inválido: {id_campana}")
+        limite, despues_de = _parametros_pagina()
+    except ExcepcionDominio as e:
+        return Response(json.dumps({"error": str(e)}), status=400, mimetype='application/json')
+    resultado = obtener_servicio_afiliados().afiliados_de_campana(id_campana, limite=limite, despues_de=despues_de)
+    return Response(
+        json.dumps({'campana_id': id_campana, **resultado}),
+        status=200,
+        mimetype='application/json'
+    )
+
+
+@bp.route('/afiliado/<id_influencer>', methods=('GET',))
+def campanas_de_afiliado(id_influencer):
+    """Campanas a las que está asignado un influencer (paginado por cursor ``despues_de``)."""
+    try:
+        # Igual que el cursor, el id se compara con columnas uuid
+        if not _es_uuid(id_influencer):
+            raise ParametrosCampanaInvalidosExcepcion(f"Id de influencer inválido: {id_influencer}")
+        limite, despues_de = _parametros_pagina()
+    except ExcepcionDominio as e:
+        return Response(json.dumps({"error": str(e)}), status=400, mimetype='application/json')
+    resultado = obtener_servicio_afiliados().campanas_de_afiliado(id_influencer, limite=limite, despues_de=despues_de)
+    return Response(
+        json.dumps({'influencer_id': id_influencer, **resultado}),
+        status=200,
+        mimetype='application/json'
+    )
@@ -9,6 +9,7 @@ from ..modulos.influencers.aplicacion.servicios import ServicioInfluencer
 from ..modulos.influencers.dominio.objetos_valor import TipoInfluencer, EstadoInfluencer, Plataforma
 from ..modulos.influencers.dominio.excepciones import EmailYaRegistrado
 from ..seedwork.aplicacion.comandos import ejecutar_commando
+from ..seedwork.dominio.identificadores import nuevo_id
 from ..seedwork.dominio.excepciones import ExcepcionDominio
 
 # Importar el comando DIRECTAMENTE para registrarlo (como en el tutorial)
@@ -39,20 +40,21 @@ def registrar_influencer_asincrono():
         logger.info(f"API: Iniciando registro asíncrono de influencer - Email: {datos_dict.get('email')}")
         
         from datetime import datetime
-        import uuid
         
         # Crear comando (siguiendo el patrón de CrearReserva)
         comando = RegistrarInfluencer(
             fecha_creacion=datetime.utcnow().isoformat(),
             fecha_actualizacion=datetime.utcnow().isoformat(),
-            id=str(uuid.uuid4()),
+            id=nuevo_id(),
             nombre=datos_dict.get('nombre'),
             email=datos_dict.get('email'),
             categorias=datos_dict.get('categorias', []),
             descripcion=datos_dict.get('descripcion', ''),
             biografia=datos_dict.get('biografia', ''),
             sitio_web=datos_dict.get('sitio_web', ''),
-            telefono=datos_dict.get('telefono', '')
+            telefono=datos_dict.get('telefono', ''),
+            audiencia=datos_dict.get('audiencia') or [],
+            demografia=datos_dict.get('demografia')
         )
         
         # TODO: Reemplazar este código síncrono y usar el broker de eventos para propagar este comando de forma asíncrona
@@ -177,3 +179,78 @@ def listar_influencers():
             mimetype='application/json'
         )
 
+
+
+@bp.route('/facetas', methods=('GET',))
+def obtener_facetas():
+    """Conteos por estado, tipo, plataforma y categoría bajo los filtros del listado."""
+    try:
+        estado = request.args.get('estado')
+        tipo = request.args.get('tipo')
+        plataforma = request.args.get('plataforma')
+        
+        servicio = obtener_servicio_influencer()
+        facetas = servicio.obtener_facetas(
+            estado=EstadoInfluencer(estado) if estado else None,
+            tipo=TipoInfluencer(tipo) if tipo else None,
+            categoria=request.args.get('categoria'),
+            plataforma=Plataforma(plataforma) if plataforma else None,
+            min_seguidores=request.args.get('min_seguidores', type=int),
+            max_seguidores=request.args.get('max_seguidores', type=int),
+            engagement_minimo=request.args.get('engagement_minimo', type=float)
+        )
+        
+        return Response(
+            json.dumps(facetas),
+            status=200,
+            mimetype='application/json'
+        )
+        
+    except ValueError as e:
+        logger.warning(f"API: Filtro inválido en facetas: {e}")
+        return Response(
+            json.dumps({"error": str(e)}),
+            status=400,
+            mimetype='application/json'
+        )
+    except Exception as e:
+        logger.error(f"API: Error calculando facetas: {e}", exc_info=True)
+        return Response(
+            json.dumps({"error": "Error interno del servidor"}),
+            status=500,
+            mimetype='application/json'
+        )
+
+
+@bp.route('/buscar', methods=('GET',))
+def buscar_influencers():
+    """Busca influencers por nombre (typeahead), ordenados por similitud."""
+    try:
+        texto = (request.args.get('q') or '').strip()
+        limite = min(max(request.args.get('limite', 10, type=int), 1), 50)
+        
+        if not texto:
+            return Response(
+                json.dumps({"error": "El parámetro 'q' es requerido"}),
+                status=400,
+                mimetype='application/json'
+            )
+        
+        logger.info(f"API: Búsqueda de influencers - q: '{texto}', límite: {limite}")
+        
+        servicio = obtener_servicio_influencer()
+        resultado = servicio.buscar_influencers(texto, limite=limite)
+        
+        return Response(
+            json.dumps([dto.dict() for dto in resultado]),
+            status=200,
+            mimetype='application/json'
+        )
+        
+    except Exception as e:
+        logger.error(f"API: Error en búsqueda: {e}", exc_info=True)
+        return Response(
+            json.dumps({"error": "Error interno del servidor"}),
+            status=500,
+            mimetype='application/json'
+        )
@@ -0,0 +1,37 @@
+import alpes_partners.seedwork.presentacion.api as api
+import json
+import logging
+
+from flask import request, Response
+from ..modulos.sugerencias.aplicacion.servicios import ServicioSugerencias
+from ..modulos.sugerencias.infraestructura.proyecciones import indice_sugerencias
+
+logger = logging.getLogger(__name__)
+
+bp = api.crear_blueprint('sugerencias', '/sugerencias')
+
+
+@bp.route('', methods=('GET',))
+def sugerir():
+    """Autocompletado de nombres de influencers y campanas desde el índice en memoria."""
+    texto = (request.args.get('q') or '').strip()
+    tipo = request.args.get('tipo')
+    limite = min(max(request.args.get('limite', 10, type=int), 1), 50)
+    
+    if not texto:
+        return Response(json.dumps([]), status=200, mimetype='application/json')
+    
+    try:
+        servicio = ServicioSugerencias(indice_sugerencias)
+        resultado = servicio.sugerir(texto, limite=limite, tipo=tipo)
+        return Response(
+            json.dumps([dto.dict() for dto in resultado]),
+            status=200,
+            mimetype='application/json'
+        )
+    except ValueError as e:
+        return Response(
+            json.dumps({"error": str(e)}),
+            status=400,
+            mimetype='application/json'
+        )
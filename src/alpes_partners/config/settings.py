@@ -11,6 +11,13 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str = "redis://localhost:6379"
     
+    # Bus de eventos sobre Redis Streams
+    eventos_redis_tamano_lote: int = 100  # entradas por XREADGROUP
+    eventos_redis_bloqueo_ms: int = 1000
+    eventos_redis_reclamar_ms: int = 60000  # inactividad antes de reclamar una entrada pendiente
+    eventos_redis_max_entregas: int = 5  # luego va a <topico>:dlq
+    eventos_redis_max_longitud: int = 1_000_000  # MAXLEN aproximado por stream
+    
     # Aplicación
     app_name: str = "AlpesPartners DIJS"
     app_version: str = "1.0.0"
@@ -21,9 +28,67 @@ class Settings(BaseSettings):
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     
+    # Broker de mensajería: "pulsar" o "memoria" (en proceso, para pruebas y benchmarks)
+    broker_tipo: str = "pulsar"
+    
     # Eventos
     eventos_topico_influencers: str = "eventos-influencers"
+    # InfluencerRegistrado v2 (con resumen de audiencia) va a su propio tópico; v1 se publica
+    # también mientras queden consumidores de la versión anterior
+    eventos_topico_influencers_v2: str = "eventos-influencers-v2"
+    eventos_influencers_publicar_v1: bool = True
     eventos_topico_campanas: str = "eventos-campanas"
+    eventos_topico_tracking: str = "eventos-tracking"
+    eventos_topico_campanas_estado: str = "eventos-campanas-estado"
+    
+    # Productores Pulsar (batching y compresión)
+    publicador_batching: bool = True
+    publicador_lote_max_mensajes: int = 1000
+    publicador_lote_max_bytes: int = 131072  # 128 KiB
+    publicador_lote_max_retraso_ms: int = 10
+    publicador_compresion: str = "LZ4"  # NONE, LZ4, ZSTD, ZLIB, SNAPPY
+    publicador_max_pendientes: int = 10000  # envíos sin ack antes de bloquear
+    publicador_timeout_operacion: int = 5  # segundos para conectar/crear productores
+    
+    # Spool en disco para eventos con el broker caído
+    spool_habilitado: bool = True
+    spool_directorio: str = "/tmp/alpes-spool"
+    spool_tamano_segmento: int = 16 * 1024 * 1024  # bytes por segmento
+    spool_drenado_intervalo: float = 2.0  # segundos entre intentos de republicar
+    
+    # Métricas de tracking (agregación en memoria)
+    metricas_shards: int = 16
+    metricas_flush_intervalo: float = 1.0  # segundos entre escrituras de deltas
+    
+    # Idempotencia de consumidores (registro de mensajes procesados)
+    idempotencia_ttl_horas: int = 72  # mayor que la retención de redeliveries del broker
+    idempotencia_bloom_capacidad: int = 1_000_000
+    idempotencia_limpieza_intervalo: int = 3600  # segundos
+    
+    # Lecturas de campanas
+    campanas_cache_ttl: int = 10  # segundos
+    
+    # Facetas de influencers
+    facetas_cache_ttl: int = 30  # segundos
+    
+    # Sugerencias (índice de autocompletado en memoria)
+    sugerencias_habilitadas: bool = True  # Solo en procesos que sirven la API
+    sugerencias_snapshot_ruta: str = "/tmp/alpes-sugerencias.json.gz"
+    sugerencias_snapshot_max_edad: int = 3600  # segundos; si es más antiguo se reconstruye desde la BD
+    sugerencias_snapshot_intervalo: int = 300  # segundos entre snapshots
+    
+    # Reproducción de tópicos para reconstruir modelos de lectura (run_replay.py)
+    replay_directorio_checkpoints: str = "/tmp/alpes-replay"
+    replay_tamano_lote: int = 10000  # eventos leídos y decodificados por lote
+    replay_intervalo_checkpoint: int = 200000  # eventos entre checkpoints
+    
+    # Emparejamiento campana–influencer (índices en memoria)
+    emparejamiento_habilitado: bool = True  # Solo en procesos que sirven la API
+    emparejamiento_reconstruccion_intervalo: int = 600  # segundos entre reconstrucciones completas
+    
+    # Planificador del ciclo de vida de campanas
+    planificador_intervalo: int = 60  # segundos entre ciclos
+    planificador_tamano_lote: int = 1000  # campanas por UPDATE
     
     # Logging
     log_level: str = "INFO"
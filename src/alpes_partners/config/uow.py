@@ -1,6 +1,16 @@
-from ..seedwork.infraestructura.database import db
+import inspect
+
+from ..seedwork.infraestructura.database import sesion_actual
 from ..seedwork.infraestructura.uow import UnidadTrabajo, Batch
 
+
+def _acepta_lock(operacion) -> bool:
+    try:
+        return 'lock' in inspect.signature(operacion).parameters
+    except (TypeError, ValueError):
+        return False
+
+
 class UnidadTrabajoSQLAlchemy(UnidadTrabajo):
 
     def __init__(self):
@@ -25,11 +35,18 @@ class UnidadTrabajoSQLAlchemy(UnidadTrabajo):
         return self._batches             
 
     def commit(self):
-        for batch in self.batches:
-            lock = batch.lock
-            batch.operacion(*batch.args, **batch.kwargs)
-
-        db.session.commit()
+        try:
+            for batch in self.batches:
+                kwargs = dict(batch.kwargs)
+                if _acepta_lock(batch.operacion):
+                    kwargs.setdefault('lock', batch.lock)
+                batch.operacion(*batch.args, **kwargs)
+
+            sesion_actual().commit()
+        except Exception:
+            # Deja la sesión y los batches limpios para que el handler pueda reintentar
+            self.rollback()
+            raise
 
         super().commit()
 
@@ -37,9 +54,9 @@ class UnidadTrabajoSQLAlchemy(UnidadTrabajo):
         if savepoint:
             savepoint.rollback()
         else:
-            db.session.rollback()
+            sesion_actual().rollback()
         
         super().rollback()
     
     def savepoint(self):
-        db.session.begin_nested()
+        sesion_actual().begin_nested()
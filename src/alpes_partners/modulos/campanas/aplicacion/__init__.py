@@ -1 +1,9 @@
-from .comandos.crear_campana import *
\ No newline at end of file
+from .comandos.crear_campana import *
+
+# Configurar handlers de integración
+from pydispatch import dispatcher
+from .handlers import HandlerCampanaIntegracion
+from ..dominio.eventos import CampanaCreada
+
+dispatcher.connect(HandlerCampanaIntegracion.handle_invalidar_cache, signal=f'{CampanaCreada.__name__}Integracion')
+dispatcher.connect(HandlerCampanaIntegracion.handle_campana_creada, signal=f'{CampanaCreada.__name__}Integracion')
@@ -0,0 +1,72 @@
+from typing import List
+from dataclasses import dataclass, field
+from .....seedwork.aplicacion.comandos import Comando
+from .base import RegistrarCampanaBaseHandler
+from .....seedwork.aplicacion.comandos import ejecutar_commando as comando, reintentar_en_conflicto
+
+from ...dominio.entidades import Campana
+from .....seedwork.infraestructura.uow import UnidadTrabajoPuerto
+from ...infraestructura.repositorios import RepositorioCampanasSQLAlchemy
+from ...dominio.excepciones import CampanaNoEncontradaExcepcion
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AsignarAfiliadosCampana(Comando):
+    """Comando para asignar afiliados (influencers) a una campana."""
+    campana_id: str
+    influencer_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RetirarAfiliadosCampana(Comando):
+    """Comando para retirar afiliados (influencers) de una campana."""
+    campana_id: str
+    influencer_ids: List[str] = field(default_factory=list)
+
+
+class AfiliadosCampanaHandler(RegistrarCampanaBaseHandler):
+
+    def _obtener_campana(self, repositorio, campana_id: str) -> Campana:
+        campana = repositorio.obtener_por_id(campana_id)
+        if campana is None:
+            raise CampanaNoEncontradaExcepcion(f"Campana {campana_id} no encontrada")
+        return campana
+
+    def handle(self, comando):
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioCampanasSQLAlchemy.__class__)
+        campana = self._obtener_campana(repositorio, comando.campana_id)
+
+        if isinstance(comando, AsignarAfiliadosCampana):
+            campana.asignar_afiliados(comando.influencer_ids)
+        else:
+            campana.retirar_afiliados(comando.influencer_ids)
+
+        # Solo se escriben las filas de campana_afiliados que cambian, no la lista completa
+        UnidadTrabajoPuerto.registrar_batch(repositorio.actualizar, campana)
+        UnidadTrabajoPuerto.commit()
+
+        from ..servicios import cache_campanas
+        cache_campanas.invalidar()
+
+        logger.info(
+            f"COMANDO HANDLER: Afiliados de campana {comando.campana_id} actualizados - "
+            f"total: {campana.metricas.afiliados_asignados}"
+        )
+
+
+@comando.register(AsignarAfiliadosCampana)
+@reintentar_en_conflicto()
+def ejecutar_comando_asignar_afiliados(comando: AsignarAfiliadosCampana):
+    handler = AfiliadosCampanaHandler()
+    handler.handle(comando)
+
+
+@comando.register(RetirarAfiliadosCampana)
+@reintentar_en_conflicto()
+def ejecutar_comando_retirar_afiliados(comando: RetirarAfiliadosCampana):
+    handler = AfiliadosCampanaHandler()
+    handler.handle(comando)
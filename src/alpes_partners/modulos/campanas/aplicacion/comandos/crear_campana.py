@@ -60,6 +60,17 @@ class RegistrarCampanaHandler(RegistrarCampanaBaseHandler):
         logger.info(f"COMANDO HANDLER: Nombre disponible: {comando.nombre}")
         
         # Crear la entidad solo después de validar las reglas de dominio
+        campana = self.construir_campana(comando)
+
+        # Usar el sistema de UoW con batches y eventos (como en el tutorial)
+        UnidadTrabajoPuerto.registrar_batch(repositorio.agregar, campana)
+        UnidadTrabajoPuerto.savepoint()
+        UnidadTrabajoPuerto.commit()
+        
+        logger.info(f"COMANDO HANDLER: Campana registrada exitosamente - ID: {comando.id}")
+
+    def construir_campana(self, comando: RegistrarCampana) -> Campana:
+        """Valida el comando y construye la campana con su evento de creación."""
         campana_dto = RegistrarCampanaDTO(
                 fecha_actualizacion=comando.fecha_actualizacion
             ,   fecha_creacion=comando.fecha_creacion
@@ -86,13 +97,7 @@ class RegistrarCampanaHandler(RegistrarCampanaBaseHandler):
 
         campana: Campana = self.fabrica_campanas.crear_objeto(campana_dto, MapeadorCampana())
         campana.crear_campana(campana)
-
-        # Usar el sistema de UoW con batches y eventos (como en el tutorial)
-        UnidadTrabajoPuerto.registrar_batch(repositorio.agregar, campana)
-        UnidadTrabajoPuerto.savepoint()
-        UnidadTrabajoPuerto.commit()
-        
-        logger.info(f"COMANDO HANDLER: Campana registrada exitosamente - ID: {comando.id}")
+        return campana
 
 
 @comando.register(RegistrarCampana)
@@ -0,0 +1,61 @@
+from typing import List
+from dataclasses import dataclass, field
+from .....seedwork.aplicacion.comandos import Comando
+from .....seedwork.aplicacion.comandos import ejecutar_commando as comando
+from .crear_campana import RegistrarCampana, RegistrarCampanaHandler
+
+from ...dominio.entidades import Campana
+from .....seedwork.infraestructura.uow import UnidadTrabajoPuerto
+from ...infraestructura.repositorios import RepositorioCampanasSQLAlchemy
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RegistrarCampanasLote(Comando):
+    """Comando para registrar varias campanas en una sola transacción."""
+    campanas: List[RegistrarCampana] = field(default_factory=list)
+
+
+class RegistrarCampanasLoteHandler(RegistrarCampanaHandler):
+
+    def handle(self, comando: RegistrarCampanasLote) -> List[Campana]:
+        logger.info(f"COMANDO HANDLER: Iniciando registro de {len(comando.campanas)} campanas en lote")
+
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioCampanasSQLAlchemy.__class__)
+
+        # VALIDACIÓN DE DOMINIO: unicidad de nombres con una sola consulta para todo el lote
+        existentes = repositorio.existen_nombres([item.nombre.strip() for item in comando.campanas])
+
+        campanas = []
+        nombres = set(existentes)
+        for item in comando.campanas:
+            nombre = item.nombre.strip()
+            if nombre in nombres:
+                # Igual que en el registro individual, un nombre repetido no crea campana
+                logger.warning(f"COMANDO HANDLER: Nombre ya registrado, se omite: {nombre}")
+                continue
+            try:
+                campanas.append(self.construir_campana(item))
+            except Exception as e:
+                logger.warning(f"COMANDO HANDLER: Campana inválida en lote, se omite '{nombre}': {e}")
+                continue
+            nombres.add(nombre)
+
+        if not campanas:
+            logger.info("COMANDO HANDLER: Lote sin campanas nuevas")
+            return []
+
+        UnidadTrabajoPuerto.registrar_batch(repositorio.agregar_lote, campanas)
+        UnidadTrabajoPuerto.commit()
+
+        logger.info(f"COMANDO HANDLER: {len(campanas)} campanas registradas en lote")
+        return campanas
+
+
+@comando.register(RegistrarCampanasLote)
+def ejecutar_comando_registrar_campanas_lote(comando: RegistrarCampanasLote):
+    handler = RegistrarCampanasLoteHandler()
+    return handler.handle(comando)
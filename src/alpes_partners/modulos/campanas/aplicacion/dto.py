@@ -98,3 +98,21 @@ class CampanaDTO(DTO):
     # Origen
     influencer_origen_id: Optional[str] = None
     categoria_origen: Optional[str] = None
+
+
+class CampanaResumenDTO(DTO):
+    """DTO de lectura para listados de campanas."""
+    id: str
+    nombre: str
+    estado: str
+    tipo_comision: str
+    valor_comision: float
+    moneda: str
+    fecha_inicio: str
+    fecha_fin: Optional[str] = None
+    categorias_objetivo: List[str] = []
+    afiliados_activos: int = 0
+    clics_totales: int = 0
+    conversiones_totales: int = 0
+    ingresos_generados: float = 0.0
+    roi: float = 0.0
@@ -0,0 +1,29 @@
+import logging
+
+from alpes_partners.config.settings import settings
+from ..infraestructura.despachadores import DespachadorCampanas
+
+logger = logging.getLogger(__name__)
+
+
+class HandlerCampanaIntegracion:
+    """Handler para eventos de integración de campanas."""
+    
+    @staticmethod
+    def handle_campana_creada(evento):
+        """Handler para evento CampanaCreada de integración."""
+        despachador = DespachadorCampanas()
+        despachador.publicar_evento_campana_creada(evento, settings.eventos_topico_campanas)
+    
+    @staticmethod
+    def handle_invalidar_cache(evento):
+        """Invalida las lecturas de campanas cacheadas tras una creación en este proceso.
+
+        Las demás instancias de la API invalidan al leer el evento de integración
+        (``infraestructura/cache.py``).
+        """
+        from .servicios import cache_campanas
+        cache_campanas.invalidar()
+
+
+logger.info("HANDLERS: Handlers de aplicación de campanas cargados")
@@ -21,6 +21,7 @@ from alpes_partners.modulos.campanas.dominio.entidades import Campana
 from alpes_partners.modulos.campanas.aplicacion.dto import RegistrarCampanaDTO, CampanaDTO
 
 from datetime import datetime
+from typing import Optional
 
 
 class MapeadorCampana(Mapeador):
@@ -33,17 +34,17 @@ class MapeadorCampana(Mapeador):
         """Convierte una entidad Campana a DTO."""
         
         return CampanaDTO(
-            id=entidad.id,
+            id=str(entidad.id),
             nombre=entidad.nombre,
             descripcion=entidad.descripcion,
             estado=entidad.estado.value,
-            tipo_comision=entidad.tipo_comision.value,
-            valor_comision=entidad.valor_comision,
-            moneda=entidad.moneda,
-            fecha_inicio=entidad.fecha_inicio.isoformat() if isinstance(entidad.fecha_inicio, datetime) else entidad.fecha_inicio,
-            fecha_fin=entidad.fecha_fin.isoformat() if entidad.fecha_fin and isinstance(entidad.fecha_fin, datetime) else entidad.fecha_fin,
-            fecha_creacion=entidad.fecha_creacion.isoformat(),
-            fecha_activacion=entidad.fecha_activacion.isoformat() if entidad.fecha_activacion else None,
+            tipo_comision=entidad.terminos_comision.tipo.value,
+            valor_comision=entidad.terminos_comision.valor.cantidad,
+            moneda=entidad.terminos_comision.valor.moneda,
+            fecha_inicio=self._fecha_a_str(entidad.periodo.fecha_inicio),
+            fecha_fin=self._fecha_a_str(entidad.periodo.fecha_fin),
+            fecha_creacion=self._fecha_a_str(entidad.fecha_creacion),
+            fecha_activacion=self._fecha_a_str(entidad.fecha_activacion),
             
             # Material promocional
             titulo_material=entidad.material_promocional.titulo,
@@ -58,16 +59,20 @@ class MapeadorCampana(Mapeador):
             paises_permitidos=entidad.criterios_afiliado.paises_permitidos,
             metricas_minimas=entidad.criterios_afiliado.metricas_minimas,
             
-            # Métricas (por defecto 0 si no están disponibles)
-            afiliados_activos=getattr(entidad, 'afiliados_activos', 0),
-            conversiones_totales=getattr(entidad, 'conversiones_totales', 0),
-            ingresos_generados=getattr(entidad, 'ingresos_generados', 0.0),
+            # Métricas
+            afiliados_activos=entidad.metricas.afiliados_asignados,
+            conversiones_totales=entidad.metricas.conversiones_totales,
+            ingresos_generados=entidad.metricas.ingresos_generados,
             
-            # Origen
+            # Origen (no forma parte de la entidad)
             influencer_origen_id=getattr(entidad, 'influencer_origen_id', None),
             categoria_origen=getattr(entidad, 'categoria_origen', None)
         )
     
+    @staticmethod
+    def _fecha_a_str(fecha) -> Optional[str]:
+        return fecha.isoformat() if isinstance(fecha, datetime) else fecha
+    
     def dto_a_entidad(self, dto: RegistrarCampanaDTO) -> Campana:
         """Convierte un DTO a entidad Campana."""
         
@@ -0,0 +1,274 @@
+import logging
+import uuid
+from typing import Any, Dict, List, Optional
+
+from alpes_partners.config.settings import settings
+from alpes_partners.seedwork.dominio.excepciones import ExcepcionEntidadNoEncontrada
+from alpes_partners.seedwork.infraestructura.cache import CacheTTL
+from ..dominio.excepciones import CampanaNoEncontradaExcepcion, ParametrosCampanaInvalidosExcepcion
+from ..dominio.objetos_valor import IncrementoMetricas, EstadoCampana
+from ..dominio.repositorios import RepositorioCampanas
+from ..infraestructura.agregador import AgregadorMetricas
+from ..infraestructura.emparejamiento import MotorEmparejamiento
+from .dto import CampanaDTO, CampanaResumenDTO
+
+logger = logging.getLogger(__name__)
+
+# Respuestas de lectura de campanas (listados y detalle); se invalida al crear campanas,
+# al cambiar su estado y al modificar afiliados (ver infraestructura/cache.py). Las
+# métricas de tracking se sirven con hasta ``campanas_cache_ttl`` segundos de desfase.
+cache_campanas = CacheTTL(ttl_segundos=settings.campanas_cache_ttl)
+
+
+class ServicioEmparejamiento:
+    """Servicio de aplicación para consultar el emparejamiento campana–influencer."""
+    
+    def __init__(self, motor: MotorEmparejamiento):
+        self._motor = motor
+    
+    @property
+    def motor(self):
+        return self._motor
+    
+    def campanas_elegibles(self, id_influencer: str) -> List[str]:
+        """Ids de las campanas activas cuyos criterios cumple el influencer."""
+        campanas = self.motor.campanas_para_influencer(id_influencer)
+        if campanas is None:
+            raise ExcepcionEntidadNoEncontrada(f"Influencer {id_influencer} no indexado para emparejamiento")
+        
+        logger.info(f"SERVICIO: {len(campanas)} campanas elegibles para influencer {id_influencer}")
+        return campanas
+    
+    def influencers_elegibles(self, id_campana: str, limite: int = 100, cursor: int = 0) -> Dict[str, Any]:
+        """Página de influencers que cumplen los criterios de una campana activa."""
+        resultado = self.motor.influencers_para_campana(id_campana, limite=limite, cursor=cursor)
+        if resultado is None:
+            raise CampanaNoEncontradaExcepcion(f"Campana {id_campana} no encontrada o no activa")
+        
+        influencers, siguiente = resultado
+        logger.info(f"SERVICIO: {len(influencers)} influencers elegibles para campana {id_campana}")
+        return {'influencers': influencers, 'siguiente_cursor': siguiente}
+
+
+
+class ServicioTracking:
+    """Servicio de aplicación para la ingesta de eventos de clic y conversión."""
+    
+    TIPOS_EVENTO = ('clic', 'conversion')
+    
+    def __init__(self, agregador: AgregadorMetricas):
+        self._agregador = agregador
+    
+    @property
+    def agregador(self):
+        return self._agregador
+    
+    @classmethod
+    def a_incremento(cls, campana_id: str, tipo: str, cantidad: int = 1,
+                     valor: float = 0.0, costo: float = 0.0) -> IncrementoMetricas:
+        """Convierte un evento de tracking en el delta de métricas que produce."""
+        if tipo not in cls.TIPOS_EVENTO:
+            raise ParametrosCampanaInvalidosExcepcion(f"Tipo de evento de tracking no soportado: {tipo}")
+        # Un id inválido haría fallar el CAST a uuid de todo el flush, no solo este delta
+        try:
+            campana_id = str(uuid.UUID(str(campana_id)))
+        except ValueError:
+            raise ParametrosCampanaInvalidosExcepcion(f"Id de campana inválido: {campana_id}")
+        try:
+            return IncrementoMetricas(
+                campana_id=campana_id,
+                clics=cantidad if tipo == 'clic' else 0,
+                conversiones=cantidad if tipo == 'conversion' else 0,
+                inversion=costo,
+                ingresos=valor if tipo == 'conversion' else 0.0
+            )
+        except (TypeError, ValueError) as e:
+            raise ParametrosCampanaInvalidosExcepcion(f"Evento de tracking inválido: {e}")
+    
+    def registrar_eventos(self, eventos: List[Dict[str, Any]]) -> int:
+        """Valida y acumula un lote de eventos; se persisten en el siguiente flush."""
+        if any(not isinstance(evento, dict) for evento in eventos):
+            raise ParametrosCampanaInvalidosExcepcion("Cada evento de tracking debe ser un objeto")
+        incrementos = [
+            self.a_incremento(
+                campana_id=evento.get('campana_id') or '',
+                tipo=evento.get('tipo'),
+                cantidad=evento.get('cantidad', 1),
+                valor=evento.get('valor', 0.0),
+                costo=evento.get('costo', 0.0)
+            )
+            for evento in eventos
+        ]
+        for incremento in incrementos:
+            self.agregador.registrar(incremento)
+        return len(incrementos)
+
+
+class ServicioAfiliadosCampana:
+    """Servicio de aplicación para consultar las asignaciones de afiliados."""
+    
+    def __init__(self, repositorio: RepositorioCampanas):
+        self._repositorio = repositorio
+    
+    @property
+    def repositorio(self):
+        return self._repositorio
+    
+    def afiliados_de_campana(self, id_campana: str, limite: int = 100,
+                             despues_de: Optional[str] = None) -> Dict[str, Any]:
+        """Página de afiliados de una campana; ``siguiente`` es el cursor de la próxima página."""
+        afiliados = self.repositorio.obtener_afiliados(id_campana, limite=limite, despues_de=despues_de)
+        siguiente = afiliados[-1] if len(afiliados) == limite else None
+        logger.info(f"SERVICIO: {len(afiliados)} afiliados de campana {id_campana}")
+        return {'afiliados': afiliados, 'siguiente': siguiente}
+    
+    def campanas_de_afiliado(self, id_influencer: str, limite: int = 100,
+                             despues_de: Optional[str] = None) -> Dict[str, Any]:
+        """Página de campanas a las que está asignado un influencer."""
+        campanas = self.repositorio.obtener_campanas_de_afiliado(id_influencer, limite=limite, despues_de=despues_de)
+        siguiente = campanas[-1] if len(campanas) == limite else None
+        logger.info(f"SERVICIO: Influencer {id_influencer} asignado a {len(campanas)} campanas")
+        return {'campanas': campanas, 'siguiente': siguiente}
+
+
+class ServicioConsultaCampanas:
+    """Servicio de aplicación para consultas de lectura sobre campanas."""
+    
+    def __init__(self, repositorio: RepositorioCampanas):
+        self._repositorio = repositorio
+    
+    @property
+    def repositorio(self):
+        return self._repositorio
+    
+    @staticmethod
+    def _resumen(campana) -> Dict[str, Any]:
+        return {
+            'id': campana.id,
+            'nombre': campana.nombre,
+            'estado': campana.estado.value,
+            'tipo_comision': campana.terminos_comision.tipo.value,
+            'categorias': campana.criterios_afiliado.categorias_requeridas,
+            'fecha_inicio': campana.periodo.fecha_inicio.isoformat() if campana.periodo.fecha_inicio else None
+        }
+    
+    def campanas_por_categorias(self, categorias: List[str], todas: bool = False, limite: int = 100,
+                                despues_de: Optional[str] = None) -> Dict[str, Any]:
+        """Página de campanas con alguna (o todas) de las categorías."""
+        if not categorias:
+            raise ParametrosCampanaInvalidosExcepcion("Se requiere al menos una categoría")
+        
+        campanas = self.repositorio.obtener_por_categorias(
+            categorias, todas=todas, limite=limite, despues_de=despues_de
+        )
+        siguiente = campanas[-1].id if len(campanas) == limite else None
+        logger.info(f"SERVICIO: {len(campanas)} campanas para categorías {categorias} (todas={todas})")
+        return {'campanas': [self._resumen(campana) for campana in campanas], 'siguiente': siguiente}
+    
+    @staticmethod
+    def _validar_id(valor: Optional[str], nombre: str) -> None:
+        if valor is None:
+            return
+        try:
+            uuid.UUID(str(valor))
+        except ValueError:
+            raise ParametrosCampanaInvalidosExcepcion(f"{nombre} inválido: {valor}")
+    
+    @staticmethod
+    def _fecha(valor) -> Optional[str]:
+        return valor.isoformat() if valor is not None else None
+    
+    def listar_campanas(self, limite: int = 100, despues_de: Optional[str] = None,
+                        estado: Optional[str] = None) -> Dict[str, Any]:
+        """Página de campanas (proyección cacheada); ``siguiente`` es el cursor de la próxima página."""
+        self._validar_id(despues_de, "Cursor")
+        if estado and estado not in {e.value for e in EstadoCampana}:
+            raise ParametrosCampanaInvalidosExcepcion(f"Estado de campana inválido: {estado}")
+        
+        def calcular():
+            filas = self.repositorio.obtener_resumenes(limite=limite, despues_de=despues_de, estado=estado)
+            campanas = [
+                CampanaResumenDTO(
+                    id=fila['id'],
+                    nombre=fila['nombre'],
+                    estado=fila['estado'],
+                    tipo_comision=fila['tipo_comision'],
+                    valor_comision=fila['valor_comision'],
+                    moneda=fila['moneda'],
+                    fecha_inicio=self._fecha(fila['fecha_inicio']),
+                    fecha_fin=self._fecha(fila['fecha_fin']),
+                    categorias_objetivo=fila['categorias'] or [],
+                    afiliados_activos=fila['total_afiliados'],
+                    clics_totales=fila['clics_totales'],
+                    conversiones_totales=fila['conversiones_totales'],
+                    ingresos_generados=fila['ingresos_generados'],
+                    roi=fila['roi'] or 0.0
+                ).dict()
+                for fila in filas
+            ]
+            siguiente = campanas[-1]['id'] if len(campanas) == limite else None
+            logger.info(f"SERVICIO: {len(campanas)} campanas listadas")
+            return {'campanas': campanas, 'siguiente': siguiente}
+        
+        return cache_campanas.obtener_o_calcular(('listado', limite, despues_de, estado), calcular)
+    
+    def obtener_campana(self, id_campana: str) -> Dict[str, Any]:
+        """Detalle de una campana (proyección cacheada)."""
+        try:
+            self._validar_id(id_campana, "Id de campana")
+        except ParametrosCampanaInvalidosExcepcion:
+            raise CampanaNoEncontradaExcepcion(f"Campana {id_campana} no encontrada")
+        
+        def calcular():
+            fila = self.repositorio.obtener_detalle(id_campana)
+            if fila is None:
+                return None
+            material = fila['material_promocional'] or {}
+            criterios = fila['criterios_afiliado'] or {}
+            return CampanaDTO(
+                id=fila['id'],
+                nombre=fila['nombre'],
+                descripcion=fila['descripcion'],
+                estado=fila['estado'],
+                tipo_comision=fila['tipo_comision'],
+                valor_comision=fila['valor_comision'],
+                moneda=fila['moneda'],
+                fecha_inicio=self._fecha(fila['fecha_inicio']),
+                fecha_fin=self._fecha(fila['fecha_fin']),
+                fecha_creacion=self._fecha(fila['fecha_creacion']),
+                fecha_activacion=self._fecha(fila['fecha_activacion']),
+                titulo_material=material.get('titulo', ''),
+                descripcion_material=material.get('descripcion', ''),
+                enlaces_material=material.get('enlaces', []),
+                imagenes_material=material.get('imagenes', []),
+                banners_material=material.get('banners', []),
+                categorias_objetivo=criterios.get('categorias_requeridas', []),
+                tipos_afiliado_permitidos=criterios.get('tipos_permitidos', []),
+                paises_permitidos=criterios.get('paises_permitidos', []),
+                metricas_minimas=criterios.get('metricas_minimas', {}),
+                afiliados_activos=fila['total_afiliados'],
+                conversiones_totales=fila['conversiones_totales'],
+                ingresos_generados=fila['ingresos_generados'],
+                influencer_origen_id=fila['influencer_origen_id'],
+                categoria_origen=fila['categoria_origen']
+            ).dict()
+        
+        campana = cache_campanas.obtener_o_calcular(('detalle', id_campana), calcular)
+        if campana is None:
+            raise CampanaNoEncontradaExcepcion(f"Campana {id_campana} no encontrada")
+        return campana
+    
+    CRITERIOS_RANKING = ('roi', 'tasa_conversion', 'ingresos')
+    
+    def ranking(self, criterio: str = 'roi', limite: int = 10, estado: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Campanas con mejor rendimiento según el criterio."""
+        if criterio not in self.CRITERIOS_RANKING:
+            raise ParametrosCampanaInvalidosExcepcion(
+                f"Criterio de ranking inválido: {criterio}. Debe ser: {', '.join(self.CRITERIOS_RANKING)}"
+            )
+        if estado and estado not in {e.value for e in EstadoCampana}:
+            raise ParametrosCampanaInvalidosExcepcion(f"Estado de campana inválido: {estado}")
+        
+        ranking = self.repositorio.obtener_ranking(criterio, limite=limite, estado=estado)
+        logger.info(f"SERVICIO: Ranking por {criterio} con {len(ranking)} campanas")
+        return ranking
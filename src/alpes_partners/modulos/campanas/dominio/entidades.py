@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Set
+from typing import Optional, List, Dict, Any, Set, Iterable, Tuple
 from alpes_partners.seedwork.dominio.entidades import AgregacionRaiz
 from alpes_partners.seedwork.dominio.objetos_valor import Dinero
 from alpes_partners.seedwork.dominio.excepciones import ExcepcionReglaDeNegocio, ExcepcionEstadoInvalido
@@ -32,7 +32,10 @@ class Campana(AgregacionRaiz):
         self.criterios_afiliado = criterios_afiliado
         self.estado = EstadoCampana.BORRADOR
         self.metricas = MetricasCampana()
-        self.afiliados_asignados: Set[str] = set()
+        # Las asignaciones viven en su propia tabla: la entidad solo registra
+        # los cambios pendientes y el repositorio los aplica por lotes.
+        self._afiliados_por_asignar: Set[str] = set()
+        self._afiliados_por_retirar: Set[str] = set()
         self.fecha_activacion: Optional[datetime] = None
         self.fecha_pausa: Optional[datetime] = None
         
@@ -43,18 +46,7 @@ class Campana(AgregacionRaiz):
         if not self.descripcion:
             raise ExcepcionReglaDeNegocio("La descripción de la campana es requerida")
         
-        # Emitir evento de creación
-        self.agregar_evento(CampanaCreada(
-            campana_id=self.id,
-            nombre=self.nombre,
-            descripcion=self.descripcion,
-            tipo_comision=self.terminos_comision.tipo,
-            valor_comision=self.terminos_comision.valor.cantidad,
-            moneda=self.terminos_comision.valor.moneda,
-            categorias_objetivo=self.criterios_afiliado.categorias_requeridas,
-            fecha_inicio=self.periodo.fecha_inicio,
-            fecha_fin=self.periodo.fecha_fin
-        ))
+        # El evento CampanaCreada se emite en crear_campana(), no al reconstruir la entidad
     
     @classmethod
     def crear(cls, 
@@ -112,3 +104,35 @@ class Campana(AgregacionRaiz):
             fecha_inicio=self.periodo.fecha_inicio,
             fecha_fin=self.periodo.fecha_fin
         ))
+    
+    def asignar_afiliados(self, influencer_ids: Iterable[str]) -> None:
+        """Registra la asignación de afiliados; se persiste al actualizar la campana."""
+        for influencer_id in influencer_ids:
+            influencer_id = str(influencer_id)
+            self._afiliados_por_retirar.discard(influencer_id)
+            self._afiliados_por_asignar.add(influencer_id)
+        self.marcar_actualizado()
+    
+    def retirar_afiliados(self, influencer_ids: Iterable[str]) -> None:
+        """Registra el retiro de afiliados; se persiste al actualizar la campana."""
+        for influencer_id in influencer_ids:
+            influencer_id = str(influencer_id)
+            self._afiliados_por_asignar.discard(influencer_id)
+            self._afiliados_por_retirar.add(influencer_id)
+        self.marcar_actualizado()
+    
+    def cambios_afiliados(self) -> Tuple[Set[str], Set[str]]:
+        """Afiliados pendientes de asignar y de retirar."""
+        return set(self._afiliados_por_asignar), set(self._afiliados_por_retirar)
+    
+    def confirmar_cambios_afiliados(self, total_afiliados: int) -> None:
+        """Descarta los cambios ya persistidos y actualiza el número de afiliados."""
+        self._afiliados_por_asignar.clear()
+        self._afiliados_por_retirar.clear()
+        self.metricas = MetricasCampana(
+            afiliados_asignados=total_afiliados,
+            clics_totales=self.metricas.clics_totales,
+            conversiones_totales=self.metricas.conversiones_totales,
+            inversion_total=self.metricas.inversion_total,
+            ingresos_generados=self.metricas.ingresos_generados
+        )
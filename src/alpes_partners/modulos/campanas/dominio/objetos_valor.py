@@ -123,3 +123,47 @@ class MetricasCampana(ObjetoValor):
         if self.clics_totales == 0:
             return 0.0
         return (self.conversiones_totales / self.clics_totales) * 100
+    
+    def aplicar_incremento(self, incremento: 'IncrementoMetricas') -> 'MetricasCampana':
+        """Retorna nuevas métricas con el incremento aplicado."""
+        return MetricasCampana(
+            afiliados_asignados=self.afiliados_asignados,
+            clics_totales=self.clics_totales + incremento.clics,
+            conversiones_totales=self.conversiones_totales + incremento.conversiones,
+            inversion_total=self.inversion_total + incremento.inversion,
+            ingresos_generados=self.ingresos_generados + incremento.ingresos
+        )
+
+
+class IncrementoMetricas(ObjetoValor):
+    """Delta acumulado de métricas de tracking (clics, conversiones, inversión, ingresos) de una campana."""
+    
+    def __init__(self, 
+                 campana_id: str,
+                 clics: int = 0,
+                 conversiones: int = 0,
+                 inversion: float = 0.0,
+                 ingresos: float = 0.0):
+        self.campana_id = str(campana_id)
+        self.clics = int(clics)
+        self.conversiones = int(conversiones)
+        self.inversion = float(inversion)
+        self.ingresos = float(ingresos)
+        
+        if not self.campana_id:
+            raise ValueError("El id de la campana es requerido")
+        
+        if min(self.clics, self.conversiones, self.inversion, self.ingresos) < 0:
+            raise ValueError("Los incrementos de métricas no pueden ser negativos")
+    
+    def combinar(self, otro: 'IncrementoMetricas') -> 'IncrementoMetricas':
+        """Suma dos incrementos de la misma campana."""
+        if otro.campana_id != self.campana_id:
+            raise ValueError("Solo se pueden combinar incrementos de la misma campana")
+        return IncrementoMetricas(
+            campana_id=self.campana_id,
+            clics=self.clics + otro.clics,
+            conversiones=self.conversiones + otro.conversiones,
+            inversion=self.inversion + otro.inversion,
+            ingresos=self.ingresos + otro.ingresos
+        )
@@ -3,8 +3,9 @@ Repositorios para el dominio de campanas.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set
 from .entidades import Campana
+from .objetos_valor import IncrementoMetricas
 
 
 class RepositorioCampanas(ABC):
@@ -30,6 +31,29 @@ class RepositorioCampanas(ABC):
         """Obtiene campanas que incluyan una categoría específica."""
         pass
     
+    @abstractmethod
+    def obtener_por_categorias(self, categorias: List[str], todas: bool = False,
+                               limite: Optional[int] = 100, despues_de: Optional[str] = None) -> List[Campana]:
+        """Obtiene campanas con alguna (o todas) de las categorías, paginadas por id."""
+        pass
+    
+    @abstractmethod
+    def obtener_resumenes(self, limite: int = 100, despues_de: Optional[str] = None,
+                          estado: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Obtiene una página de campanas como proyección de lectura."""
+        pass
+    
+    @abstractmethod
+    def obtener_detalle(self, campana_id: str) -> Optional[Dict[str, Any]]:
+        """Obtiene la proyección de lectura de una campana."""
+        pass
+    
+    @abstractmethod
+    def obtener_ranking(self, criterio: str = 'roi', limite: int = 10,
+                        estado: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Obtiene las campanas con mejor ROI, tasa de conversión o ingresos."""
+        pass
+    
     @abstractmethod
     def obtener_por_influencer_origen(self, influencer_id: str) -> List[Campana]:
         """Obtiene campanas creadas para un influencer específico."""
@@ -45,6 +69,11 @@ class RepositorioCampanas(ABC):
         """Agrega una nueva campana."""
         pass
     
+    @abstractmethod
+    def agregar_lote(self, campanas: List[Campana]) -> int:
+        """Agrega varias campanas nuevas. Retorna cuántas se insertaron."""
+        pass
+    
     @abstractmethod
     def actualizar(self, campana: Campana) -> None:
         """Actualiza una campana existente."""
@@ -55,7 +84,38 @@ class RepositorioCampanas(ABC):
         """Elimina una campana."""
         pass
     
+    @abstractmethod
+    def existen_nombres(self, nombres: List[str]) -> Set[str]:
+        """Retorna cuáles de los nombres dados ya están registrados."""
+        pass
+    
     @abstractmethod
     def existe_con_nombre(self, nombre: str, excluir_id: Optional[str] = None) -> bool:
         """Verifica si existe una campana con el nombre dado."""
         pass
+    
+    @abstractmethod
+    def aplicar_incrementos_metricas(self, incrementos: List[IncrementoMetricas]) -> int:
+        """Suma deltas de métricas a varias campanas de forma atómica. Retorna las filas actualizadas."""
+        pass
+    
+    @abstractmethod
+    def asignar_afiliados(self, campana_id: str, influencer_ids: Iterable[str]) -> int:
+        """Asigna afiliados a una campana. Retorna cuántos no estaban asignados."""
+        pass
+    
+    @abstractmethod
+    def retirar_afiliados(self, campana_id: str, influencer_ids: Iterable[str]) -> int:
+        """Retira afiliados de una campana. Retorna cuántos estaban asignados."""
+        pass
+    
+    @abstractmethod
+    def obtener_afiliados(self, campana_id: str, limite: int = 100, despues_de: Optional[str] = None) -> List[str]:
+        """Obtiene una página de ids de afiliados de una campana."""
+        pass
+    
+    @abstractmethod
+    def obtener_campanas_de_afiliado(self, influencer_id: str, limite: int = 100,
+                                     despues_de: Optional[str] = None) -> List[str]:
+        """Obtiene una página de ids de campanas a las que está asignado un influencer."""
+        pass
@@ -0,0 +1,137 @@
+"""
+Agregación en memoria de eventos de tracking (clics y conversiones).
+
+Los eventos se acumulan como deltas por campana en shards independientes
+(cada uno con su propio lock) y un hilo los vacía a la base de datos cada
+cierto intervalo con incrementos atómicos. Si la escritura falla, los
+deltas se reincorporan para el siguiente intento: no se pierden.
+"""
+
+import logging
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..dominio.objetos_valor import IncrementoMetricas
+
+logger = logging.getLogger(__name__)
+
+# Posiciones del acumulador de cada campana
+_CLICS, _CONVERSIONES, _INVERSION, _INGRESOS = range(4)
+
+
+class _Shard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.deltas: Dict[str, list] = {}
+        self.confirmaciones: List[Callable[[], None]] = []
+
+
+class AgregadorMetricas:
+    """Acumula IncrementoMetricas por campana y los persiste periódicamente.
+
+    ``persistir`` recibe la lista de incrementos (uno por campana) y debe
+    aplicarlos de forma atómica; ``confirmar`` (opcional en ``registrar``) se
+    invoca solo después de que el delta del evento quedó persistido, lo que
+    permite confirmar mensajes del broker después del flush.
+    """
+
+    def __init__(self,
+                 persistir: Callable[[List[IncrementoMetricas]], None],
+                 num_shards: int = 16,
+                 intervalo: float = 1.0):
+        self._persistir = persistir
+        self._shards = [_Shard() for _ in range(max(1, num_shards))]
+        self._intervalo = intervalo
+        self._flush_lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def _shard(self, campana_id: str) -> _Shard:
+        return self._shards[zlib.crc32(campana_id.encode()) % len(self._shards)]
+
+    def registrar(self, incremento: IncrementoMetricas, confirmar: Optional[Callable[[], None]] = None) -> None:
+        """Acumula un incremento en memoria."""
+        shard = self._shard(incremento.campana_id)
+        with shard.lock:
+            delta = shard.deltas.get(incremento.campana_id)
+            if delta is None:
+                shard.deltas[incremento.campana_id] = [
+                    incremento.clics, incremento.conversiones, incremento.inversion, incremento.ingresos
+                ]
+            else:
+                delta[_CLICS] += incremento.clics
+                delta[_CONVERSIONES] += incremento.conversiones
+                delta[_INVERSION] += incremento.inversion
+                delta[_INGRESOS] += incremento.ingresos
+            if confirmar is not None:
+                shard.confirmaciones.append(confirmar)
+
+    def pendientes(self) -> int:
+        """Número de campanas con deltas sin persistir."""
+        return sum(len(shard.deltas) for shard in self._shards)
+
+    def _drenar(self) -> Tuple[List[IncrementoMetricas], List[Callable[[], None]]]:
+        incrementos = []
+        confirmaciones = []
+        for shard in self._shards:
+            with shard.lock:
+                deltas, shard.deltas = shard.deltas, {}
+                confirmaciones_shard, shard.confirmaciones = shard.confirmaciones, []
+            confirmaciones.extend(confirmaciones_shard)
+            for campana_id, delta in deltas.items():
+                incrementos.append(IncrementoMetricas(campana_id, *delta))
+        return incrementos, confirmaciones
+
+    def _reincorporar(self, incrementos: List[IncrementoMetricas], confirmaciones: List[Callable[[], None]]) -> None:
+        for incremento in incrementos:
+            self.registrar(incremento)
+        if confirmaciones:
+            shard = self._shards[0]
+            with shard.lock:
+                shard.confirmaciones.extend(confirmaciones)
+
+    def flush(self) -> int:
+        """Persiste los deltas acumulados. Retorna el número de campanas actualizadas."""
+        with self._flush_lock:
+            incrementos, confirmaciones = self._drenar()
+            if not incrementos and not confirmaciones:
+                return 0
+            try:
+                if incrementos:
+                    # Orden estable por id: reduce interbloqueos entre procesos que vacían a la vez
+                    incrementos.sort(key=lambda incremento: incremento.campana_id)
+                    self._persistir(incrementos)
+            except Exception as e:
+                logger.error(f"METRICAS: Error persistiendo {len(incrementos)} incrementos, se reintentará: {e}")
+                self._reincorporar(incrementos, confirmaciones)
+                raise
+
+        for confirmar in confirmaciones:
+            try:
+                confirmar()
+            except Exception as e:
+                logger.warning(f"METRICAS: Error confirmando evento persistido: {e}")
+        return len(incrementos)
+
+    def _ejecutar(self) -> None:
+        while not self._detener.wait(self._intervalo):
+            try:
+                self.flush()
+            except Exception:
+                pass  # Ya registrado; los deltas quedaron reincorporados
+
+    def iniciar(self) -> 'AgregadorMetricas':
+        """Inicia el hilo de flush periódico."""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._ejecutar, name="metricas-flush", daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self) -> None:
+        """Detiene el hilo y hace un último flush."""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=self._intervalo * 2)
+            self._hilo = None
+        self.flush()
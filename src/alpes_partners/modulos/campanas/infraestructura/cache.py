@@ -0,0 +1,41 @@
+"""
+Invalidación de la cache de lecturas de campanas en el proceso de la API.
+
+Las campanas se crean y cambian de estado en otros procesos (consumidor de
+eventos, planificador), así que cada instancia de la API lee esos tópicos
+y limpia su propia cache; las asignaciones de afiliados ocurren en la API e
+invalidan directamente. Las métricas de tracking no invalidan: cambian con
+cada flush y se aceptan con el desfase del TTL de la cache.
+"""
+
+import logging
+
+from alpes_partners.config.settings import settings
+from alpes_partners.seedwork.infraestructura import utils
+from alpes_partners.seedwork.infraestructura.broker import crear_cliente
+from alpes_partners.seedwork.infraestructura.lectores import iniciar_lector
+from ..aplicacion.servicios import cache_campanas
+from .schema.v1.eventos import EventoCampanaCreada, EventoCampanasEstadoCambiado
+
+logger = logging.getLogger(__name__)
+
+
+def _invalidar(evento):
+    cache_campanas.invalidar()
+
+
+def iniciar_invalidacion_cache(cliente=None):
+    """Inicia los lectores que invalidan ``cache_campanas`` con cada creación o cambio de estado."""
+    cliente = cliente or crear_cliente()
+    # Lo publicado antes de arrancar ya está en la base: basta con leer desde ahora
+    desde = utils.time_millis()
+    iniciar_lector(
+        cliente, settings.eventos_topico_campanas, EventoCampanaCreada, _invalidar,
+        desde=desde, nombre="cache-campanas"
+    )
+    iniciar_lector(
+        cliente, settings.eventos_topico_campanas_estado, EventoCampanasEstadoCambiado, _invalidar,
+        desde=desde, nombre="cache-campanas-estado"
+    )
+    logger.info("CAMPANAS: Invalidación de cache por eventos iniciada")
+    return cliente
@@ -1,131 +1,174 @@
 """
-Consumidor de eventos para el módulo de campanas.
-Se suscribe a eventos de influencers y ejecuta comandos para crear campanas automáticamente.
+Consumidores de eventos para el módulo de campanas.
+Registra en el runtime de consumidores los handlers de eventos de influencers
+(crean campanas automáticamente) y de tracking (métricas). No levanta la app
+de Flask: cada mensaje se procesa en su propio contexto de trabajo.
 """
 
 import logging
-import time
-import uuid
 from datetime import datetime
+from typing import List
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 # Imports esenciales
-import pulsar
-import _pulsar
-from pulsar.schema import AvroSchema
-
-from alpes_partners.api import create_app
-from alpes_partners.seedwork.infraestructura import utils
+from alpes_partners.config.settings import settings
+from alpes_partners.seedwork.dominio.identificadores import nuevo_id
+from alpes_partners.seedwork.dominio.excepciones import ExcepcionDominio
+from alpes_partners.seedwork.infraestructura.contexto import contexto_trabajo
+from alpes_partners.seedwork.infraestructura.consumidores import (
+    Entrega, RuntimeConsumidores, Suscripcion, TODOS_LOS_TIPOS
+)
+from alpes_partners.seedwork.infraestructura.idempotencia import RegistroIdempotencia
 from alpes_partners.modulos.influencers.infraestructura.schema.v1.eventos import EventoInfluencerRegistrado
-from alpes_partners.modulos.campanas.aplicacion.comandos.crear_campana import RegistrarCampana, ejecutar_comando_registrar_campana
+from alpes_partners.modulos.campanas.aplicacion.comandos.crear_campana import RegistrarCampana
+from alpes_partners.modulos.campanas.aplicacion.comandos.registrar_campanas_lote import (
+    RegistrarCampanasLote, ejecutar_comando_registrar_campanas_lote
+)
+from alpes_partners.modulos.campanas.aplicacion.servicios import ServicioTracking
+from alpes_partners.modulos.campanas.infraestructura.metricas import iniciar_agregador_metricas
+from alpes_partners.modulos.campanas.infraestructura.schema.v1.eventos import EventoTracking
+
+# Registra los handlers que publican los eventos de integración tras el commit
+import alpes_partners.modulos.campanas.aplicacion  # noqa: F401
+
+SUSCRIPCION_INFLUENCERS = 'campanas-sub-eventos-influencers'
 
-# Crear instancia de aplicación Flask para el contexto
-app = create_app({'TESTING': False})
+# Eventos de influencers ya procesados (la redelivery no crea campanas repetidas)
+registro_idempotencia = RegistroIdempotencia(SUSCRIPCION_INFLUENCERS)
 
 
-def suscribirse_a_eventos_influencers_desde_campanas():
+def procesar_influencers_registrados(entregas: List[Entrega]):
     """
-    Suscribirse a eventos de influencers para crear campanas automáticamente.
+    Handler de InfluencerRegistrado: crea una campana por influencer con el comando en lote.
+    
+    Un solo evento también pasa por el lote, que omite los nombres ya
+    registrados en lugar de fallar.
     """
-    cliente = None
-    try:
-        logger.info("🔌 CAMPAnAS: Conectando a Pulsar...")
-        cliente = pulsar.Client(f'pulsar://{utils.broker_host()}:6650')
-        
-        # Consumidor para eventos de influencers
-        consumidor = cliente.subscribe(
-            'eventos-influencers', 
-            consumer_type=_pulsar.ConsumerType.Shared,
-            subscription_name='campanas-sub-eventos-influencers', 
-            schema=AvroSchema(EventoInfluencerRegistrado)
-        )
-
-        logger.info("CAMPANAS: Suscrito a eventos de influencers")
-        logger.info("CAMPANAS: Esperando eventos...")
-        
-        while True:
+    logger.info(f"CAMPANAS: {len(entregas)} eventos de influencers recibidos")
+    _procesar_eventos_influencer([(entrega.mensaje_id, entrega.evento) for entrega in entregas])
+
+
+def crear_handler_tracking(agregador):
+    """
+    Handler de eventos de clic y conversión: los acumula en el agregador en memoria.
+    
+    Cada evento se confirma solo después de que su delta quedó persistido
+    en el flush periódico del agregador.
+    """
+    def registrar_tracking(entregas: List[Entrega]):
+        for entrega in entregas:
+            datos = entrega.evento.data
             try:
-                mensaje = consumidor.receive()
-                logger.info(f"CAMPANAS: Evento recibido - {mensaje.value()}")
-                
-                # Procesar evento
-                _procesar_evento_influencer(mensaje.value())
-                
-                # Confirmar procesamiento
-                consumidor.acknowledge(mensaje)
-                logger.info("CAMPANAS: Evento procesado y confirmado")
-                
+                incremento = ServicioTracking.a_incremento(
+                    campana_id=datos.id_campana,
+                    tipo=datos.tipo,
+                    cantidad=datos.cantidad if datos.cantidad is not None else 1,
+                    valor=datos.valor or 0.0,
+                    costo=datos.costo or 0.0
+                )
             except Exception as e:
-                logger.error(f"CAMPANAS: Error procesando evento: {e}")
-                time.sleep(5)  # Esperar antes de continuar
-                
-    except Exception as e:
-        logger.error(f"CAMPANAS: Error en consumidor: {e}")
-    finally:
-        if cliente:
-            cliente.close()
+                # Un evento inválido no se reintenta
+                logger.warning(f"CAMPANAS: Evento de tracking descartado: {e}")
+                entrega.confirmar()
+                continue
+            agregador.registrar(incremento, confirmar=entrega.confirmar)
+    return registrar_tracking
 
 
-def _procesar_evento_influencer(evento):
+def registrar_consumidores(runtime: RuntimeConsumidores) -> RuntimeConsumidores:
     """
-    Procesa un evento de influencer y crea una campana automáticamente.
+    Registra en el runtime las suscripciones del módulo de campanas.
+    """
+    registro_idempotencia.cargar()
+    registro_idempotencia.iniciar_limpieza()
+    agregador = iniciar_agregador_metricas()
+    
+    runtime.registrar(Suscripcion(
+        nombre=SUSCRIPCION_INFLUENCERS,
+        topico=settings.eventos_topico_influencers,
+        schema=EventoInfluencerRegistrado,
+        handlers={'InfluencerRegistrado': procesar_influencers_registrados},
+        # En ráfagas de registros se reciben hasta 500 eventos (o lo llegado en 200 ms) por lote
+        max_lote=500,
+        espera_lote_ms=200,
+        # Tras 10 reentregas el evento pasa al tópico de dead letter en lugar de reintentarse siempre
+        max_reentregas=10
+    ))
+    runtime.registrar(Suscripcion(
+        nombre='campanas-sub-eventos-tracking',
+        topico=settings.eventos_topico_tracking,
+        schema=EventoTracking,
+        handlers={TODOS_LOS_TIPOS: crear_handler_tracking(agregador)},
+        max_lote=1000,
+        espera_lote_ms=100,
+        prefetch=10000,
+        # Se confirma tras persistir el delta; al detener, el último flush confirma lo pendiente
+        confirmacion_manual=True,
+        al_detener=agregador.detener
+    ))
+    return runtime
+
+
+def _procesar_eventos_influencer(eventos):
     """
-    with app.app_context():
+    Procesa varios eventos ``(mensaje_id, evento)`` de influencer creando sus campanas con un solo comando en lote.
+    
+    Los errores de dominio (nombre repetido, payload inválido) no se reintentan:
+    el evento se omite y el runtime lo confirma. Solo los errores de
+    infraestructura se propagan para que el broker lo reentregue.
+    """
+    with contexto_trabajo() as sesion:
         try:
-            # Extraer datos del evento
-            datos = _extraer_datos_evento(evento)
-            
-            # Solo procesar eventos de registro de influencers
-            if not _es_evento_registro(evento):
-                logger.info(f"CAMPANAS: Evento ignorado - Tipo: {type(evento).__name__}")
+            candidatos = {
+                mensaje_id: evento for mensaje_id, evento in eventos
+                if registro_idempotencia.es_nuevo(mensaje_id)
+            }
+            # Las marcas se confirman en la misma transacción que las campanas del lote
+            nuevos = registro_idempotencia.reclamar_lote(candidatos.keys())
+            registros = [evento for mensaje_id, evento in candidatos.items() if mensaje_id in nuevos]
+            if len(registros) < len(eventos):
+                logger.info(f"CAMPANAS: {len(eventos) - len(registros)} eventos duplicados omitidos")
+            if not registros:
                 return
             
-            logger.info("CAMPANAS: Procesando registro de influencer para crear campana")
+            comandos = []
+            for evento in registros:
+                try:
+                    comandos.append(_crear_comando_campana(_datos_influencer(evento)))
+                except Exception as e:
+                    logger.warning(f"CAMPANAS: Evento de influencer inválido, se omite: {e}")
             
-            # Crear comando para registrar campana
-            comando = _crear_comando_campana(datos)
+            campanas = ejecutar_comando_registrar_campanas_lote(RegistrarCampanasLote(campanas=comandos)) if comandos else []
+            if not campanas:
+                # Sin campanas nuevas el comando no confirma: las marcas se guardan aquí
+                sesion.commit()
             
-            # Ejecutar comando usando la función específica del módulo
-            ejecutar_comando_registrar_campana(comando)
-            
-            logger.info(f"CAMPANAS: Campana creada para influencer: {datos.get('nombre', 'N/A')}")
+            logger.info(f"CAMPANAS: {len(campanas)} campanas creadas para {len(registros)} influencers")
             
+        except ExcepcionDominio as e:
+            # Reintentar no cambia el resultado: se confirma para no reentregarlo indefinidamente
+            logger.warning(f"CAMPANAS: Eventos de influencers descartados por error de dominio: {e}")
         except Exception as e:
-            logger.error(f"CAMPANAS: Error procesando evento: {e}")
+            logger.error(f"CAMPANAS: Error procesando lote de eventos: {e}")
             import traceback
             logger.error(f"CAMPANAS: Traceback: {traceback.format_exc()}")
+            # El runtime rechaza la entrega; la marca de idempotencia no se confirmó, así que el reintento es seguro
+            raise
 
 
-def _es_evento_registro(evento):
-    """
-    Verifica si el evento es un registro de influencer.
-    """
-    tipo_evento = type(evento).__name__
-    return 'InfluencerRegistrado' in tipo_evento
-
-
-def _extraer_datos_evento(evento):
+def _datos_influencer(evento: EventoInfluencerRegistrado) -> dict:
     """
-    Extrae los datos relevantes del evento.
+    Extrae los datos del influencer del payload del evento.
     """
-    datos = {}
-    
-    if hasattr(evento, 'data'):
-        data = evento.data
-        
-        # Extraer campos conocidos
-        if hasattr(data, 'id_influencer'):
-            datos['id_influencer'] = str(data.id_influencer)
-        if hasattr(data, 'nombre'):
-            datos['nombre'] = str(data.nombre)
-        if hasattr(data, 'email'):
-            datos['email'] = str(data.email)
-        if hasattr(data, 'categorias'):
-            datos['categorias'] = [str(cat) for cat in data.categorias] if data.categorias else []
-    
-    return datos
+    data = evento.data
+    return {
+        'id_influencer': data.id_influencer,
+        'nombre': data.nombre,
+        'email': data.email,
+        'categorias': list(data.categorias or [])
+    }
 
 
 def _crear_comando_campana(datos):
@@ -133,7 +176,7 @@ def _crear_comando_campana(datos):
     Crea el comando para registrar una campana basada en los datos del influencer.
     """
     fecha_actual = datetime.utcnow()
-    campana_id = str(uuid.uuid4())
+    campana_id = nuevo_id()
     
     return RegistrarCampana(
         fecha_creacion=fecha_actual.isoformat(),
@@ -0,0 +1,72 @@
+from pulsar.schema import *
+
+from alpes_partners.modulos.campanas.infraestructura.schema.v1.eventos import (
+    EventoCampanaCreada, CampanaCreadaPayload,
+    EventoCampanasEstadoCambiado, CampanasEstadoCambiadoPayload
+)
+from alpes_partners.seedwork.dominio.identificadores import nuevo_id
+from alpes_partners.seedwork.infraestructura.publicadores import obtener_publicador
+
+import datetime
+
+epoch = datetime.datetime.utcfromtimestamp(0)
+
+def unix_time_millis(dt):
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return (dt - epoch).total_seconds() * 1000.0
+
+
+class DespachadorCampanas:
+    def _publicar_mensaje(self, mensaje, topico, schema, sincrono=False):
+        # Productor con nombre y sequence ids del proceso (deduplicación en el broker)
+        publicador = obtener_publicador(topico, schema, "alpes-partners-campanas")
+        if sincrono:
+            publicador.publicar(mensaje)
+        else:
+            # Se agrupa en el lote abierto del productor; el ack llega a las métricas del publicador
+            publicador.publicar_async(mensaje)
+
+    def publicar_evento_campana_creada(self, evento, topico='eventos-campanas'):
+        """Publica evento cuando una campana es creada."""
+        payload = CampanaCreadaPayload(
+            id_campana=str(evento.campana_id),
+            nombre=str(evento.nombre),
+            descripcion=str(evento.descripcion),
+            tipo_comision=evento.tipo_comision.value,
+            valor_comision=float(evento.valor_comision),
+            moneda=str(evento.moneda),
+            categorias_objetivo=list(evento.categorias_objetivo or []),
+            fecha_inicio=int(unix_time_millis(evento.fecha_inicio))
+        )
+        evento_integracion = EventoCampanaCreada(
+            id=str(evento.id),
+            time=int(unix_time_millis(evento.fecha_creacion)),
+            specversion="1.0",
+            type="CampanaCreada",
+            datacontenttype="application/json",
+            service_name="alpes-partners-campanas",
+            data=payload
+        )
+        self._publicar_mensaje(evento_integracion, topico, EventoCampanaCreada)
+
+    def publicar_evento_campanas_estado_cambiado(self, ids_campanas, estado_anterior, estado_nuevo,
+                                                 fecha_cambio, topico='eventos-campanas-estado'):
+        """Publica un único evento para un lote de campanas que cambiaron de estado."""
+        payload = CampanasEstadoCambiadoPayload(
+            ids_campanas=[str(id_campana) for id_campana in ids_campanas],
+            estado_anterior=estado_anterior,
+            estado_nuevo=estado_nuevo,
+            fecha_cambio=int(unix_time_millis(fecha_cambio))
+        )
+        evento_integracion = EventoCampanasEstadoCambiado(
+            id=nuevo_id(),
+            time=int(unix_time_millis(fecha_cambio)),
+            specversion="1.0",
+            type="CampanasEstadoCambiado",
+            datacontenttype="application/json",
+            service_name="alpes-partners-campanas",
+            data=payload
+        )
+        # Síncrono: el planificador confirma la transición solo después del ack del broker
+        self._publicar_mensaje(evento_integracion, topico, EventoCampanasEstadoCambiado, sincrono=True)
@@ -0,0 +1,333 @@
+"""
+Motor de emparejamiento campana–influencer con índices invertidos en memoria.
+
+Las campanas activas se indexan por categoría, país y tipo (tier) de
+influencer; los influencers, por las mismas dimensiones con ids internos
+enteros en listas ordenadas. Una restricción vacía en los criterios de la
+campana significa "cualquiera" y se indexa bajo un comodín.
+"""
+
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+COMODIN = '*'
+
+TIPOS_INFLUENCER = frozenset({'nano', 'micro', 'macro', 'mega', 'celebrity'})
+TIPO_AFILIADO_INFLUENCER = 'influencer'
+
+
+def _normalizar(valores: Optional[Iterable[str]]) -> FrozenSet[str]:
+    return frozenset(v.strip().lower() for v in (valores or []) if v and v.strip())
+
+
+@dataclass(frozen=True)
+class PerfilInfluencerEmparejamiento:
+    """Proyección mínima de un influencer para el emparejamiento."""
+    id: str
+    categorias: FrozenSet[str] = frozenset()
+    paises: FrozenSet[str] = frozenset()
+    tipo: Optional[str] = None
+    seguidores: int = 0
+    engagement: float = 0.0
+
+    @classmethod
+    def crear(cls, id, categorias=None, paises=None, tipo=None, seguidores=0, engagement=0.0):
+        return cls(
+            id=str(id),
+            categorias=_normalizar(categorias),
+            paises=_normalizar(paises),
+            tipo=tipo.lower() if tipo else None,
+            seguidores=int(seguidores or 0),
+            engagement=float(engagement or 0.0)
+        )
+
+
+@dataclass(frozen=True)
+class PerfilCampanaEmparejamiento:
+    """Proyección de los CriteriosAfiliado de una campana activa."""
+    id: str
+    categorias: FrozenSet[str] = frozenset()
+    paises: FrozenSet[str] = frozenset()
+    tipos: FrozenSet[str] = frozenset()
+    acepta_influencers: bool = True
+    seguidores_minimos: int = 0
+    engagement_minimo: float = 0.0
+
+    @classmethod
+    def desde_criterios(cls, id, tipos_permitidos=None, categorias_requeridas=None,
+                        paises_permitidos=None, metricas_minimas=None):
+        """Construye el perfil a partir de los campos de CriteriosAfiliado.
+
+        ``tipos_permitidos`` mezcla tipos de afiliado ("influencer") y tiers
+        ("nano", "micro", ...). Si restringe tipos sin incluir influencers
+        ni ningún tier, la campana no admite influencers.
+        """
+        tipos = _normalizar(tipos_permitidos)
+        tiers = tipos & TIPOS_INFLUENCER
+        acepta = not tipos or TIPO_AFILIADO_INFLUENCER in tipos or bool(tiers)
+        metricas = metricas_minimas or {}
+        return cls(
+            id=str(id),
+            categorias=_normalizar(categorias_requeridas),
+            paises=_normalizar(paises_permitidos),
+            tipos=tiers,
+            acepta_influencers=acepta,
+            seguidores_minimos=int(metricas.get('seguidores', metricas.get('total_seguidores', 0)) or 0),
+            engagement_minimo=float(metricas.get('engagement', metricas.get('engagement_promedio', 0.0)) or 0.0)
+        )
+
+
+def es_elegible(campana: PerfilCampanaEmparejamiento, influencer: PerfilInfluencerEmparejamiento) -> bool:
+    """Evalúa los criterios de la campana contra un influencer.
+
+    Categorías y países: basta con una coincidencia. Tier: el del
+    influencer debe estar permitido. Métricas: umbrales mínimos.
+    """
+    if not campana.acepta_influencers:
+        return False
+    if campana.categorias and campana.categorias.isdisjoint(influencer.categorias):
+        return False
+    if campana.paises and campana.paises.isdisjoint(influencer.paises):
+        return False
+    if campana.tipos and influencer.tipo not in campana.tipos:
+        return False
+    return (influencer.seguidores >= campana.seguidores_minimos
+            and influencer.engagement >= campana.engagement_minimo)
+
+
+def _recorrer_desde(lista: array, cursor: int):
+    """Recorre perezosamente una lista ordenada desde el primer valor >= cursor (sin copiarla)."""
+    for i in range(bisect_left(lista, cursor), len(lista)):
+        yield lista[i]
+
+
+class _IndiceCampanas:
+    """Campanas activas indexadas por categoría, país y tier (pocas, ids como texto)."""
+
+    def __init__(self):
+        self.perfiles: Dict[str, PerfilCampanaEmparejamiento] = {}
+        self.por_categoria: Dict[str, Set[str]] = {}
+        self.por_pais: Dict[str, Set[str]] = {}
+        self.por_tipo: Dict[str, Set[str]] = {}
+
+    def _dimensiones(self, perfil: PerfilCampanaEmparejamiento):
+        return (
+            (self.por_categoria, perfil.categorias or (COMODIN,)),
+            (self.por_pais, perfil.paises or (COMODIN,)),
+            (self.por_tipo, perfil.tipos or (COMODIN,)),
+        )
+
+    def agregar(self, perfil: PerfilCampanaEmparejamiento) -> None:
+        self.eliminar(perfil.id)
+        if not perfil.acepta_influencers:
+            return
+        self.perfiles[perfil.id] = perfil
+        for indice, claves in self._dimensiones(perfil):
+            for clave in claves:
+                indice.setdefault(clave, set()).add(perfil.id)
+
+    def eliminar(self, id: str) -> None:
+        perfil = self.perfiles.pop(id, None)
+        if perfil is None:
+            return
+        for indice, claves in self._dimensiones(perfil):
+            for clave in claves:
+                ids = indice.get(clave)
+                if ids is not None:
+                    ids.discard(id)
+
+    @staticmethod
+    def _candidatos(indice: Dict[str, Set[str]], claves: Iterable[str]) -> Set[str]:
+        resultado = set(indice.get(COMODIN, ()))
+        for clave in claves:
+            resultado |= indice.get(clave, set())
+        return resultado
+
+    def elegibles_para(self, influencer: PerfilInfluencerEmparejamiento) -> List[str]:
+        candidatos = self._candidatos(self.por_categoria, influencer.categorias)
+        if candidatos:
+            candidatos &= self._candidatos(self.por_pais, influencer.paises)
+        if candidatos:
+            candidatos &= self._candidatos(self.por_tipo, (influencer.tipo,) if influencer.tipo else ())
+        perfiles = self.perfiles
+        elegibles = []
+        for id in candidatos:
+            # Sin lock, una campana puede retirarse entre el cruce de índices y esta lectura
+            perfil = perfiles.get(id)
+            if perfil is not None and es_elegible(perfil, influencer):
+                elegibles.append(id)
+        return sorted(elegibles)
+
+
+class _IndiceInfluencers:
+    """Influencers con ids internos enteros y listas invertidas ordenadas.
+
+    Las listas (``array('I')``) quedan ordenadas porque los ids internos se
+    asignan de forma creciente. Una actualización deja una lápida en la
+    posición anterior y agrega al final; la reconstrucción compacta.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.perfiles: List[Optional[PerfilInfluencerEmparejamiento]] = []
+        self.posiciones: Dict[str, int] = {}
+        self.por_categoria: Dict[str, array] = {}
+        self.por_pais: Dict[str, array] = {}
+        self.por_tipo: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.posiciones)
+
+    def agregar(self, perfil: PerfilInfluencerEmparejamiento) -> None:
+        self.eliminar(perfil.id)
+        posicion = len(self.ids)
+        self.ids.append(perfil.id)
+        self.perfiles.append(perfil)
+        self.posiciones[perfil.id] = posicion
+        for categoria in perfil.categorias:
+            self.por_categoria.setdefault(categoria, array('I')).append(posicion)
+        for pais in perfil.paises:
+            self.por_pais.setdefault(pais, array('I')).append(posicion)
+        if perfil.tipo:
+            self.por_tipo.setdefault(perfil.tipo, array('I')).append(posicion)
+
+    def eliminar(self, id: str) -> None:
+        posicion = self.posiciones.pop(id, None)
+        if posicion is not None:
+            self.perfiles[posicion] = None
+
+    def _listas_guia(self, campana: PerfilCampanaEmparejamiento) -> Optional[List[array]]:
+        """Elige la dimensión restringida más selectiva para recorrer; None = todas las posiciones."""
+        opciones = []
+        for indice, claves in (
+            (self.por_categoria, campana.categorias),
+            (self.por_pais, campana.paises),
+            (self.por_tipo, campana.tipos),
+        ):
+            if claves:
+                listas = [indice[c] for c in claves if c in indice]
+                opciones.append((sum(len(l) for l in listas), listas))
+        if not opciones:
+            return None
+        return min(opciones, key=lambda opcion: opcion[0])[1]
+
+    def elegibles_para(self, campana: PerfilCampanaEmparejamiento, limite: int,
+                       cursor: int = 0) -> Tuple[List[str], Optional[int]]:
+        if not campana.acepta_influencers:
+            return [], None
+
+        listas = self._listas_guia(campana)
+        if listas is None:
+            recorrido = iter(range(cursor, len(self.ids)))
+        else:
+            recorrido = heapq.merge(*(_recorrer_desde(l, cursor) for l in listas))
+
+        resultado = []
+        anterior = -1
+        for posicion in recorrido:
+            if posicion == anterior:
+                continue
+            anterior = posicion
+            perfil = self.perfiles[posicion]
+            if perfil is not None and es_elegible(campana, perfil):
+                resultado.append(perfil.id)
+                if len(resultado) >= limite:
+                    return resultado, posicion + 1
+        return resultado, None
+
+
+class MotorEmparejamiento:
+    """Índices de emparejamiento con reconstrucción completa e intercambio atómico.
+
+    Las lecturas toman la referencia vigente de cada índice sin bloquear.
+    Durante una reconstrucción las actualizaciones se aplican al índice
+    vigente y se registran para re-aplicarse sobre el nuevo antes del
+    intercambio, de modo que no se pierden.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._campanas = _IndiceCampanas()
+        self._influencers = _IndiceInfluencers()
+        self._pendientes: Optional[List[Callable[[_IndiceInfluencers, _IndiceCampanas], None]]] = None
+
+    @property
+    def total_campanas(self) -> int:
+        return len(self._campanas.perfiles)
+
+    @property
+    def total_influencers(self) -> int:
+        return len(self._influencers)
+
+    def reconstruir(self,
+                    influencers: Iterable[PerfilInfluencerEmparejamiento],
+                    campanas: Iterable[PerfilCampanaEmparejamiento]) -> None:
+        """Reconstruye ambos índices desde cero (p. ej. desde proyecciones en streaming)."""
+        with self._lock:
+            self._pendientes = []
+        try:
+            nuevo_influencers = _IndiceInfluencers()
+            for perfil in influencers:
+                nuevo_influencers.agregar(perfil)
+            nuevo_campanas = _IndiceCampanas()
+            for perfil in campanas:
+                nuevo_campanas.agregar(perfil)
+
+            with self._lock:
+                for operacion in self._pendientes:
+                    operacion(nuevo_influencers, nuevo_campanas)
+                self._influencers, self._campanas = nuevo_influencers, nuevo_campanas
+        finally:
+            with self._lock:
+                self._pendientes = None
+
+    def _aplicar(self, operacion: Callable[[_IndiceInfluencers, _IndiceCampanas], None]) -> None:
+        with self._lock:
+            operacion(self._influencers, self._campanas)
+            if self._pendientes is not None:
+                self._pendientes.append(operacion)
+
+    def actualizar_influencer(self, perfil: PerfilInfluencerEmparejamiento) -> None:
+        self._aplicar(lambda influencers, campanas: influencers.agregar(perfil))
+
+    def registrar_influencer(self, perfil: PerfilInfluencerEmparejamiento) -> None:
+        """Indexa un influencer nuevo sin pisar un perfil más completo ya indexado."""
+        def operacion(influencers, campanas):
+            if perfil.id not in influencers.posiciones:
+                influencers.agregar(perfil)
+        self._aplicar(operacion)
+
+    def eliminar_influencer(self, id: str) -> None:
+        self._aplicar(lambda influencers, campanas: influencers.eliminar(str(id)))
+
+    def actualizar_campana(self, perfil: PerfilCampanaEmparejamiento) -> None:
+        self._aplicar(lambda influencers, campanas: campanas.agregar(perfil))
+
+    def eliminar_campana(self, id: str) -> None:
+        self._aplicar(lambda influencers, campanas: campanas.eliminar(str(id)))
+
+    def campanas_para_influencer(self, id_influencer: str) -> Optional[List[str]]:
+        """Ids de campanas activas para las que el influencer es elegible (None si no está indexado)."""
+        influencers = self._influencers
+        posicion = influencers.posiciones.get(str(id_influencer))
+        if posicion is None:
+            return None
+        return self._campanas.elegibles_para(influencers.perfiles[posicion])
+
+    def campanas_para_perfil(self, perfil: PerfilInfluencerEmparejamiento) -> List[str]:
+        return self._campanas.elegibles_para(perfil)
+
+    def influencers_para_campana(self, id_campana: str, limite: int = 100,
+                                 cursor: int = 0) -> Optional[Tuple[List[str], Optional[int]]]:
+        """Página de influencers elegibles y cursor siguiente (None si la campana no está activa).
+
+        El cursor es una posición interna: deja de ser válido tras una reconstrucción.
+        """
+        perfil = self._campanas.perfiles.get(str(id_campana))
+        if perfil is None:
+            return None
+        return self._influencers.elegibles_para(perfil, limite, cursor)
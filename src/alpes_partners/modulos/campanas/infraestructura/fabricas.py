@@ -31,7 +31,7 @@ class FabricaRepositorioCampanas:
     def crear_objeto(self, obj: type, mapeador: Any = None) -> RepositorioCampanasSQLAlchemy:
         if obj == RepositorioCampanasSQLAlchemy.__class__:
             # Crear una instancia del repositorio SIN sesión (como en el tutorial)
-            # El repositorio usará db.session directamente
+            # El repositorio usará la sesión actual
             return RepositorioCampanasSQLAlchemy()
         else:
             raise ExcepcionFabricaCampanas(f"No se puede crear repositorio para el tipo: {obj}")
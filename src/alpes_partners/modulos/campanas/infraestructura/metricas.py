@@ -0,0 +1,38 @@
+"""
+Configuración del agregador de métricas de tracking en cada proceso.
+"""
+
+import atexit
+import logging
+from typing import List, Optional
+
+from alpes_partners.config.settings import settings
+from alpes_partners.seedwork.infraestructura.contexto import contexto_trabajo
+from ..dominio.objetos_valor import IncrementoMetricas
+from .agregador import AgregadorMetricas
+from .repositorios import RepositorioCampanasSQLAlchemy
+
+logger = logging.getLogger(__name__)
+
+agregador_metricas: Optional[AgregadorMetricas] = None
+
+
+def persistir_incrementos(incrementos: List[IncrementoMetricas]) -> None:
+    """Persistencia de incrementos en su propia sesión y transacción (corre en el hilo del flush)."""
+    with contexto_trabajo() as sesion:
+        RepositorioCampanasSQLAlchemy().aplicar_incrementos_metricas(incrementos)
+        sesion.commit()
+
+
+def iniciar_agregador_metricas() -> AgregadorMetricas:
+    """Crea (una vez por proceso) e inicia el agregador con flush periódico."""
+    global agregador_metricas
+    if agregador_metricas is None:
+        agregador_metricas = AgregadorMetricas(
+            persistir_incrementos,
+            num_shards=settings.metricas_shards,
+            intervalo=settings.metricas_flush_intervalo
+        ).iniciar()
+        atexit.register(agregador_metricas.detener)
+        logger.info("METRICAS: Agregador de métricas iniciado")
+    return agregador_metricas
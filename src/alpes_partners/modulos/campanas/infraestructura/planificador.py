@@ -0,0 +1,139 @@
+"""
+Planificador del ciclo de vida de campanas.
+
+En cada ciclo activa las campanas en BORRADOR cuya fecha de inicio ya pasó
+y finaliza las ACTIVAS y PAUSADAS cuya fecha de fin ya pasó (una pausa no
+extiende el periodo: reanudarla después de la fecha de fin no tiene sentido). Cada transición es un
+único UPDATE por lote sobre idx_campanas_estado_fechas, sin cargar los
+agregados, y por cada lote confirmado se publica un solo evento con los ids
+afectados.
+
+Las filas se toman con FOR UPDATE SKIP LOCKED, así que varias instancias
+del planificador pueden ejecutarse a la vez sin procesar la misma campana.
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select, update, or_
+
+from alpes_partners.config.settings import settings
+from alpes_partners.seedwork.infraestructura.database import SessionLocal
+from .schema.campanas import Campanas, EstadoCampanaEnum
+
+logger = logging.getLogger(__name__)
+
+
+def _condicion_vencimiento(origen: EstadoCampanaEnum, ahora: datetime):
+    if origen == EstadoCampanaEnum.BORRADOR:
+        # Solo se activan las que siguen vigentes; las vencidas en borrador no se tocan
+        return [
+            Campanas.fecha_inicio <= ahora,
+            or_(Campanas.fecha_fin.is_(None), Campanas.fecha_fin > ahora)
+        ]
+    return [Campanas.fecha_fin <= ahora]
+
+
+def transicionar_lote(sesion, origen: EstadoCampanaEnum, destino: EstadoCampanaEnum,
+                      ahora: datetime, limite: int) -> List[str]:
+    """Cambia de estado hasta ``limite`` campanas vencidas. Retorna sus ids."""
+    vencidas = (
+        select(Campanas.id)
+        .where(Campanas.estado == origen, *_condicion_vencimiento(origen, ahora))
+        .limit(limite)
+        .with_for_update(skip_locked=True)
+    )
+    valores = {
+        'estado': destino,
+        'version': Campanas.version + 1,
+        'fecha_actualizacion': ahora
+    }
+    if destino == EstadoCampanaEnum.ACTIVA:
+        valores['fecha_activacion'] = ahora
+
+    resultado = sesion.execute(
+        update(Campanas)
+        .where(Campanas.id.in_(vencidas.scalar_subquery()))
+        .values(**valores)
+        .returning(Campanas.id)
+        .execution_options(synchronize_session=False)
+    )
+    return [str(fila.id) for fila in resultado]
+
+
+class PlanificadorCampanas:
+    """Aplica las transiciones de estado por fecha en lotes."""
+
+    TRANSICIONES = (
+        (EstadoCampanaEnum.BORRADOR, EstadoCampanaEnum.ACTIVA),
+        (EstadoCampanaEnum.ACTIVA, EstadoCampanaEnum.FINALIZADA),
+        (EstadoCampanaEnum.PAUSADA, EstadoCampanaEnum.FINALIZADA),
+    )
+
+    def __init__(self,
+                 publicar: Callable[[List[str], str, str, datetime], None],
+                 sesiones: Callable = SessionLocal,
+                 tamano_lote: Optional[int] = None):
+        self._publicar = publicar
+        self._sesiones = sesiones
+        self._tamano_lote = tamano_lote or settings.planificador_tamano_lote
+
+    def ejecutar_ciclo(self, ahora: Optional[datetime] = None) -> Dict[str, int]:
+        """Procesa todas las campanas vencidas. Retorna cuántas pasaron a cada estado."""
+        ahora = ahora or datetime.now(timezone.utc)
+        totales = {}
+        for origen, destino in self.TRANSICIONES:
+            total = 0
+            while True:
+                with self._sesiones() as sesion:
+                    ids = transicionar_lote(sesion, origen, destino, ahora, self._tamano_lote)
+                    sesion.commit()
+                if ids:
+                    self._publicar_lote(ids, origen, destino, ahora)
+                total += len(ids)
+                if len(ids) < self._tamano_lote:
+                    break
+            totales[destino.value] = totales.get(destino.value, 0) + total
+            if total:
+                logger.info(f"PLANIFICADOR: {total} campanas {origen.value} -> {destino.value}")
+        return totales
+
+    def _publicar_lote(self, ids: List[str], origen: EstadoCampanaEnum, destino: EstadoCampanaEnum,
+                       ahora: datetime) -> None:
+        # Se publica después del commit: los consumidores releen la campana al
+        # recibir el evento y antes del commit todavía verían el estado anterior
+        try:
+            self._publicar(ids, origen.value, destino.value, ahora)
+        except Exception as e:
+            # El cambio ya está confirmado: lo recuperan la reconstrucción periódica
+            # del motor de emparejamiento y el TTL de la cache de campanas
+            logger.error(f"PLANIFICADOR: No se publicó el cambio de {len(ids)} campanas "
+                         f"{origen.value} -> {destino.value}: {e} - IDs: {ids}")
+
+    def ejecutar(self, intervalo: Optional[int] = None) -> None:
+        """Ejecuta ciclos indefinidamente."""
+        intervalo = intervalo or settings.planificador_intervalo
+        logger.info(f"PLANIFICADOR: Iniciado (intervalo {intervalo}s, lotes de {self._tamano_lote})")
+        while True:
+            inicio = time.monotonic()
+            try:
+                self.ejecutar_ciclo()
+            except Exception as e:
+                logger.error(f"PLANIFICADOR: Error en ciclo: {e}")
+            time.sleep(max(0.0, intervalo - (time.monotonic() - inicio)))
+
+
+def crear_planificador() -> PlanificadorCampanas:
+    """Planificador que publica los lotes en el tópico de cambios de estado."""
+    from .despachadores import DespachadorCampanas
+
+    despachador = DespachadorCampanas()
+
+    def publicar(ids, estado_anterior, estado_nuevo, fecha):
+        despachador.publicar_evento_campanas_estado_cambiado(
+            ids, estado_anterior, estado_nuevo, fecha, topico=settings.eventos_topico_campanas_estado
+        )
+
+    return PlanificadorCampanas(publicar)
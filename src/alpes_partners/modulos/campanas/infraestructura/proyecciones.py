@@ -0,0 +1,167 @@
+"""
+Proyecciones de lectura que alimentan el motor de emparejamiento.
+
+El motor se reconstruye completo desde la base de datos (lecturas en
+streaming de solo las columnas necesarias) al iniciar y periódicamente, y
+entre reconstrucciones se mantiene al día con los eventos
+InfluencerRegistrado, CampanaCreada y los cambios de estado del planificador.
+"""
+
+import logging
+import threading
+import time
+from typing import Iterator, Optional
+
+from alpes_partners.config.settings import settings
+from alpes_partners.seedwork.infraestructura.database import SessionLocal
+from alpes_partners.modulos.influencers.infraestructura.modelos import InfluencerModelo
+from .schema.campanas import Campanas, EstadoCampanaEnum
+from .emparejamiento import (
+    MotorEmparejamiento, PerfilInfluencerEmparejamiento, PerfilCampanaEmparejamiento
+)
+
+logger = logging.getLogger(__name__)
+
+# Motor compartido por la API y los lectores de eventos del proceso
+motor_emparejamiento = MotorEmparejamiento()
+
+TAMANO_LOTE_LECTURA = 10000
+ESTADOS_INFLUENCER_EXCLUIDOS = ('inactivo', 'suspendido')
+
+
+def _perfil_influencer(fila) -> PerfilInfluencerEmparejamiento:
+    demografia = fila.demografia or {}
+    return PerfilInfluencerEmparejamiento.crear(
+        id=fila.id,
+        categorias=fila.categorias,
+        paises=demografia.get('paises_principales'),
+        tipo=fila.tipo_principal,
+        seguidores=fila.total_seguidores,
+        engagement=fila.engagement_promedio
+    )
+
+
+def _perfil_influencer_registrado(datos) -> PerfilInfluencerEmparejamiento:
+    return PerfilInfluencerEmparejamiento.crear(
+        id=datos.id_influencer,
+        categorias=datos.categorias,
+        paises=datos.paises_principales,
+        tipo=datos.tipo_principal,
+        seguidores=datos.total_seguidores,
+        engagement=datos.engagement_promedio
+    )
+
+
+def _perfil_campana(fila) -> PerfilCampanaEmparejamiento:
+    criterios = fila.criterios_afiliado or {}
+    return PerfilCampanaEmparejamiento.desde_criterios(
+        id=fila.id,
+        tipos_permitidos=criterios.get('tipos_permitidos'),
+        categorias_requeridas=criterios.get('categorias_requeridas'),
+        paises_permitidos=criterios.get('paises_permitidos'),
+        metricas_minimas=criterios.get('metricas_minimas')
+    )
+
+
+def _consulta_influencers(sesion):
+    return sesion.query(
+        InfluencerModelo.id,
+        InfluencerModelo.categorias,
+        InfluencerModelo.demografia,
+        InfluencerModelo.tipo_principal,
+        InfluencerModelo.total_seguidores,
+        InfluencerModelo.engagement_promedio
+    ).filter(InfluencerModelo.estado.notin_(ESTADOS_INFLUENCER_EXCLUIDOS))
+
+
+def _consulta_campanas_activas(sesion):
+    return sesion.query(Campanas.id, Campanas.criterios_afiliado).filter(
+        Campanas.estado == EstadoCampanaEnum.ACTIVA
+    )
+
+
+def perfiles_influencers(sesion) -> Iterator[PerfilInfluencerEmparejamiento]:
+    """Recorre en streaming los influencers elegibles."""
+    for fila in _consulta_influencers(sesion).yield_per(TAMANO_LOTE_LECTURA):
+        yield _perfil_influencer(fila)
+
+
+def perfiles_campanas_activas(sesion) -> Iterator[PerfilCampanaEmparejamiento]:
+    """Recorre en streaming las campanas activas."""
+    for fila in _consulta_campanas_activas(sesion).yield_per(TAMANO_LOTE_LECTURA):
+        yield _perfil_campana(fila)
+
+
+def reconstruir_motor(motor: MotorEmparejamiento = motor_emparejamiento) -> None:
+    """Reconstruye el motor completo desde la base de datos y lo intercambia atómicamente."""
+    inicio = time.monotonic()
+    with SessionLocal() as sesion:
+        motor.reconstruir(perfiles_influencers(sesion), perfiles_campanas_activas(sesion))
+    logger.info(
+        f"EMPAREJAMIENTO: Motor reconstruido en {time.monotonic() - inicio:.1f}s - "
+        f"{motor.total_influencers} influencers, {motor.total_campanas} campanas activas"
+    )
+
+
+def refrescar_campana(id_campana: str, motor: MotorEmparejamiento = motor_emparejamiento) -> None:
+    """Relee los criterios de una campana y la (des)indexa según su estado."""
+    with SessionLocal() as sesion:
+        fila = _consulta_campanas_activas(sesion).filter(Campanas.id == id_campana).first()
+    if fila is None:
+        motor.eliminar_campana(id_campana)
+    else:
+        motor.actualizar_campana(_perfil_campana(fila))
+
+
+def _aplicar_cambio_estado(cambio, motor: MotorEmparejamiento) -> None:
+    """Indexa las campanas activadas y retira las que dejaron de estar activas."""
+    if cambio.estado_nuevo == EstadoCampanaEnum.ACTIVA.value:
+        for id_campana in cambio.ids_campanas:
+            refrescar_campana(id_campana, motor)
+    elif cambio.estado_anterior == EstadoCampanaEnum.ACTIVA.value:
+        for id_campana in cambio.ids_campanas:
+            motor.eliminar_campana(id_campana)
+
+
+def _reconstruir_periodicamente(motor: MotorEmparejamiento):
+    while True:
+        time.sleep(settings.emparejamiento_reconstruccion_intervalo)
+        try:
+            reconstruir_motor(motor)
+        except Exception as e:
+            logger.error(f"EMPAREJAMIENTO: Error reconstruyendo el motor: {e}")
+
+
+def iniciar_motor(motor: MotorEmparejamiento = motor_emparejamiento, desde: Optional[int] = None):
+    """Construye el motor y lo mantiene al día con eventos y reconstrucciones periódicas."""
+    from alpes_partners.seedwork.infraestructura import utils
+    from alpes_partners.seedwork.infraestructura.broker import crear_cliente
+    from alpes_partners.seedwork.infraestructura.lectores import iniciar_lector
+    from alpes_partners.modulos.influencers.infraestructura.schema.v2.eventos import EventoInfluencerRegistrado
+    from .schema.v1.eventos import EventoCampanaCreada, EventoCampanasEstadoCambiado
+
+    desde = desde if desde is not None else utils.time_millis()
+    reconstruir_motor(motor)
+
+    cliente = crear_cliente()
+    # El payload v2 trae la audiencia: el influencer queda indexado completo sin releer la base
+    iniciar_lector(
+        cliente, settings.eventos_topico_influencers_v2, EventoInfluencerRegistrado,
+        lambda evento: motor.registrar_influencer(_perfil_influencer_registrado(evento.data)),
+        desde=desde, nombre="emparejamiento-influencers"
+    )
+    iniciar_lector(
+        cliente, settings.eventos_topico_campanas, EventoCampanaCreada,
+        lambda evento: refrescar_campana(evento.data.id_campana, motor),
+        desde=desde, nombre="emparejamiento-campanas"
+    )
+    iniciar_lector(
+        cliente, settings.eventos_topico_campanas_estado, EventoCampanasEstadoCambiado,
+        lambda evento: _aplicar_cambio_estado(evento.data, motor),
+        desde=desde, nombre="emparejamiento-campanas-estado"
+    )
+
+    threading.Thread(
+        target=_reconstruir_periodicamente, args=(motor,), name="emparejamiento-reconstruccion", daemon=True
+    ).start()
+    return cliente
@@ -4,98 +4,400 @@ Implementación de repositorios para campanas usando SQLAlchemy.
 
 import json
 import logging
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, update, delete, text
+from sqlalchemy.dialects.postgresql import insert, array
 
 logger = logging.getLogger(__name__)
 
+# Máximo de campanas por sentencia al aplicar incrementos de métricas
+TAMANO_LOTE_INCREMENTOS = 1000
+# Máximo de afiliados por sentencia al asignar o retirar
+TAMANO_LOTE_AFILIADOS = 5000
+# Máximo de campanas por INSERT multi-fila: cada fila lleva ~30 parámetros y
+# Postgres admite 65535 por sentencia
+TAMANO_LOTE_CAMPANAS = 500
+
 from alpes_partners.modulos.campanas.dominio.repositorios import RepositorioCampanas
 from alpes_partners.modulos.campanas.dominio.entidades import Campana
 from alpes_partners.modulos.campanas.dominio.objetos_valor import (
     TipoComision, EstadoCampana, TerminosComision, PeriodoCampana,
-    MaterialPromocional, CriteriosAfiliado, MetricasCampana
+    MaterialPromocional, CriteriosAfiliado, MetricasCampana, IncrementoMetricas
 )
 from alpes_partners.seedwork.dominio.objetos_valor import Dinero
-from .schema.campanas import Campanas as CampanaSchema, EstadoCampanaEnum, TipoComisionEnum
+from alpes_partners.seedwork.dominio.excepciones import ExcepcionConcurrencia
+from alpes_partners.seedwork.infraestructura.uow import Lock
+from .schema.campanas import (
+    Campanas as CampanaSchema, CampanaAfiliados as CampanaAfiliadosSchema, EstadoCampanaEnum, TipoComisionEnum
+)
 
-# Importar db como en el tutorial
-from alpes_partners.seedwork.infraestructura.database import db
+# Sesión de la API o del contexto de trabajo del worker
+from alpes_partners.seedwork.infraestructura.database import sesion_actual
 
 
 class RepositorioCampanasSQLAlchemy(RepositorioCampanas):
     """Implementación del repositorio de campanas usando SQLAlchemy."""
     
     def __init__(self):
-        # Sin parámetros, usa db.session directamente como en el tutorial
+        # Sin parámetros, usa la sesión actual (Flask o contexto de trabajo)
         pass
     
     def obtener_por_id(self, campana_id: str) -> Optional[Campana]:
         """Obtiene una campana por su ID."""
-        schema = db.session.query(CampanaSchema).filter(CampanaSchema.id == campana_id).first()
+        schema = sesion_actual().query(CampanaSchema).filter(CampanaSchema.id == campana_id).first()
         if schema:
             return self._schema_a_entidad(schema)
         return None
     
     def obtener_por_nombre(self, nombre: str) -> Optional[Campana]:
         """Obtiene una campana por su nombre."""
-        schema = db.session.query(CampanaSchema).filter(CampanaSchema.nombre == nombre).first()
+        schema = sesion_actual().query(CampanaSchema).filter(CampanaSchema.nombre == nombre).first()
         if schema:
             return self._schema_a_entidad(schema)
         return None
     
     def obtener_activas(self) -> List[Campana]:
         """Obtiene todas las campanas activas."""
-        schemas = db.session.query(CampanaSchema).filter(
+        schemas = sesion_actual().query(CampanaSchema).filter(
             CampanaSchema.estado == EstadoCampanaEnum.ACTIVA
         ).all()
         return [self._schema_a_entidad(schema) for schema in schemas]
     
     def obtener_por_categoria(self, categoria: str) -> List[Campana]:
         """Obtiene campanas que incluyan una categoría específica."""
-        # Buscar en el JSON de criterios_afiliado
-        schemas = db.session.query(CampanaSchema).filter(
-            CampanaSchema.criterios_afiliado.op('->>')('categorias_requeridas').like(f'%{categoria}%')
-        ).all()
-        return [self._schema_a_entidad(schema) for schema in schemas]
+        return self.obtener_por_categorias([categoria], limite=None)
+    
+    def obtener_por_categorias(self, categorias: List[str], todas: bool = False,
+                               limite: Optional[int] = 100, despues_de: Optional[str] = None) -> List[Campana]:
+        """Obtiene campanas con alguna (o todas) de las categorías, paginadas por id.
+        
+        La coincidencia es exacta sobre la columna JSONB normalizada, servida
+        por el índice GIN: ``?|`` para alguna y ``@>`` para todas.
+        """
+        categorias = self.normalizar_categorias(categorias)
+        if not categorias:
+            return []
+        
+        columna = CampanaSchema.categorias
+        query = sesion_actual().query(CampanaSchema).filter(
+            columna.contains(categorias) if todas else columna.has_any(array(categorias))
+        )
+        if despues_de:
+            query = query.filter(CampanaSchema.id > despues_de)
+        query = query.order_by(CampanaSchema.id)
+        if limite is not None:
+            query = query.limit(limite)
+        return [self._schema_a_entidad(schema) for schema in query.all()]
+    
+    @staticmethod
+    def normalizar_categorias(categorias: Iterable[str]) -> List[str]:
+        """Forma canónica de las categorías: minúsculas, sin espacios extremos ni duplicados."""
+        return sorted({str(categoria).strip().lower() for categoria in categorias or [] if str(categoria).strip()})
+    
+    # Columnas de las proyecciones de lectura (sin hidratar el agregado)
+    COLUMNAS_RESUMEN = (
+        CampanaSchema.id, CampanaSchema.nombre, CampanaSchema.estado, CampanaSchema.tipo_comision,
+        CampanaSchema.valor_comision, CampanaSchema.moneda, CampanaSchema.fecha_inicio, CampanaSchema.fecha_fin,
+        CampanaSchema.categorias, CampanaSchema.total_afiliados, CampanaSchema.clics_totales,
+        CampanaSchema.conversiones_totales, CampanaSchema.ingresos_generados, CampanaSchema.roi
+    )
+    COLUMNAS_DETALLE = COLUMNAS_RESUMEN + (
+        CampanaSchema.descripcion, CampanaSchema.descripcion_comision, CampanaSchema.fecha_creacion,
+        CampanaSchema.fecha_activacion, CampanaSchema.material_promocional, CampanaSchema.criterios_afiliado,
+        CampanaSchema.inversion_total, CampanaSchema.tasa_conversion,
+        CampanaSchema.influencer_origen_id, CampanaSchema.categoria_origen
+    )
+    
+    def obtener_resumenes(self, limite: int = 100, despues_de: Optional[str] = None,
+                          estado: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Página de campanas como proyección de columnas, ordenada por id (paginación por clave).
+        
+        Los ids son UUIDv7, así que el orden por id es también orden de creación.
+        """
+        query = sesion_actual().query(*self.COLUMNAS_RESUMEN)
+        if estado:
+            query = query.filter(CampanaSchema.estado == EstadoCampanaEnum(estado))
+        if despues_de:
+            query = query.filter(CampanaSchema.id > despues_de)
+        filas = query.order_by(CampanaSchema.id).limit(limite).all()
+        return [self._fila_a_dict(fila) for fila in filas]
+    
+    def obtener_detalle(self, campana_id: str) -> Optional[Dict[str, Any]]:
+        """Proyección de columnas de una campana, o None si no existe."""
+        fila = sesion_actual().query(*self.COLUMNAS_DETALLE).filter(CampanaSchema.id == campana_id).first()
+        return self._fila_a_dict(fila) if fila else None
+    
+    @staticmethod
+    def _fila_a_dict(fila) -> Dict[str, Any]:
+        datos = fila._asdict()
+        datos['id'] = str(datos['id'])
+        datos['estado'] = datos['estado'].value
+        datos['tipo_comision'] = datos['tipo_comision'].value
+        return datos
+    
+    # Criterio de ranking -> columna indexada
+    CRITERIOS_RANKING = {
+        'roi': CampanaSchema.roi,
+        'tasa_conversion': CampanaSchema.tasa_conversion,
+        'ingresos': CampanaSchema.ingresos_generados
+    }
+    
+    def obtener_ranking(self, criterio: str = 'roi', limite: int = 10,
+                        estado: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top-K de campanas por ROI, tasa de conversión o ingresos.
+        
+        Lee una proyección (sin construir entidades) recorriendo el índice
+        descendente del criterio, así que el costo depende de K y no del
+        tamaño de la tabla.
+        """
+        columna = self.CRITERIOS_RANKING[criterio]
+        query = sesion_actual().query(
+            CampanaSchema.id,
+            CampanaSchema.nombre,
+            CampanaSchema.estado,
+            CampanaSchema.roi,
+            CampanaSchema.tasa_conversion,
+            CampanaSchema.ingresos_generados,
+            CampanaSchema.inversion_total,
+            CampanaSchema.clics_totales,
+            CampanaSchema.conversiones_totales
+        )
+        if estado:
+            query = query.filter(CampanaSchema.estado == EstadoCampanaEnum(estado))
+        filas = query.order_by(columna.desc(), CampanaSchema.id).limit(limite).all()
+        return [
+            {
+                'id': str(fila.id),
+                'nombre': fila.nombre,
+                'estado': fila.estado.value,
+                'roi': fila.roi,
+                'tasa_conversion': fila.tasa_conversion,
+                'ingresos_generados': fila.ingresos_generados,
+                'inversion_total': fila.inversion_total,
+                'clics_totales': fila.clics_totales,
+                'conversiones_totales': fila.conversiones_totales
+            }
+            for fila in filas
+        ]
     
     def obtener_por_influencer_origen(self, influencer_id: str) -> List[Campana]:
         """Obtiene campanas creadas para un influencer específico."""
-        schemas = db.session.query(CampanaSchema).filter(
+        schemas = sesion_actual().query(CampanaSchema).filter(
             CampanaSchema.influencer_origen_id == influencer_id
         ).all()
         return [self._schema_a_entidad(schema) for schema in schemas]
     
     def obtener_todas(self, limite: int = 100, offset: int = 0) -> List[Campana]:
         """Obtiene todas las campanas con paginación."""
-        schemas = db.session.query(CampanaSchema).offset(offset).limit(limite).all()
+        schemas = sesion_actual().query(CampanaSchema).offset(offset).limit(limite).all()
         return [self._schema_a_entidad(schema) for schema in schemas]
     
     def agregar(self, campana: Campana) -> None:
         """Agrega una nueva campana."""
         logger.info(f"CAMPANAS: Agregando campana '{campana.nombre}' al repositorio")
         schema = self._entidad_a_schema(campana)
-        db.session.add(schema)
-        db.session.flush()  # Para obtener el ID generado
+        sesion_actual().add(schema)
+        sesion_actual().flush()  # Para obtener el ID generado
+        self._aplicar_cambios_afiliados(campana)
         logger.info(f"CAMPANAS: Campana '{campana.nombre}' agregada a la sesión con ID: {schema.id}")
     
-    def actualizar(self, campana: Campana) -> None:
-        """Actualiza una campana existente."""
-        schema = db.session.query(CampanaSchema).filter(CampanaSchema.id == campana.id).first()
-        if schema:
-            self._actualizar_schema_desde_entidad(schema, campana)
-            db.session.flush()
+    def agregar_lote(self, campanas: List[Campana]) -> int:
+        """Agrega varias campanas con un INSERT multi-fila por lote.
+        
+        Un nombre tomado por otra transacción entre la validación y el
+        INSERT no hace fallar el lote: esa campana se omite
+        (ON CONFLICT DO NOTHING) y se descartan sus eventos para que no se
+        publique una creación que no ocurrió. Retorna las campanas insertadas.
+        """
+        insertadas = set()
+        for inicio in range(0, len(campanas), TAMANO_LOTE_CAMPANAS):
+            lote = campanas[inicio:inicio + TAMANO_LOTE_CAMPANAS]
+            resultado = sesion_actual().execute(
+                insert(CampanaSchema)
+                .values([self._fila_insercion(campana) for campana in lote])
+                .on_conflict_do_nothing(index_elements=['nombre'])
+                .returning(CampanaSchema.id)
+            )
+            insertadas.update(str(fila.id) for fila in resultado)
+        
+        for campana in campanas:
+            if str(campana.id) in insertadas:
+                self._aplicar_cambios_afiliados(campana)
+            else:
+                logger.warning(f"CAMPANAS: Campana '{campana.nombre}' omitida por nombre duplicado")
+                campana.limpiar_eventos()
+        
+        logger.info(f"CAMPANAS: {len(insertadas)} de {len(campanas)} campanas agregadas en lote")
+        return len(insertadas)
+    
+    def actualizar(self, campana: Campana, lock: Lock = Lock.OPTIMISTA) -> None:
+        """Actualiza una campana con compare-and-swap sobre la versión."""
+        if lock == Lock.PESIMISTA:
+            sesion_actual().query(CampanaSchema.id).filter(
+                CampanaSchema.id == campana.id
+            ).with_for_update().first()
+        
+        version_leida = campana.version
+        valores = self._valores_desde_entidad(campana)
+        valores['version'] = version_leida + 1
+        
+        resultado = sesion_actual().execute(
+            update(CampanaSchema)
+            .where(CampanaSchema.id == campana.id, CampanaSchema.version == version_leida)
+            .values(**valores)
+            .execution_options(synchronize_session=False)
+        )
+        
+        if resultado.rowcount == 0:
+            if sesion_actual().query(CampanaSchema.id).filter(CampanaSchema.id == campana.id).first() is None:
+                logger.warning(f"CAMPANAS: Campana no encontrada para actualizar: {campana.id}")
+                return
+            logger.warning(f"CAMPANAS: Conflicto de versión al actualizar campana {campana.id} (versión {version_leida})")
+            raise ExcepcionConcurrencia(
+                f"La campana {campana.id} fue modificada por otra transacción (versión leída {version_leida})"
+            )
+        
+        campana.version = version_leida + 1
+        self._aplicar_cambios_afiliados(campana)
+    
+    def _aplicar_cambios_afiliados(self, campana: Campana) -> None:
+        """Persiste las asignaciones y retiros pendientes de la entidad."""
+        por_asignar, por_retirar = campana.cambios_afiliados()
+        if not por_asignar and not por_retirar:
+            return
+        self.retirar_afiliados(campana.id, por_retirar)
+        self.asignar_afiliados(campana.id, por_asignar)
+        total = sesion_actual().query(CampanaSchema.total_afiliados).filter(CampanaSchema.id == campana.id).scalar()
+        campana.confirmar_cambios_afiliados(total or 0)
+    
+    def asignar_afiliados(self, campana_id: str, influencer_ids: Iterable[str]) -> int:
+        """Asigna afiliados por lotes (INSERT ... ON CONFLICT DO NOTHING). Retorna cuántos eran nuevos."""
+        ids = sorted({str(influencer_id) for influencer_id in influencer_ids})
+        asignados = 0
+        for inicio in range(0, len(ids), TAMANO_LOTE_AFILIADOS):
+            lote = ids[inicio:inicio + TAMANO_LOTE_AFILIADOS]
+            resultado = sesion_actual().execute(
+                insert(CampanaAfiliadosSchema)
+                .values([{'campana_id': campana_id, 'influencer_id': influencer_id} for influencer_id in lote])
+                .on_conflict_do_nothing(index_elements=['campana_id', 'influencer_id'])
+            )
+            asignados += resultado.rowcount
+        self._ajustar_total_afiliados(campana_id, asignados)
+        logger.info(f"CAMPANAS: {asignados} afiliados asignados a campana {campana_id}")
+        return asignados
+    
+    def retirar_afiliados(self, campana_id: str, influencer_ids: Iterable[str]) -> int:
+        """Retira afiliados por lotes. Retorna cuántos estaban asignados."""
+        ids = sorted({str(influencer_id) for influencer_id in influencer_ids})
+        retirados = 0
+        for inicio in range(0, len(ids), TAMANO_LOTE_AFILIADOS):
+            lote = ids[inicio:inicio + TAMANO_LOTE_AFILIADOS]
+            resultado = sesion_actual().execute(
+                delete(CampanaAfiliadosSchema)
+                .where(
+                    CampanaAfiliadosSchema.campana_id == campana_id,
+                    CampanaAfiliadosSchema.influencer_id.in_(lote)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            retirados += resultado.rowcount
+        self._ajustar_total_afiliados(campana_id, -retirados)
+        logger.info(f"CAMPANAS: {retirados} afiliados retirados de campana {campana_id}")
+        return retirados
+    
+    def _ajustar_total_afiliados(self, campana_id: str, delta: int) -> None:
+        if delta:
+            sesion_actual().execute(
+                update(CampanaSchema)
+                .where(CampanaSchema.id == campana_id)
+                .values(total_afiliados=CampanaSchema.total_afiliados + delta)
+                .execution_options(synchronize_session=False)
+            )
+    
+    def obtener_afiliados(self, campana_id: str, limite: int = 100, despues_de: Optional[str] = None) -> List[str]:
+        """Página de ids de afiliados de una campana, ordenada por id (paginación por clave)."""
+        query = sesion_actual().query(CampanaAfiliadosSchema.influencer_id).filter(
+            CampanaAfiliadosSchema.campana_id == campana_id
+        )
+        if despues_de:
+            query = query.filter(CampanaAfiliadosSchema.influencer_id > despues_de)
+        filas = query.order_by(CampanaAfiliadosSchema.influencer_id).limit(limite).all()
+        return [str(fila.influencer_id) for fila in filas]
+    
+    def obtener_campanas_de_afiliado(self, influencer_id: str, limite: int = 100,
+                                     despues_de: Optional[str] = None) -> List[str]:
+        """Página de ids de campanas a las que está asignado un influencer (índice inverso)."""
+        query = sesion_actual().query(CampanaAfiliadosSchema.campana_id).filter(
+            CampanaAfiliadosSchema.influencer_id == influencer_id
+        )
+        if despues_de:
+            query = query.filter(CampanaAfiliadosSchema.campana_id > despues_de)
+        filas = query.order_by(CampanaAfiliadosSchema.campana_id).limit(limite).all()
+        return [str(fila.campana_id) for fila in filas]
+    
+    def aplicar_incrementos_metricas(self, incrementos: List[IncrementoMetricas]) -> int:
+        """Suma deltas de métricas con un único UPDATE ... FROM (VALUES ...) por lote.
+        
+        Cada contador es una columna numérica y se incrementa en la base de
+        datos sobre su valor vigente ("columna = columna + delta"), así que
+        escrituras concurrentes no se pisan y no hay que leer la fila. Como
+        ``actualizar`` no escribe los contadores, no se incrementa la versión:
+        los incrementos no provocan conflictos con ediciones de la campana.
+        """
+        actualizadas = 0
+        for inicio in range(0, len(incrementos), TAMANO_LOTE_INCREMENTOS):
+            lote = incrementos[inicio:inicio + TAMANO_LOTE_INCREMENTOS]
+            filas = []
+            parametros = {}
+            for i, incremento in enumerate(lote):
+                filas.append(
+                    f"(CAST(:id_{i} AS uuid), CAST(:clics_{i} AS bigint), CAST(:conversiones_{i} AS bigint), "
+                    f"CAST(:inversion_{i} AS double precision), CAST(:ingresos_{i} AS double precision))"
+                )
+                parametros.update({
+                    f'id_{i}': incremento.campana_id,
+                    f'clics_{i}': incremento.clics,
+                    f'conversiones_{i}': incremento.conversiones,
+                    f'inversion_{i}': incremento.inversion,
+                    f'ingresos_{i}': incremento.ingresos
+                })
+            
+            sentencia = text(f"""
+                UPDATE campanas AS c SET
+                    clics_totales = c.clics_totales + d.clics,
+                    conversiones_totales = c.conversiones_totales + d.conversiones,
+                    inversion_total = c.inversion_total + d.inversion,
+                    ingresos_generados = c.ingresos_generados + d.ingresos,
+                    fecha_actualizacion = now()
+                FROM (VALUES {', '.join(filas)}) AS d(id, clics, conversiones, inversion, ingresos)
+                WHERE c.id = d.id
+            """)
+            actualizadas += sesion_actual().execute(sentencia, parametros).rowcount
+        
+        if actualizadas < len(incrementos):
+            logger.warning(f"CAMPANAS: {len(incrementos) - actualizadas} incrementos de métricas para campanas inexistentes")
+        logger.info(f"CAMPANAS: Incrementos de métricas aplicados a {actualizadas} campanas")
+        return actualizadas
     
     def eliminar(self, campana_id: str) -> None:
         """Elimina una campana."""
-        schema = db.session.query(CampanaSchema).filter(CampanaSchema.id == campana_id).first()
+        schema = sesion_actual().query(CampanaSchema).filter(CampanaSchema.id == campana_id).first()
         if schema:
-            db.session.delete(schema)
-            db.session.flush()
+            sesion_actual().delete(schema)
+            sesion_actual().flush()
+    
+    def existen_nombres(self, nombres: List[str]) -> Set[str]:
+        """Retorna cuáles de los nombres ya están registrados, con una sola consulta."""
+        nombres = list(set(nombres))
+        if not nombres:
+            return set()
+        filas = sesion_actual().query(CampanaSchema.nombre).filter(CampanaSchema.nombre.in_(nombres)).all()
+        return {fila.nombre for fila in filas}
     
     def existe_con_nombre(self, nombre: str, excluir_id: Optional[str] = None) -> bool:
         """Verifica si existe una campana con el nombre dado."""
-        query = db.session.query(CampanaSchema).filter(CampanaSchema.nombre == nombre)
+        query = sesion_actual().query(CampanaSchema).filter(CampanaSchema.nombre == nombre)
         if excluir_id:
             query = query.filter(CampanaSchema.id != excluir_id)
         return query.first() is not None
@@ -150,109 +452,66 @@ class RepositorioCampanasSQLAlchemy(RepositorioCampanas):
         campana.fecha_pausa = schema.fecha_pausa
         
         # Métricas
-        metricas_data = schema.metricas or {}
         campana.metricas = MetricasCampana(
-            afiliados_asignados=metricas_data.get('afiliados_asignados', 0),
-            clics_totales=metricas_data.get('clics_totales', 0),
-            conversiones_totales=metricas_data.get('conversiones_totales', 0),
-            inversion_total=metricas_data.get('inversion_total', 0.0),
-            ingresos_generados=metricas_data.get('ingresos_generados', 0.0)
+            afiliados_asignados=schema.total_afiliados or 0,
+            clics_totales=schema.clics_totales or 0,
+            conversiones_totales=schema.conversiones_totales or 0,
+            inversion_total=schema.inversion_total or 0.0,
+            ingresos_generados=schema.ingresos_generados or 0.0
         )
         
-        # Afiliados asignados
-        campana.afiliados_asignados = set(schema.afiliados_asignados or [])
-        
         # Establecer versión
         campana.version = schema.version
         
         return campana
     
-    def _entidad_a_schema(self, campana: Campana) -> CampanaSchema:
-        """Convierte una entidad de dominio a schema de base de datos."""
+    def _valores_desde_entidad(self, campana: Campana) -> dict:
+        """Calcula los valores de columna de la entidad (sin id, versión ni contadores de métricas).
         
-        # Preparar datos JSON
-        material_data = {
-            'titulo': campana.material_promocional.titulo,
-            'descripcion': campana.material_promocional.descripcion,
-            'enlaces': campana.material_promocional.enlaces,
-            'imagenes': campana.material_promocional.imagenes,
-            'banners': campana.material_promocional.banners
+        Los contadores solo cambian con ``aplicar_incrementos_metricas``: si
+        ``actualizar`` los reescribiera, pisaría los incrementos aplicados
+        desde que se leyó la entidad.
+        """
+        return {
+            'nombre': campana.nombre,
+            'descripcion': campana.descripcion,
+            'tipo_comision': TipoComisionEnum(campana.terminos_comision.tipo.value),
+            'valor_comision': campana.terminos_comision.valor.cantidad,
+            'moneda': campana.terminos_comision.valor.moneda,
+            'descripcion_comision': campana.terminos_comision.descripcion,
+            'fecha_inicio': campana.periodo.fecha_inicio,
+            'fecha_fin': campana.periodo.fecha_fin,
+            'estado': EstadoCampanaEnum(campana.estado.value),
+            'fecha_activacion': campana.fecha_activacion,
+            'fecha_pausa': campana.fecha_pausa,
+            'material_promocional': {
+                'titulo': campana.material_promocional.titulo,
+                'descripcion': campana.material_promocional.descripcion,
+                'enlaces': campana.material_promocional.enlaces,
+                'imagenes': campana.material_promocional.imagenes,
+                'banners': campana.material_promocional.banners
+            },
+            'criterios_afiliado': {
+                'tipos_permitidos': campana.criterios_afiliado.tipos_permitidos,
+                'categorias_requeridas': campana.criterios_afiliado.categorias_requeridas,
+                'paises_permitidos': campana.criterios_afiliado.paises_permitidos,
+                'metricas_minimas': campana.criterios_afiliado.metricas_minimas
+            },
+            'categorias': self.normalizar_categorias(campana.criterios_afiliado.categorias_requeridas)
         }
-        
-        criterios_data = {
-            'tipos_permitidos': campana.criterios_afiliado.tipos_permitidos,
-            'categorias_requeridas': campana.criterios_afiliado.categorias_requeridas,
-            'paises_permitidos': campana.criterios_afiliado.paises_permitidos,
-            'metricas_minimas': campana.criterios_afiliado.metricas_minimas
-        }
-        
-        metricas_data = {
-            'afiliados_asignados': campana.metricas.afiliados_asignados,
-            'clics_totales': campana.metricas.clics_totales,
-            'conversiones_totales': campana.metricas.conversiones_totales,
-            'inversion_total': campana.metricas.inversion_total,
-            'ingresos_generados': campana.metricas.ingresos_generados
-        }
-        
-        return CampanaSchema(
-            id=campana.id,
-            nombre=campana.nombre,
-            descripcion=campana.descripcion,
-            tipo_comision=TipoComisionEnum(campana.terminos_comision.tipo.value),
-            valor_comision=campana.terminos_comision.valor.cantidad,
-            moneda=campana.terminos_comision.valor.moneda,
-            descripcion_comision=campana.terminos_comision.descripcion,
-            fecha_inicio=campana.periodo.fecha_inicio,
-            fecha_fin=campana.periodo.fecha_fin,
-            estado=EstadoCampanaEnum(campana.estado.value),
-            fecha_activacion=campana.fecha_activacion,
-            fecha_pausa=campana.fecha_pausa,
-            material_promocional=material_data,
-            criterios_afiliado=criterios_data,
-            metricas=metricas_data,
-            afiliados_asignados=list(campana.afiliados_asignados),
-            version=campana.version
-        )
     
-    def _actualizar_schema_desde_entidad(self, schema: CampanaSchema, campana: Campana) -> None:
-        """Actualiza un schema existente con datos de la entidad."""
-        
-        # Actualizar campos básicos
-        schema.nombre = campana.nombre
-        schema.descripcion = campana.descripcion
-        schema.tipo_comision = TipoComisionEnum(campana.terminos_comision.tipo.value)
-        schema.valor_comision = campana.terminos_comision.valor.cantidad
-        schema.moneda = campana.terminos_comision.valor.moneda
-        schema.descripcion_comision = campana.terminos_comision.descripcion
-        schema.fecha_inicio = campana.periodo.fecha_inicio
-        schema.fecha_fin = campana.periodo.fecha_fin
-        schema.estado = EstadoCampanaEnum(campana.estado.value)
-        schema.fecha_activacion = campana.fecha_activacion
-        schema.fecha_pausa = campana.fecha_pausa
-        
-        # Actualizar datos JSON
-        schema.material_promocional = {
-            'titulo': campana.material_promocional.titulo,
-            'descripcion': campana.material_promocional.descripcion,
-            'enlaces': campana.material_promocional.enlaces,
-            'imagenes': campana.material_promocional.imagenes,
-            'banners': campana.material_promocional.banners
-        }
-        
-        schema.criterios_afiliado = {
-            'tipos_permitidos': campana.criterios_afiliado.tipos_permitidos,
-            'categorias_requeridas': campana.criterios_afiliado.categorias_requeridas,
-            'paises_permitidos': campana.criterios_afiliado.paises_permitidos,
-            'metricas_minimas': campana.criterios_afiliado.metricas_minimas
-        }
-        
-        schema.metricas = {
-            'afiliados_asignados': campana.metricas.afiliados_asignados,
+    def _fila_insercion(self, campana: Campana) -> dict:
+        """Valores de columna para insertar una campana nueva."""
+        return {
+            'id': campana.id,
+            'version': campana.version,
             'clics_totales': campana.metricas.clics_totales,
             'conversiones_totales': campana.metricas.conversiones_totales,
             'inversion_total': campana.metricas.inversion_total,
-            'ingresos_generados': campana.metricas.ingresos_generados
+            'ingresos_generados': campana.metricas.ingresos_generados,
+            **self._valores_desde_entidad(campana)
         }
-        
-        schema.afiliados_asignados = list(campana.afiliados_asignados)
-        schema.version = campana.version
+    
+    def _entidad_a_schema(self, campana: Campana) -> CampanaSchema:
+        """Convierte una entidad de dominio a schema de base de datos."""
+        return CampanaSchema(**self._fila_insercion(campana))
@@ -2,13 +2,13 @@
 Schema de base de datos para campanas.
 """
 
-from sqlalchemy import Column, String, Text, DateTime, Float, Integer, Boolean, JSON, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DateTime, Float, Integer, BigInteger, Boolean, JSON, ForeignKey, Computed, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
-import uuid
 import enum
 
 from alpes_partners.modulos.influencers.infraestructura.modelos import Base
+from alpes_partners.seedwork.dominio.identificadores import uuid7
 
 
 class EstadoCampanaEnum(enum.Enum):
@@ -33,7 +33,7 @@ class Campanas(Base):
     __tablename__ = 'campanas'
     
     # Campos básicos
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     nombre = Column(String(200), nullable=False, unique=True, index=True)
     descripcion = Column(Text, nullable=False)
     
@@ -71,18 +71,31 @@ class Campanas(Base):
     #   "metricas_minimas": dict
     # }
     
-    # Métricas de campana (JSON)
-    metricas = Column(JSON, nullable=False, default=dict)
-    # Estructura: {
-    #   "afiliados_asignados": int,
-    #   "clics_totales": int,
-    #   "conversiones_totales": int,
-    #   "inversion_total": float,
-    #   "ingresos_generados": float
-    # }
+    # Categorías objetivo normalizadas (minúsculas, sin duplicados) para búsquedas exactas con índice GIN
+    categorias = Column(JSONB, nullable=False, default=list, server_default='[]')
+    
+    # Métricas de campana: columnas numéricas para poder sumarles deltas con
+    # "SET columna = columna + :delta" sin reescribir la fila completa.
+    clics_totales = Column(BigInteger, nullable=False, default=0, server_default='0')
+    conversiones_totales = Column(BigInteger, nullable=False, default=0, server_default='0')
+    inversion_total = Column(Float, nullable=False, default=0.0, server_default='0')
+    ingresos_generados = Column(Float, nullable=False, default=0.0, server_default='0')
+    
+    # Indicadores derivados (columnas generadas, mismas fórmulas que MetricasCampana):
+    # se recalculan en cada incremento y permiten rankings top-K por índice
+    roi = Column(Float, Computed(
+        "CASE WHEN inversion_total = 0 THEN 0 "
+        "ELSE (ingresos_generados - inversion_total) / inversion_total * 100 END",
+        persisted=True
+    ))
+    tasa_conversion = Column(Float, Computed(
+        "CASE WHEN clics_totales = 0 THEN 0 "
+        "ELSE conversiones_totales::double precision / clics_totales * 100 END",
+        persisted=True
+    ))
     
-    # Afiliados asignados (JSON array de IDs)
-    afiliados_asignados = Column(JSON, nullable=False, default=list)
+    # Número de afiliados asignados (las asignaciones están en campana_afiliados)
+    total_afiliados = Column(Integer, nullable=False, default=0, server_default='0')
     
     # Campos para campanas automáticas
     influencer_origen_id = Column(String(50), nullable=True, index=True)
@@ -98,6 +111,20 @@ class Campanas(Base):
         return f"<Campana(id={self.id}, nombre='{self.nombre}', estado='{self.estado}')>"
 
 
+class CampanaAfiliados(Base):
+    """Tabla de asignaciones de afiliados (influencers) a campanas."""
+    
+    __tablename__ = 'campana_afiliados'
+    
+    # La clave primaria (campana_id, influencer_id) sirve las lecturas paginadas por campana
+    campana_id = Column(UUID(as_uuid=True), ForeignKey('campanas.id', ondelete='CASCADE'), primary_key=True)
+    influencer_id = Column(UUID(as_uuid=True), primary_key=True)
+    fecha_asignacion = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<CampanaAfiliado(campana_id={self.campana_id}, influencer_id={self.influencer_id})>"
+
+
 # Índices adicionales para optimizar consultas
 from sqlalchemy import Index
 
@@ -114,4 +141,15 @@ Index('idx_campanas_influencer_origen', Campanas.influencer_origen_id)
 Index('idx_campanas_tipo_comision', Campanas.tipo_comision)
 
 # Índice para búsquedas de texto en nombre
-Index('idx_campanas_nombre_text', Campanas.nombre)
\ No newline at end of file
+Index('idx_campanas_nombre_text', Campanas.nombre)
+
+# Índice inverso: campanas en las que participa un influencer
+Index('idx_campana_afiliados_influencer', CampanaAfiliados.influencer_id, CampanaAfiliados.campana_id)
+
+# Índice GIN para búsquedas exactas por categoría (operadores ?| y @>)
+Index('idx_campanas_categorias', Campanas.categorias, postgresql_using='gin')
+
+# Índices para el ranking de rendimiento (top-K sin ordenar la tabla)
+Index('idx_campanas_ranking_roi', Campanas.roi.desc(), Campanas.id)
+Index('idx_campanas_ranking_tasa_conversion', Campanas.tasa_conversion.desc(), Campanas.id)
+Index('idx_campanas_ranking_ingresos', Campanas.ingresos_generados.desc(), Campanas.id)
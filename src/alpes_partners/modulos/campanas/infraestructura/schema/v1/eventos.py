@@ -0,0 +1,45 @@
+from pulsar.schema import *
+from alpes_partners.seedwork.infraestructura.schema.v1.eventos import EventoIntegracion
+from alpes_partners.seedwork.infraestructura.schema.registro import registrar_schema
+
+
+class CampanaCreadaPayload(Record):
+    id_campana = String()
+    nombre = String()
+    descripcion = String()
+    tipo_comision = String()
+    valor_comision = Double()
+    moneda = String()
+    categorias_objetivo = Array(String())
+    fecha_inicio = Long()
+
+
+@registrar_schema('CampanaCreada', version=1)
+class EventoCampanaCreada(EventoIntegracion):
+    data = CampanaCreadaPayload()
+
+
+class EventoTrackingPayload(Record):
+    id_campana = String()
+    tipo = String()  # clic | conversion
+    cantidad = Long()
+    valor = Double()
+    costo = Double()
+
+
+@registrar_schema('Tracking', version=1)
+class EventoTracking(EventoIntegracion):
+    data = EventoTrackingPayload()
+
+
+class CampanasEstadoCambiadoPayload(Record):
+    ids_campanas = Array(String())
+    estado_anterior = String()
+    estado_nuevo = String()
+    fecha_cambio = Long()
+
+
+@registrar_schema('CampanasEstadoCambiado', version=1)
+class EventoCampanasEstadoCambiado(EventoIntegracion):
+    """Lote de campanas que cambiaron de estado en un mismo ciclo del planificador."""
+    data = CampanasEstadoCambiadoPayload()
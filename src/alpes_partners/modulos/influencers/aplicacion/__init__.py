@@ -6,4 +6,5 @@ from pydispatch import dispatcher
 from .handlers import HandlerInfluencerIntegracion
 from ..dominio.eventos import InfluencerRegistrado
 
-dispatcher.connect(HandlerInfluencerIntegracion.handle_influencer_registrado, signal=f'{InfluencerRegistrado.__name__}Integracion')
\ No newline at end of file
+dispatcher.connect(HandlerInfluencerIntegracion.handle_invalidar_facetas, signal=f'{InfluencerRegistrado.__name__}Integracion')
+dispatcher.connect(HandlerInfluencerIntegracion.handle_influencer_registrado, signal=f'{InfluencerRegistrado.__name__}Integracion')
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from dataclasses import dataclass, field
 from .....seedwork.aplicacion.comandos import Comando
 from ..dto import RegistrarInfluencerDTO
@@ -29,6 +29,9 @@ class RegistrarInfluencer(Comando):
     biografia: Optional[str] = None
     sitio_web: Optional[str] = None
     telefono: Optional[str] = None
+    # Audiencia por plataforma y demografía (opcionales); alimentan el resumen del evento v2
+    audiencia: List[Dict[str, Any]] = field(default_factory=list)
+    demografia: Optional[Dict[str, Any]] = None
 
 
 class RegistrarInfluencerHandler(RegistrarInfluencerBaseHandler):
@@ -58,7 +61,9 @@ class RegistrarInfluencerHandler(RegistrarInfluencerBaseHandler):
             ,   descripcion=comando.descripcion
             ,   biografia=comando.biografia
             ,   sitio_web=comando.sitio_web
-            ,   telefono=comando.telefono)
+            ,   telefono=comando.telefono
+            ,   audiencia=comando.audiencia
+            ,   demografia=comando.demografia)
 
         influencer: Influencer = self.fabrica_influencers.crear_objeto(influencer_dto, MapeadorInfluencer())
         influencer.crear_influencer(influencer)
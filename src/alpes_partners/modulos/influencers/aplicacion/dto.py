@@ -4,6 +4,33 @@ from src.alpes_partners.seedwork.aplicacion.dto import DTO
 from ..dominio.objetos_valor import TipoInfluencer, EstadoInfluencer, Plataforma, Genero, RangoEdad
 
 
+class DemografiaDTO(DTO):
+    """DTO para demografía de audiencia."""
+    distribucion_genero: Dict[Genero, float]
+    distribucion_edad: Dict[RangoEdad, float]
+    paises_principales: List[str]
+    
+    @validator('distribucion_genero')
+    def validar_distribucion_genero(cls, v):
+        if abs(sum(v.values()) - 100.0) > 1.0:
+            raise ValueError('La distribución de género debe sumar 100%')
+        return v
+    
+    @validator('distribucion_edad')
+    def validar_distribucion_edad(cls, v):
+        if abs(sum(v.values()) - 100.0) > 1.0:
+            raise ValueError('La distribución de edad debe sumar 100%')
+        return v
+
+
+class AudienciaPlataformaDTO(DTO):
+    """DTO para la audiencia de un influencer en una plataforma."""
+    plataforma: Plataforma
+    seguidores: int
+    engagement_rate: float
+    alcance_promedio: int = 0
+
+
 class RegistrarInfluencerDTO(DTO):
     """DTO para registrar un influencer."""
     fecha_creacion: str
@@ -16,6 +43,8 @@ class RegistrarInfluencerDTO(DTO):
     biografia: Optional[str] = ""
     sitio_web: Optional[str] = ""
     telefono: Optional[str] = ""
+    audiencia: List[AudienciaPlataformaDTO] = []
+    demografia: Optional[DemografiaDTO] = None
     
     @validator('nombre')
     def validar_nombre(cls, v):
@@ -36,25 +65,6 @@ class RegistrarInfluencerDTO(DTO):
         return v.strip()
 
 
-class DemografiaDTO(DTO):
-    """DTO para demografía de audiencia."""
-    distribucion_genero: Dict[Genero, float]
-    distribucion_edad: Dict[RangoEdad, float]
-    paises_principales: List[str]
-    
-    @validator('distribucion_genero')
-    def validar_distribucion_genero(cls, v):
-        if abs(sum(v.values()) - 100.0) > 1.0:
-            raise ValueError('La distribución de género debe sumar 100%')
-        return v
-    
-    @validator('distribucion_edad')
-    def validar_distribucion_edad(cls, v):
-        if abs(sum(v.values()) - 100.0) > 1.0:
-            raise ValueError('La distribución de edad debe sumar 100%')
-        return v
-
-
 class InfluencerDTO(DTO):
     """DTO para representar un influencer."""
     id: str
@@ -82,3 +92,12 @@ class InfluencerDTO(DTO):
     
     # Demografia (opcional)
     demografia: Optional[DemografiaDTO] = None
+
+
+class ResultadoBusquedaDTO(DTO):
+    """DTO para un resultado de búsqueda de influencers por nombre."""
+    id: str
+    nombre: str
+    tipo_principal: Optional[str] = None
+    total_seguidores: int = 0
+    puntaje: float = 0.0
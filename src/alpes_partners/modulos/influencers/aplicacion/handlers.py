@@ -1,6 +1,7 @@
 import logging
 from typing import List, Optional
 
+from alpes_partners.config.settings import settings
 from ....seedwork.aplicacion.handlers import ManejadorComando
 from ....seedwork.infraestructura.uow import UnidadTrabajo
 from ..dominio.repositorios import RepositorioInfluencers
@@ -21,7 +22,13 @@ class HandlerInfluencerIntegracion:
     def handle_influencer_registrado(evento):
         """Handler para evento InfluencerRegistrado de integración."""
         despachador = DespachadorInfluencers()
-        despachador.publicar_evento_influencer_registrado(evento, 'eventos-influencers')
+        despachador.publicar_evento_influencer_registrado(evento, settings.eventos_topico_influencers)
+    
+    @staticmethod
+    def handle_invalidar_facetas(evento):
+        """Invalida los conteos de facetas cacheados tras un registro en este proceso (las demás instancias los invalidan por eventos)."""
+        from .servicios import cache_facetas
+        cache_facetas.invalidar()
 
 
 logger.info("HANDLERS: Handlers de aplicación de influencers cargados")
\ No newline at end of file
@@ -18,6 +18,7 @@ if src_path not in sys.path:
 
 from alpes_partners.seedwork.dominio.repositorios import Mapeador
 from alpes_partners.modulos.influencers.dominio.entidades import Influencer
+from alpes_partners.modulos.influencers.dominio.objetos_valor import DatosAudiencia, Demografia
 from alpes_partners.modulos.influencers.aplicacion.dto import RegistrarInfluencerDTO, InfluencerDTO
 
 from datetime import datetime
@@ -90,4 +91,20 @@ class MapeadorInfluencer(Mapeador):
         if hasattr(dto, 'id') and dto.id:
             influencer._id = dto.id
         
+        # Audiencia y demografía declaradas en el registro
+        for audiencia in dto.audiencia:
+            influencer.audiencia_por_plataforma[audiencia.plataforma] = DatosAudiencia(
+                plataforma=audiencia.plataforma,
+                seguidores=audiencia.seguidores,
+                engagement_rate=audiencia.engagement_rate,
+                alcance_promedio=audiencia.alcance_promedio
+            )
+        
+        if dto.demografia:
+            influencer.demografia = Demografia(
+                distribucion_genero=dto.demografia.distribucion_genero,
+                distribucion_edad=dto.demografia.distribucion_edad,
+                paises_principales=dto.demografia.paises_principales
+            )
+        
         return influencer
@@ -1,18 +1,23 @@
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from ..dominio.repositorios import RepositorioInfluencers
 from ..dominio.entidades import Influencer
 from ..dominio.objetos_valor import TipoInfluencer, EstadoInfluencer, Plataforma
 from ..dominio.excepciones import InfluencerNoEncontrado, EmailYaRegistrado
 
+from alpes_partners.config.settings import settings
+from alpes_partners.seedwork.infraestructura.cache import CacheTTL
 from alpes_partners.seedwork.infraestructura.uow import UnidadTrabajo
-from .dto import InfluencerDTO, RegistrarInfluencerDTO
+from .dto import InfluencerDTO, RegistrarInfluencerDTO, ResultadoBusquedaDTO
 
 from typing import Union
 
 logger = logging.getLogger(__name__)
 
+# Conteos de facetas por combinación de filtros; se invalida al registrar influencers
+cache_facetas = CacheTTL(ttl_segundos=settings.facetas_cache_ttl)
+
 
 class ServicioInfluencer:
     """Servicio de aplicación para operaciones de influencers."""
@@ -59,6 +64,43 @@ class ServicioInfluencer:
         logger.info(f"SERVICIO: {len(influencers)} influencers encontrados")
         return [self._convertir_a_dto(influencer) for influencer in influencers]
     
+    def obtener_facetas(
+        self,
+        estado: Optional[EstadoInfluencer] = None,
+        tipo: Optional[TipoInfluencer] = None,
+        categoria: Optional[str] = None,
+        plataforma: Optional[Plataforma] = None,
+        min_seguidores: Optional[int] = None,
+        max_seguidores: Optional[int] = None,
+        engagement_minimo: Optional[float] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """Obtiene los conteos por faceta bajo los mismos filtros del listado."""
+        filtros = dict(
+            estado=estado,
+            tipo=tipo,
+            categoria=categoria.lower() if categoria else None,
+            plataforma=plataforma,
+            min_seguidores=min_seguidores,
+            max_seguidores=max_seguidores,
+            engagement_minimo=engagement_minimo
+        )
+        clave = tuple(sorted((nombre, getattr(valor, 'value', valor)) for nombre, valor in filtros.items()))
+        
+        def calcular():
+            logger.info("SERVICIO: Calculando facetas de influencers")
+            return self.repositorio.contar_facetas(**filtros)
+        
+        return cache_facetas.obtener_o_calcular(clave, calcular)
+    
+    def buscar_influencers(self, texto: str, limite: int = 10) -> List[ResultadoBusquedaDTO]:
+        """Busca influencers por nombre ordenados por similitud."""
+        logger.info(f"SERVICIO: Buscando influencers por nombre: '{texto}'")
+        
+        resultados = self.repositorio.buscar_por_similitud(texto, limite=limite)
+        
+        logger.info(f"SERVICIO: {len(resultados)} resultados de búsqueda")
+        return [ResultadoBusquedaDTO(**resultado) for resultado in resultados]
+    
     def _convertir_a_dto(self, influencer: Influencer) -> InfluencerDTO:
         """Convierte una entidad Influencer a DTO."""
         
@@ -73,14 +73,19 @@ class Influencer(AgregacionRaiz):
         if self.estado != EstadoInfluencer.PENDIENTE:
             raise ExcepcionEstadoInvalido("El influencer debe estar en estado PENDIENTE para ser procesado")
         
-        # Emitir evento de registro
+        # Emitir evento de registro con el resumen de audiencia del agregado
+        tipo_principal = self.obtener_tipo_principal()
         self.agregar_evento(InfluencerRegistrado(
             influencer_id=self.id,
             nombre=self.nombre,
             email=self.email.valor,
             categorias=self.perfil.categorias.categorias,
-            plataformas=[],  # Se actualizará cuando se agreguen plataformas
-            fecha_registro=self.fecha_creacion
+            plataformas=[plataforma.value for plataforma in self.audiencia_por_plataforma],
+            fecha_registro=self.fecha_creacion,
+            total_seguidores=self.obtener_total_seguidores(),
+            tipo_principal=tipo_principal.value if tipo_principal else None,
+            paises_principales=list(self.demografia.paises_principales) if self.demografia else [],
+            engagement_promedio=self.obtener_engagement_promedio()
         ))
     
     def obtener_tipo_principal(self) -> Optional[TipoInfluencer]:
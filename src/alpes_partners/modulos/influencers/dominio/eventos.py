@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from ....seedwork.dominio.eventos import EventoDominio, EventoIntegracion
 from .objetos_valor import TipoInfluencer, EstadoInfluencer, Plataforma
 
@@ -13,11 +13,20 @@ class InfluencerRegistrado(EventoIntegracion):
                  email: str,
                  categorias: List[str],
                  plataformas: List[str],
-                 fecha_registro: datetime):
+                 fecha_registro: datetime,
+                 total_seguidores: int = 0,
+                 tipo_principal: Optional[str] = None,
+                 paises_principales: Optional[List[str]] = None,
+                 engagement_promedio: float = 0.0):
         super().__init__()
         self.influencer_id = influencer_id
         self.nombre = nombre
         self.email = email
         self.categorias = categorias
         self.plataformas = plataformas
-        self.fecha_registro = fecha_registro
\ No newline at end of file
+        self.fecha_registro = fecha_registro
+        # Resumen de audiencia del agregado (payload v2): los consumidores no releen la base de datos
+        self.total_seguidores = total_seguidores
+        self.tipo_principal = tipo_principal
+        self.paises_principales = paises_principales or []
+        self.engagement_promedio = engagement_promedio
\ No newline at end of file
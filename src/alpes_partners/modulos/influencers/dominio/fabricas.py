@@ -34,8 +34,10 @@ class _FabricaInfluencer:
             # Convertir entidad a DTO
             return mapeador.entidad_a_dto(obj) if mapeador else obj
         else:
-            # Crear entidad desde DTO
-            if isinstance(obj, RegistrarInfluencerDTO):
+            # Crear entidad desde DTO (el mapeador conserva id, audiencia y demografía)
+            if mapeador:
+                return mapeador.dto_a_entidad(obj)
+            elif isinstance(obj, RegistrarInfluencerDTO):
                 influencer = Influencer.crear(
                     nombre=obj.nombre,
                     email=obj.email,
@@ -46,8 +48,6 @@ class _FabricaInfluencer:
                     telefono=obj.telefono
                 )
                 return influencer
-            elif mapeador:
-                return mapeador.dto_a_entidad(obj)
             else:
                 return obj
 
@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from ....seedwork.dominio.repositorios import Repositorio
 from .entidades import Influencer
 from .objetos_valor import TipoInfluencer, EstadoInfluencer, Plataforma
@@ -34,10 +34,19 @@ class RepositorioInfluencers(Repositorio[Influencer]):
         pass
     
     @abstractmethod
-    def buscar_por_nombre(self, nombre: str) -> List[Influencer]:
+    def buscar_por_nombre(self, nombre: str, limite: int = 100) -> List[Influencer]:
         """Busca influencers por nombre (búsqueda parcial)."""
         pass
     
+    @abstractmethod
+    def buscar_por_similitud(self, texto: str, limite: int = 10) -> List[Dict[str, Any]]:
+        """Busca influencers por similitud de nombre, ordenados por relevancia.
+        
+        Retorna una proyección ligera (id, nombre, tipo_principal,
+        total_seguidores, puntaje) en lugar de entidades completas.
+        """
+        pass
+    
     @abstractmethod
     def obtener_por_rango_seguidores(self, min_seguidores: int, max_seguidores: int) -> List[Influencer]:
         """Obtiene influencers dentro de un rango de seguidores."""
@@ -48,6 +57,22 @@ class RepositorioInfluencers(Repositorio[Influencer]):
         """Obtiene influencers con engagement mínimo."""
         pass
     
+    @abstractmethod
+    def contar_facetas(self,
+                       estado: Optional[EstadoInfluencer] = None,
+                       tipo: Optional[TipoInfluencer] = None,
+                       categoria: Optional[str] = None,
+                       plataforma: Optional[Plataforma] = None,
+                       min_seguidores: Optional[int] = None,
+                       max_seguidores: Optional[int] = None,
+                       engagement_minimo: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """Cuenta los influencers que cumplen los filtros, agrupados por cada faceta.
+        
+        Retorna ``{faceta: {valor: cantidad}}`` con las facetas ``estado``,
+        ``tipo_principal``, ``plataforma`` y ``categoria``.
+        """
+        pass
+    
     @abstractmethod
     def existe_email(self, email: str) -> bool:
         """Verifica si existe un influencer con el email dado."""
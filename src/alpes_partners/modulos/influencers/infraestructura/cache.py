@@ -0,0 +1,36 @@
+"""
+Invalidación de la cache de facetas de influencers en el proceso de la API.
+
+Los influencers se registran a partir de comandos que atiende otro proceso
+(o cualquier instancia de la API), así que cada instancia lee el tópico de
+eventos y limpia su propia cache. Los influencers no publican cambios de
+estado: solo el registro invalida; el resto se acepta con el desfase del
+TTL de la cache.
+"""
+
+import logging
+
+from alpes_partners.config.settings import settings
+from alpes_partners.seedwork.infraestructura import utils
+from alpes_partners.seedwork.infraestructura.broker import crear_cliente
+from alpes_partners.seedwork.infraestructura.lectores import iniciar_lector
+from ..aplicacion.servicios import cache_facetas
+from .schema.v2.eventos import EventoInfluencerRegistrado
+
+logger = logging.getLogger(__name__)
+
+
+def _invalidar(evento):
+    cache_facetas.invalidar()
+
+
+def iniciar_invalidacion_facetas(cliente=None):
+    """Inicia el lector que invalida ``cache_facetas`` con cada registro de influencer."""
+    cliente = cliente or crear_cliente()
+    # La versión 2 se publica siempre (la 1 depende de eventos_influencers_publicar_v1)
+    iniciar_lector(
+        cliente, settings.eventos_topico_influencers_v2, EventoInfluencerRegistrado, _invalidar,
+        desde=utils.time_millis(), nombre="cache-facetas-influencers"
+    )
+    logger.info("INFLUENCERS: Invalidación de cache de facetas por eventos iniciada")
+    return cliente
@@ -1,10 +1,11 @@
-import pulsar
 from pulsar.schema import *
 
+from alpes_partners.config.settings import settings
 from alpes_partners.modulos.influencers.infraestructura.schema.v1.eventos import (
     EventoInfluencerRegistrado, InfluencerRegistradoPayload
 )
-from alpes_partners.seedwork.infraestructura import utils
+from alpes_partners.modulos.influencers.infraestructura.schema.v2 import eventos as eventos_v2
+from alpes_partners.seedwork.infraestructura.publicadores import obtener_publicador
 
 import datetime
 
@@ -15,29 +16,59 @@ def unix_time_millis(dt):
 
 
 class DespachadorInfluencers:
-    def _publicar_mensaje(self, mensaje, topico, schema):
-        cliente = pulsar.Client(f'pulsar://{utils.broker_host()}:6650')
-        publicador = cliente.create_producer(topico, schema=schema)
-        publicador.send(mensaje)
-        cliente.close()
+    def _publicar_mensaje(self, mensaje, topico, schema, sincrono=False):
+        # Productor con nombre y sequence ids del proceso (deduplicación en el broker)
+        publicador = obtener_publicador(topico, schema, "alpes-partners-influencers")
+        if sincrono:
+            publicador.publicar(mensaje)
+        else:
+            # Se agrupa en el lote abierto del productor; el ack llega a las métricas del publicador
+            publicador.publicar_async(mensaje)
 
-    def publicar_evento_influencer_registrado(self, evento, topico='eventos-influencers'):
-        """Publica evento cuando un influencer es registrado."""
-        payload = InfluencerRegistradoPayload(
-            id_influencer=str(evento.influencer_id), 
-            nombre=str(evento.nombre), 
-            email=str(evento.email), 
-            categorias=evento.categorias,
-            fecha_registro=int(unix_time_millis(evento.fecha_registro))
-        )
-        evento_integracion = EventoInfluencerRegistrado(
+    def _evento_integracion(self, evento, clase, payload):
+        return clase(
             id=str(evento.id),
             time=int(unix_time_millis(evento.fecha_registro)),
-            ingestion=int(unix_time_millis(datetime.datetime.utcnow())),
             specversion="1.0",
             type="InfluencerRegistrado",
             datacontenttype="application/json",
             service_name="alpes-partners-influencers",
             data=payload
         )
-        self._publicar_mensaje(evento_integracion, topico, AvroSchema(EventoInfluencerRegistrado))
+
+    def publicar_evento_influencer_registrado(self, evento, topico='eventos-influencers'):
+        """Publica evento cuando un influencer es registrado.
+
+        La versión 2 (con el resumen de audiencia) va a su propio tópico; la
+        versión 1 se sigue publicando en ``topico`` para sus consumidores.
+        """
+        fecha_registro = int(unix_time_millis(evento.fecha_registro))
+        if settings.eventos_influencers_publicar_v1:
+            payload = InfluencerRegistradoPayload(
+                id_influencer=str(evento.influencer_id), 
+                nombre=str(evento.nombre), 
+                email=str(evento.email), 
+                categorias=evento.categorias,
+                fecha_registro=fecha_registro
+            )
+            self._publicar_mensaje(
+                self._evento_integracion(evento, EventoInfluencerRegistrado, payload),
+                topico, EventoInfluencerRegistrado
+            )
+
+        payload_v2 = eventos_v2.InfluencerRegistradoPayload(
+            id_influencer=str(evento.influencer_id),
+            nombre=str(evento.nombre),
+            email=str(evento.email),
+            categorias=evento.categorias,
+            fecha_registro=fecha_registro,
+            plataformas=evento.plataformas,
+            total_seguidores=int(evento.total_seguidores),
+            tipo_principal=evento.tipo_principal,
+            paises_principales=evento.paises_principales,
+            engagement_promedio=float(evento.engagement_promedio)
+        )
+        self._publicar_mensaje(
+            self._evento_integracion(evento, eventos_v2.EventoInfluencerRegistrado, payload_v2),
+            settings.eventos_topico_influencers_v2, eventos_v2.EventoInfluencerRegistrado
+        )
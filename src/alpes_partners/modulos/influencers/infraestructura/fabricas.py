@@ -31,7 +31,7 @@ class FabricaRepositorioInfluencers:
     def crear_objeto(self, obj: type, mapeador: Any = None) -> RepositorioInfluencersSQLAlchemy:
         if obj == RepositorioInfluencersSQLAlchemy.__class__:
             # Crear una instancia del repositorio SIN sesión (como en el tutorial)
-            # El repositorio usará db.session directamente
+            # El repositorio usará la sesión actual
             return RepositorioInfluencersSQLAlchemy()
         else:
             raise ExcepcionFabricaInfluencers(f"No se puede crear repositorio para el tipo: {obj}")
@@ -9,6 +9,7 @@ from ..dominio.objetos_valor import (
     Demografia, Plataforma, Genero, RangoEdad
 )
 from ....seedwork.dominio.objetos_valor import Email, Telefono
+from ....seedwork.infraestructura.utils import normalizar_texto
 from .modelos import InfluencerModelo
 
 logger = logging.getLogger(__name__)
@@ -18,14 +19,12 @@ class InfluencerMapper:
     """Mapper para convertir entre entidades de dominio y modelos SQLAlchemy."""
     
     @staticmethod
-    def a_modelo(influencer: Influencer) -> InfluencerModelo:
-        """Convierte una entidad Influencer a modelo SQLAlchemy."""
+    def a_valores(influencer: Influencer) -> Dict[str, Any]:
+        """Calcula los valores de columna de la entidad (sin id, fecha de creación ni versión)."""
         
         # Convertir estado a string
         estado_valor = influencer.estado.value if hasattr(influencer.estado, 'value') else str(influencer.estado)
         
-        logger.info(f"MAPPER: Convirtiendo entidad a modelo - ID: {influencer.id}, Estado: {estado_valor}")
-        
         # Convertir audiencia por plataforma a JSON
         audiencia_json = {}
         total_seguidores = 0
@@ -69,29 +68,42 @@ class InfluencerMapper:
                 'paises_principales': influencer.demografia.paises_principales
             }
         
+        return {
+            'nombre': influencer.nombre,
+            'nombre_normalizado': normalizar_texto(influencer.nombre),
+            'email': influencer.email.valor,
+            'telefono': influencer.telefono.numero if influencer.telefono else None,
+            'estado': estado_valor,
+            'categorias': influencer.perfil.categorias.categorias,
+            'descripcion': influencer.perfil.descripcion,
+            'biografia': influencer.perfil.biografia,
+            'sitio_web': influencer.perfil.sitio_web,
+            'audiencia_por_plataforma': audiencia_json,
+            'demografia': demografia_json,
+            'campanas_completadas': influencer.metricas.campanas_completadas,
+            'engagement_promedio': engagement_promedio_calculado,
+            'cpm_promedio': influencer.metricas.cpm_promedio,
+            'ingresos_generados': influencer.metricas.ingresos_generados,
+            'total_seguidores': total_seguidores,
+            'tipo_principal': tipo_principal,
+            'plataformas_activas': plataformas_activas,
+            'fecha_activacion': influencer.fecha_activacion,
+            'fecha_desactivacion': influencer.fecha_desactivacion
+        }
+    
+    @staticmethod
+    def a_modelo(influencer: Influencer) -> InfluencerModelo:
+        """Convierte una entidad Influencer a modelo SQLAlchemy."""
+        
+        valores = InfluencerMapper.a_valores(influencer)
+        
+        logger.info(f"MAPPER: Convirtiendo entidad a modelo - ID: {influencer.id}, Estado: {valores['estado']}")
+        
         return InfluencerModelo(
             id=influencer.id,
-            nombre=influencer.nombre,
-            email=influencer.email.valor,
-            telefono=influencer.telefono.numero if influencer.telefono else None,
-            estado=estado_valor,
-            categorias=influencer.perfil.categorias.categorias,
-            descripcion=influencer.perfil.descripcion,
-            biografia=influencer.perfil.biografia,
-            sitio_web=influencer.perfil.sitio_web,
-            audiencia_por_plataforma=audiencia_json,
-            demografia=demografia_json,
-            campanas_completadas=influencer.metricas.campanas_completadas,
-            engagement_promedio=engagement_promedio_calculado,
-            cpm_promedio=influencer.metricas.cpm_promedio,
-            ingresos_generados=influencer.metricas.ingresos_generados,
-            total_seguidores=total_seguidores,
-            tipo_principal=tipo_principal,
-            plataformas_activas=plataformas_activas,
             fecha_creacion=influencer.fecha_creacion,
-            fecha_activacion=influencer.fecha_activacion,
-            fecha_desactivacion=influencer.fecha_desactivacion,
-            version=str(influencer.version)
+            version=influencer.version,
+            **valores
         )
     
     @staticmethod
@@ -132,7 +144,7 @@ class InfluencerMapper:
         influencer.fecha_creacion = modelo.fecha_creacion
         influencer.fecha_activacion = modelo.fecha_activacion
         influencer.fecha_desactivacion = modelo.fecha_desactivacion
-        influencer.version = int(modelo.version) if modelo.version.isdigit() else 1
+        influencer.version = int(modelo.version or 1)
         
         # Reconstruir audiencia por plataforma
         if modelo.audiencia_por_plataforma:
@@ -196,68 +208,8 @@ class InfluencerMapper:
         
         logger.info(f"MAPPER: Actualizando modelo existente - ID: {influencer.id}")
         
-        # Actualizar campos básicos
-        modelo.nombre = influencer.nombre
-        modelo.email = influencer.email.valor
-        modelo.telefono = influencer.telefono.numero if influencer.telefono else None
-        modelo.estado = influencer.estado.value if hasattr(influencer.estado, 'value') else str(influencer.estado)
-        
-        # Actualizar perfil
-        modelo.categorias = influencer.perfil.categorias.categorias
-        modelo.descripcion = influencer.perfil.descripcion
-        modelo.biografia = influencer.perfil.biografia
-        modelo.sitio_web = influencer.perfil.sitio_web
-        
-        # Actualizar audiencia
-        audiencia_json = {}
-        total_seguidores = 0
-        plataformas_activas = []
-        engagement_total = 0.0
-        
-        for plataforma, datos in influencer.audiencia_por_plataforma.items():
-            plataforma_key = plataforma.value if hasattr(plataforma, 'value') else str(plataforma)
-            audiencia_json[plataforma_key] = {
-                'seguidores': datos.seguidores,
-                'engagement_rate': datos.engagement_rate,
-                'alcance_promedio': datos.alcance_promedio
-            }
-            total_seguidores += datos.seguidores
-            plataformas_activas.append(plataforma_key)
-            engagement_total += datos.engagement_rate
-        
-        modelo.audiencia_por_plataforma = audiencia_json
-        modelo.total_seguidores = total_seguidores
-        modelo.plataformas_activas = plataformas_activas
-        
-        # Calcular tipo principal
-        if total_seguidores > 0:
-            if total_seguidores < 10000:
-                modelo.tipo_principal = TipoInfluencer.NANO.value
-            elif total_seguidores < 100000:
-                modelo.tipo_principal = TipoInfluencer.MICRO.value
-            elif total_seguidores < 1000000:
-                modelo.tipo_principal = TipoInfluencer.MACRO.value
-            elif total_seguidores < 10000000:
-                modelo.tipo_principal = TipoInfluencer.MEGA.value
-            else:
-                modelo.tipo_principal = TipoInfluencer.CELEBRITY.value
-        
-        # Actualizar métricas
-        modelo.campanas_completadas = influencer.metricas.campanas_completadas
-        modelo.engagement_promedio = (engagement_total / len(influencer.audiencia_por_plataforma)) if influencer.audiencia_por_plataforma else 0.0
-        modelo.cpm_promedio = influencer.metricas.cpm_promedio
-        modelo.ingresos_generados = influencer.metricas.ingresos_generados
-        
-        # Actualizar demografía
-        if influencer.demografia:
-            modelo.demografia = {
-                'distribucion_genero': {k.value: v for k, v in influencer.demografia.distribucion_genero.items()},
-                'distribucion_edad': {k.value: v for k, v in influencer.demografia.distribucion_edad.items()},
-                'paises_principales': influencer.demografia.paises_principales
-            }
+        for columna, valor in InfluencerMapper.a_valores(influencer).items():
+            setattr(modelo, columna, valor)
         
-        # Actualizar fechas
-        modelo.fecha_activacion = influencer.fecha_activacion
-        modelo.fecha_desactivacion = influencer.fecha_desactivacion
-        modelo.version = str(influencer.version)
+        modelo.version = influencer.version
         modelo.fecha_actualizacion = datetime.utcnow()
@@ -1,20 +1,38 @@
-import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, JSON, Boolean
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, JSON, Boolean, Index, DDL, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 
+from ....seedwork.dominio.identificadores import uuid7
+
 Base = declarative_base()
 
+# La búsqueda por nombre usa índices de trigramas (pg_trgm)
+event.listen(Base.metadata, 'before_create', DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
 
 class InfluencerModelo(Base):
     """Modelo SQLAlchemy para Influencer."""
     
     __tablename__ = "influencers"
+    __table_args__ = (
+        # Coincidencias por similitud / subcadena (word_similarity, ILIKE '%...%')
+        Index(
+            'ix_influencers_nombre_normalizado_trgm', 'nombre_normalizado',
+            postgresql_using='gin',
+            postgresql_ops={'nombre_normalizado': 'gin_trgm_ops'}
+        ),
+        # Coincidencias por prefijo (typeahead con menos de 3 caracteres)
+        Index(
+            'ix_influencers_nombre_normalizado_prefijo', 'nombre_normalizado',
+            postgresql_ops={'nombre_normalizado': 'varchar_pattern_ops'}
+        ),
+    )
     
     # Campos básicos
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     nombre = Column(String(255), nullable=False)
+    nombre_normalizado = Column(String(255), nullable=False, default="")  # Sin acentos y en minúsculas
     email = Column(String(255), nullable=False, unique=True)
     telefono = Column(String(50), nullable=True)
     estado = Column(String(50), nullable=False, default="pendiente")
@@ -48,8 +66,8 @@ class InfluencerModelo(Base):
     fecha_desactivacion = Column(DateTime, nullable=True)
     fecha_actualizacion = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Control de versión
-    version = Column(String, nullable=False, default="1")
+    # Control de versión (bloqueo optimista: UPDATE ... WHERE version = :leida)
+    version = Column(Integer, nullable=False, default=1)
     
     def __repr__(self):
         return f"<InfluencerModelo(id={self.id}, nombre={self.nombre}, email={self.email})>"
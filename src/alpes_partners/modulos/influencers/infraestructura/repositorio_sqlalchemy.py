@@ -1,31 +1,43 @@
 import logging
-from typing import List, Optional
-from sqlalchemy import and_, or_, func
+from datetime import datetime
+from typing import List, Optional, Dict, Any
+from sqlalchemy import and_, or_, func, update, literal, select, union_all, true
 
 from ..dominio.repositorios import RepositorioInfluencers
 from ..dominio.entidades import Influencer
 from ..dominio.objetos_valor import TipoInfluencer, EstadoInfluencer, Plataforma
 from .modelos import InfluencerModelo
 from .mappers import InfluencerMapper
+from ....seedwork.dominio.excepciones import ExcepcionConcurrencia
+from ....seedwork.infraestructura.uow import Lock
+from ....seedwork.infraestructura.utils import normalizar_texto
 
-# Importar db como en el tutorial
-from ....seedwork.infraestructura.database import db
+# Sesión de la API o del contexto de trabajo del worker
+from ....seedwork.infraestructura.database import sesion_actual
 
 logger = logging.getLogger(__name__)
 
+# Por debajo de este largo los trigramas no discriminan; solo se usa el prefijo
+LARGO_MINIMO_TRIGRAMAS = 3
+
+
+def _escapar_like(texto: str) -> str:
+    """Escapa los comodines de LIKE para buscar el texto de forma literal."""
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
 
 class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
     """Implementación SQLAlchemy del repositorio de influencers."""
     
     def __init__(self):
-        # Sin parámetros, usa db.session directamente como en el tutorial
+        # Sin parámetros, usa la sesión actual (Flask o contexto de trabajo)
         pass
     
     def obtener_por_id(self, id: str) -> Optional[Influencer]:
         """Obtiene un influencer por ID."""
         logger.info(f" REPOSITORIO: Buscando influencer por ID: {id}")
         
-        modelo = db.session.query(InfluencerModelo).filter(
+        modelo = sesion_actual().query(InfluencerModelo).filter(
             InfluencerModelo.id == id
         ).first()
         
@@ -40,7 +52,7 @@ class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
         """Obtiene un influencer por email."""
         logger.info(f" REPOSITORIO: Buscando influencer por email: {email}")
         
-        modelo = db.session.query(InfluencerModelo).filter(
+        modelo = sesion_actual().query(InfluencerModelo).filter(
             InfluencerModelo.email == email
         ).first()
         
@@ -57,39 +69,67 @@ class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
         modelo = InfluencerMapper.a_modelo(entidad)
         logger.info(f" REPOSITORIO: Modelo SQLAlchemy creado - ID: {modelo.id}")
         
-        db.session.add(modelo)
+        sesion_actual().add(modelo)
         logger.info(f" REPOSITORIO: Influencer agregado a la sesión - ID: {modelo.id}")
         
-        if modelo in db.session.new:
+        if modelo in sesion_actual().new:
             logger.info(f" REPOSITORIO: Confirmado - El modelo está en session.new")
         else:
             logger.warning(f" REPOSITORIO: PROBLEMA - El modelo NO está en session.new")
     
-    def actualizar(self, entidad: Influencer) -> None:
-        """Actualiza un influencer."""
-        logger.info(f" REPOSITORIO: Actualizando influencer - ID: {entidad.id}")
-        
-        modelo = db.session.query(InfluencerModelo).filter(
-            InfluencerModelo.id == entidad.id
-        ).first()
+    def actualizar(self, entidad: Influencer, lock: Lock = Lock.OPTIMISTA) -> None:
+        """Actualiza un influencer con compare-and-swap sobre la versión.
+        
+        Un único UPDATE condicionado a la versión leída: sin SELECT previo ni
+        bloqueos de fila en el modo optimista.
+        """
+        logger.info(f" REPOSITORIO: Actualizando influencer - ID: {entidad.id}, Versión: {entidad.version}")
+        
+        if lock == Lock.PESIMISTA:
+            sesion_actual().query(InfluencerModelo.id).filter(
+                InfluencerModelo.id == entidad.id
+            ).with_for_update().first()
+        
+        version_leida = entidad.version
+        valores = InfluencerMapper.a_valores(entidad)
+        valores['version'] = version_leida + 1
+        valores['fecha_actualizacion'] = datetime.utcnow()
+        
+        resultado = sesion_actual().execute(
+            update(InfluencerModelo)
+            .where(
+                InfluencerModelo.id == entidad.id,
+                InfluencerModelo.version == version_leida
+            )
+            .values(**valores)
+            .execution_options(synchronize_session=False)
+        )
+        
+        if resultado.rowcount == 0:
+            existe = sesion_actual().query(InfluencerModelo.id).filter(
+                InfluencerModelo.id == entidad.id
+            ).first() is not None
+            if not existe:
+                logger.warning(f" REPOSITORIO: Influencer no encontrado para actualizar: {entidad.id}")
+                raise ValueError(f"Influencer con ID {entidad.id} no encontrado")
+            logger.warning(f" REPOSITORIO: Conflicto de versión al actualizar influencer {entidad.id} (versión {version_leida})")
+            raise ExcepcionConcurrencia(
+                f"El influencer {entidad.id} fue modificado por otra transacción (versión leída {version_leida})"
+            )
         
-        if modelo:
-            InfluencerMapper.actualizar_modelo(modelo, entidad)
-            logger.info(f" REPOSITORIO: Influencer actualizado - ID: {entidad.id}")
-        else:
-            logger.warning(f" REPOSITORIO: Influencer no encontrado para actualizar: {entidad.id}")
-            raise ValueError(f"Influencer con ID {entidad.id} no encontrado")
+        entidad.version = version_leida + 1
+        logger.info(f" REPOSITORIO: Influencer actualizado - ID: {entidad.id}, Versión: {entidad.version}")
     
     def eliminar(self, id: str) -> None:
         """Elimina un influencer."""
         logger.info(f" REPOSITORIO: Eliminando influencer - ID: {id}")
         
-        modelo = db.session.query(InfluencerModelo).filter(
+        modelo = sesion_actual().query(InfluencerModelo).filter(
             InfluencerModelo.id == id
         ).first()
         
         if modelo:
-            db.session.delete(modelo)
+            sesion_actual().delete(modelo)
             logger.info(f" REPOSITORIO: Influencer eliminado - ID: {id}")
         else:
             logger.warning(f" REPOSITORIO: Influencer no encontrado para eliminar: {id}")
@@ -98,7 +138,7 @@ class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
         """Obtiene todos los influencers."""
         logger.info(" REPOSITORIO: Obteniendo todos los influencers")
         
-        modelos = db.session.query(InfluencerModelo).all()
+        modelos = sesion_actual().query(InfluencerModelo).all()
         influencers = [InfluencerMapper.a_entidad(modelo) for modelo in modelos]
         
         logger.info(f" REPOSITORIO: {len(influencers)} influencers encontrados")
@@ -108,7 +148,7 @@ class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
         """Obtiene influencers por estado."""
         logger.info(f" REPOSITORIO: Buscando influencers por estado: {estado.value}")
         
-        modelos = db.session.query(InfluencerModelo).filter(
+        modelos = sesion_actual().query(InfluencerModelo).filter(
             InfluencerModelo.estado == estado.value
         ).all()
         
@@ -120,7 +160,7 @@ class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
         """Obtiene influencers por tipo."""
         logger.info(f" REPOSITORIO: Buscando influencers por tipo: {tipo.value}")
         
-        modelos = db.session.query(InfluencerModelo).filter(
+        modelos = sesion_actual().query(InfluencerModelo).filter(
             InfluencerModelo.tipo_principal == tipo.value
         ).all()
         
@@ -133,7 +173,7 @@ class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
         logger.info(f" REPOSITORIO: Buscando influencers por categoría: {categoria}")
         
         # Buscar en el JSON de categorías
-        modelos = db.session.query(InfluencerModelo).filter(
+        modelos = sesion_actual().query(InfluencerModelo).filter(
             func.json_array_length(InfluencerModelo.categorias) > 0
         ).all()
         
@@ -151,7 +191,7 @@ class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
         logger.info(f" REPOSITORIO: Buscando influencers por plataforma: {plataforma.value}")
         
         # Buscar en el JSON de plataformas activas
-        modelos = db.session.query(InfluencerModelo).filter(
+        modelos = sesion_actual().query(InfluencerModelo).filter(
             InfluencerModelo.plataformas_activas.contains([plataforma.value])
         ).all()
         
@@ -159,23 +199,72 @@ class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
         logger.info(f" REPOSITORIO: {len(influencers)} influencers encontrados en {plataforma.value}")
         return influencers
     
-    def buscar_por_nombre(self, nombre: str) -> List[Influencer]:
-        """Busca influencers por nombre (búsqueda parcial)."""
+    def buscar_por_nombre(self, nombre: str, limite: int = 100) -> List[Influencer]:
+        """Busca influencers por nombre (búsqueda parcial, sin distinguir acentos)."""
         logger.info(f" REPOSITORIO: Buscando influencers por nombre: {nombre}")
         
-        modelos = db.session.query(InfluencerModelo).filter(
-            InfluencerModelo.nombre.ilike(f"%{nombre}%")
-        ).all()
+        # ILIKE '%...%' sobre la columna normalizada lo resuelve el índice de trigramas
+        termino = _escapar_like(normalizar_texto(nombre))
+        modelos = sesion_actual().query(InfluencerModelo).filter(
+            InfluencerModelo.nombre_normalizado.like(f"%{termino}%", escape='\\')
+        ).order_by(InfluencerModelo.nombre).limit(limite).all()
         
         influencers = [InfluencerMapper.a_entidad(modelo) for modelo in modelos]
         logger.info(f" REPOSITORIO: {len(influencers)} influencers encontrados con nombre similar a '{nombre}'")
         return influencers
     
+    def buscar_por_similitud(self, texto: str, limite: int = 10) -> List[Dict[str, Any]]:
+        """Busca influencers por similitud de nombre, ordenados por relevancia.
+        
+        Las coincidencias por prefijo van primero y luego las demás por
+        ``word_similarity``. Ambos filtros son indexables (btree con
+        varchar_pattern_ops y GIN gin_trgm_ops), y solo se proyectan las
+        columnas que necesita un typeahead.
+        """
+        termino = normalizar_texto(texto)
+        logger.info(f" REPOSITORIO: Búsqueda por similitud: '{termino}' (límite {limite})")
+        if not termino:
+            return []
+        
+        columna = InfluencerModelo.nombre_normalizado
+        es_prefijo = columna.like(f"{_escapar_like(termino)}%", escape='\\')
+        puntaje = func.word_similarity(termino, columna)
+        
+        filtro = es_prefijo
+        if len(termino) >= LARGO_MINIMO_TRIGRAMAS:
+            # termino <% columna  <=>  word_similarity(termino, columna) >= umbral
+            filtro = or_(es_prefijo, literal(termino).op('<%')(columna))
+        
+        filas = sesion_actual().query(
+            InfluencerModelo.id,
+            InfluencerModelo.nombre,
+            InfluencerModelo.tipo_principal,
+            InfluencerModelo.total_seguidores,
+            puntaje.label('puntaje')
+        ).filter(filtro).order_by(
+            es_prefijo.desc(),
+            puntaje.desc(),
+            InfluencerModelo.nombre
+        ).limit(limite).all()
+        
+        resultados = [
+            {
+                'id': str(fila.id),
+                'nombre': fila.nombre,
+                'tipo_principal': fila.tipo_principal,
+                'total_seguidores': fila.total_seguidores,
+                'puntaje': float(fila.puntaje or 0.0)
+            }
+            for fila in filas
+        ]
+        logger.info(f" REPOSITORIO: {len(resultados)} resultados para '{termino}'")
+        return resultados
+    
     def obtener_por_rango_seguidores(self, min_seguidores: int, max_seguidores: int) -> List[Influencer]:
         """Obtiene influencers dentro de un rango de seguidores."""
         logger.info(f" REPOSITORIO: Buscando influencers con {min_seguidores}-{max_seguidores} seguidores")
         
-        modelos = db.session.query(InfluencerModelo).filter(
+        modelos = sesion_actual().query(InfluencerModelo).filter(
             and_(
                 InfluencerModelo.total_seguidores >= min_seguidores,
                 InfluencerModelo.total_seguidores <= max_seguidores
@@ -190,7 +279,7 @@ class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
         """Obtiene influencers con engagement mínimo."""
         logger.info(f" REPOSITORIO: Buscando influencers con engagement >= {engagement_minimo}%")
         
-        modelos = db.session.query(InfluencerModelo).filter(
+        modelos = sesion_actual().query(InfluencerModelo).filter(
             InfluencerModelo.engagement_promedio >= engagement_minimo
         ).all()
         
@@ -202,29 +291,23 @@ class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
         """Verifica si existe un influencer con el email dado."""
         logger.info(f" REPOSITORIO: Verificando existencia de email: {email}")
         
-        existe = db.session.query(InfluencerModelo).filter(
+        existe = sesion_actual().query(InfluencerModelo).filter(
             InfluencerModelo.email == email
         ).first() is not None
         
         logger.info(f" REPOSITORIO: Email {'existe' if existe else 'no existe'}: {email}")
         return existe
     
-    def obtener_con_filtros(self, 
-                           estado: Optional[EstadoInfluencer] = None,
-                           tipo: Optional[TipoInfluencer] = None,
-                           categoria: Optional[str] = None,
-                           plataforma: Optional[Plataforma] = None,
-                           min_seguidores: Optional[int] = None,
-                           max_seguidores: Optional[int] = None,
-                           engagement_minimo: Optional[float] = None,
-                           limite: int = 100,
-                           offset: int = 0) -> List[Influencer]:
-        """Obtiene influencers con múltiples filtros."""
-        logger.info(" REPOSITORIO: Aplicando filtros múltiples")
-        
-        query = db.session.query(InfluencerModelo)
-        
-        # Aplicar filtros
+    def _aplicar_filtros(self,
+                         query,
+                         estado: Optional[EstadoInfluencer] = None,
+                         tipo: Optional[TipoInfluencer] = None,
+                         categoria: Optional[str] = None,
+                         plataforma: Optional[Plataforma] = None,
+                         min_seguidores: Optional[int] = None,
+                         max_seguidores: Optional[int] = None,
+                         engagement_minimo: Optional[float] = None):
+        """Aplica en SQL los filtros comunes a listados y facetas."""
         if estado:
             query = query.filter(InfluencerModelo.estado == estado.value)
         
@@ -243,19 +326,102 @@ class RepositorioInfluencersSQLAlchemy(RepositorioInfluencers):
         if plataforma:
             query = query.filter(InfluencerModelo.plataformas_activas.contains([plataforma.value]))
         
-        # Aplicar paginación
-        query = query.offset(offset).limit(limite)
+        if categoria:
+            # Sin distinguir mayúsculas, dentro de la consulta (antes se filtraba en Python tras paginar)
+            elementos = func.json_array_elements_text(InfluencerModelo.categorias).table_valued('value')
+            query = query.filter(
+                select(literal(1)).select_from(elementos)
+                .where(func.lower(elementos.c.value) == categoria.lower())
+                .exists()
+            )
+        
+        return query
+    
+    def obtener_con_filtros(self, 
+                           estado: Optional[EstadoInfluencer] = None,
+                           tipo: Optional[TipoInfluencer] = None,
+                           categoria: Optional[str] = None,
+                           plataforma: Optional[Plataforma] = None,
+                           min_seguidores: Optional[int] = None,
+                           max_seguidores: Optional[int] = None,
+                           engagement_minimo: Optional[float] = None,
+                           limite: int = 100,
+                           offset: int = 0) -> List[Influencer]:
+        """Obtiene influencers con múltiples filtros."""
+        logger.info(" REPOSITORIO: Aplicando filtros múltiples")
         
-        modelos = query.all()
+        query = self._aplicar_filtros(
+            sesion_actual().query(InfluencerModelo),
+            estado=estado,
+            tipo=tipo,
+            categoria=categoria,
+            plataforma=plataforma,
+            min_seguidores=min_seguidores,
+            max_seguidores=max_seguidores,
+            engagement_minimo=engagement_minimo
+        )
         
-        # Filtrar por categoría en Python (más preciso)
-        if categoria:
-            modelos_filtrados = []
-            for modelo in modelos:
-                if categoria.lower() in [cat.lower() for cat in modelo.categorias]:
-                    modelos_filtrados.append(modelo)
-            modelos = modelos_filtrados
+        # Aplicar paginación
+        modelos = query.offset(offset).limit(limite).all()
         
         influencers = [InfluencerMapper.a_entidad(modelo) for modelo in modelos]
         logger.info(f" REPOSITORIO: {len(influencers)} influencers encontrados con filtros aplicados")
         return influencers
+    
+    def contar_facetas(self,
+                       estado: Optional[EstadoInfluencer] = None,
+                       tipo: Optional[TipoInfluencer] = None,
+                       categoria: Optional[str] = None,
+                       plataforma: Optional[Plataforma] = None,
+                       min_seguidores: Optional[int] = None,
+                       max_seguidores: Optional[int] = None,
+                       engagement_minimo: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """Cuenta influencers por estado, tipo, plataforma y categoría en una sola consulta.
+        
+        Las filas filtradas se leen una vez (CTE) y cada faceta es un GROUP BY
+        sobre ella, unidos con UNION ALL en una única sentencia.
+        """
+        logger.info(" REPOSITORIO: Calculando facetas de influencers")
+        
+        filtrados = self._aplicar_filtros(
+            sesion_actual().query(
+                InfluencerModelo.estado,
+                InfluencerModelo.tipo_principal,
+                InfluencerModelo.plataformas_activas,
+                InfluencerModelo.categorias
+            ),
+            estado=estado,
+            tipo=tipo,
+            categoria=categoria,
+            plataforma=plataforma,
+            min_seguidores=min_seguidores,
+            max_seguidores=max_seguidores,
+            engagement_minimo=engagement_minimo
+        ).cte('filtrados')
+        
+        plataformas = func.json_array_elements_text(filtrados.c.plataformas_activas).table_valued('value').alias('plataforma')
+        categorias = func.json_array_elements_text(filtrados.c.categorias).table_valued('value').alias('categoria')
+        categoria_normalizada = func.lower(categorias.c.value)
+        
+        consulta = union_all(
+            select(literal('estado').label('faceta'), filtrados.c.estado.label('valor'), func.count().label('total'))
+            .group_by(filtrados.c.estado),
+            select(literal('tipo_principal'), filtrados.c.tipo_principal, func.count())
+            .group_by(filtrados.c.tipo_principal),
+            select(literal('plataforma'), plataformas.c.value, func.count())
+            .select_from(filtrados.join(plataformas, true()))
+            .group_by(plataformas.c.value),
+            select(literal('categoria'), categoria_normalizada, func.count())
+            .select_from(filtrados.join(categorias, true()))
+            .group_by(categoria_normalizada),
+        )
+        
+        facetas: Dict[str, Dict[str, int]] = {
+            'estado': {}, 'tipo_principal': {}, 'plataforma': {}, 'categoria': {}
+        }
+        for faceta, valor, total in sesion_actual().execute(consulta):
+            if valor is not None:
+                facetas[faceta][valor] = total
+        
+        logger.info(f" REPOSITORIO: Facetas calculadas - {sum(facetas['estado'].values())} influencers")
+        return facetas
@@ -1,5 +1,6 @@
 from pulsar.schema import *
 from alpes_partners.seedwork.infraestructura.schema.v1.comandos import ComandoIntegracion
+from alpes_partners.seedwork.infraestructura.schema.registro import registrar_schema
 
 
 class RegistrarInfluencerPayload(Record):
@@ -13,5 +14,6 @@ class RegistrarInfluencerPayload(Record):
     telefono = String()
 
 
+@registrar_schema('RegistrarInfluencer', version=1)
 class ComandoRegistrarInfluencer(ComandoIntegracion):
     data = RegistrarInfluencerPayload()
@@ -1,5 +1,6 @@
 from pulsar.schema import *
 from alpes_partners.seedwork.infraestructura.schema.v1.eventos import EventoIntegracion
+from alpes_partners.seedwork.infraestructura.schema.registro import registrar_schema
 
 
 class InfluencerRegistradoPayload(Record):
@@ -10,5 +11,6 @@ class InfluencerRegistradoPayload(Record):
     fecha_registro = Long()
 
 
+@registrar_schema('InfluencerRegistrado', version=1)
 class EventoInfluencerRegistrado(EventoIntegracion):
     data = InfluencerRegistradoPayload()
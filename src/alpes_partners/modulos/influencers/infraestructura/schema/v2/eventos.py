@@ -0,0 +1,22 @@
+from pulsar.schema import *
+from alpes_partners.seedwork.infraestructura.schema.v1.eventos import EventoIntegracion
+from alpes_partners.seedwork.infraestructura.schema.registro import registrar_schema
+
+
+class InfluencerRegistradoPayload(Record):
+    id_influencer = String()
+    nombre = String()
+    email = String()
+    categorias = Array(String())
+    fecha_registro = Long()
+    # Resumen de audiencia: los consumidores no necesitan consultar la base de influencers
+    plataformas = Array(String())
+    total_seguidores = Long()
+    tipo_principal = String()  # nano | micro | macro | mega | celebrity (vacío sin audiencia)
+    paises_principales = Array(String())
+    engagement_promedio = Double()
+
+
+@registrar_schema('InfluencerRegistrado', version=2)
+class EventoInfluencerRegistrado(EventoIntegracion):
+    data = InfluencerRegistradoPayload()
@@ -0,0 +1,4 @@
+"""
+Módulo de sugerencias: autocompletado de nombres de influencers y campanas
+servido desde un índice en memoria.
+"""
@@ -0,0 +1,8 @@
+from ....seedwork.aplicacion.dto import DTO
+
+
+class SugerenciaDTO(DTO):
+    """DTO para una sugerencia de autocompletado."""
+    tipo: str  # influencer | campana
+    id: str
+    nombre: str
@@ -0,0 +1,28 @@
+import logging
+from typing import List, Optional
+
+from alpes_partners.seedwork.infraestructura.indices import IndicePrefijos
+from .dto import SugerenciaDTO
+
+logger = logging.getLogger(__name__)
+
+TIPOS_SUGERENCIA = ('influencer', 'campana')
+
+
+class ServicioSugerencias:
+    """Servicio de aplicación para el autocompletado de nombres."""
+    
+    def __init__(self, indice: IndicePrefijos):
+        self._indice = indice
+    
+    @property
+    def indice(self):
+        return self._indice
+    
+    def sugerir(self, texto: str, limite: int = 10, tipo: Optional[str] = None) -> List[SugerenciaDTO]:
+        """Retorna los nombres cuyo inicio de palabra coincide con el texto."""
+        if tipo and tipo not in TIPOS_SUGERENCIA:
+            raise ValueError(f"Tipo de sugerencia no soportado: {tipo}")
+        
+        resultados = self.indice.buscar(texto, limite=limite, tipo=tipo)
+        return [SugerenciaDTO(**resultado) for resultado in resultados]
@@ -0,0 +1,57 @@
+"""
+Lectores de eventos que mantienen al día el índice de sugerencias.
+
+Cada instancia de la API mantiene su propio índice y reproduce los eventos
+desde el timestamp de su snapshot: el menor timestamp de publicación hasta
+el que todos los lectores aplicaron eventos.
+"""
+
+import logging
+import threading
+import time
+from typing import List
+
+from alpes_partners.config.settings import settings
+from alpes_partners.seedwork.infraestructura.broker import crear_cliente
+from alpes_partners.seedwork.infraestructura.indices import IndicePrefijos
+from alpes_partners.seedwork.infraestructura.lectores import PosicionLector, iniciar_lector
+from alpes_partners.modulos.influencers.infraestructura.schema.v1.eventos import EventoInfluencerRegistrado
+from alpes_partners.modulos.campanas.infraestructura.schema.v1.eventos import EventoCampanaCreada
+from .proyecciones import indice_sugerencias
+
+logger = logging.getLogger(__name__)
+
+# Margen de un lector al día con su tópico (cubre eventos publicados pero aún no entregados)
+MARGEN_SNAPSHOT_MS = 60_000
+
+
+def _guardar_snapshots(indice: IndicePrefijos, posiciones: List[PosicionLector]):
+    while True:
+        time.sleep(settings.sugerencias_snapshot_intervalo)
+        try:
+            # Al restaurar se reproduce desde el lector más atrasado
+            indice.guardar_snapshot(settings.sugerencias_snapshot_ruta, min(p.timestamp for p in posiciones))
+        except OSError as e:
+            logger.warning(f"SUGERENCIAS: No se pudo guardar el snapshot: {e}")
+
+
+def suscribirse_a_eventos_sugerencias(desde: int, indice: IndicePrefijos = indice_sugerencias):
+    """Inicia los lectores de eventos y el guardado periódico de snapshots en hilos daemon."""
+    cliente = crear_cliente()
+    posiciones = [PosicionLector(desde, MARGEN_SNAPSHOT_MS), PosicionLector(desde, MARGEN_SNAPSHOT_MS)]
+    
+    iniciar_lector(
+        cliente, settings.eventos_topico_influencers, EventoInfluencerRegistrado,
+        lambda evento: indice.agregar('influencer', evento.data.id_influencer, evento.data.nombre),
+        desde=desde, nombre="sugerencias-influencers", posicion=posiciones[0]
+    )
+    iniciar_lector(
+        cliente, settings.eventos_topico_campanas, EventoCampanaCreada,
+        lambda evento: indice.agregar('campana', evento.data.id_campana, evento.data.nombre),
+        desde=desde, nombre="sugerencias-campanas", posicion=posiciones[1]
+    )
+    
+    threading.Thread(
+        target=_guardar_snapshots, args=(indice, posiciones), name="sugerencias-snapshot", daemon=True
+    ).start()
+    return cliente
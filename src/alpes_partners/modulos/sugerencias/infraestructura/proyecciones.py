@@ -0,0 +1,118 @@
+"""
+Proyección en memoria de nombres para sugerencias.
+
+El índice se construye al iniciar desde un snapshot comprimido (o desde la
+base de datos si no hay uno reciente) y luego se mantiene al día con los
+eventos InfluencerRegistrado y CampanaCreada. La proyección ``sugerencias``
+de ``run_replay.py`` regenera ese snapshot reproduciendo los tópicos.
+"""
+
+import logging
+from typing import Dict, Iterator, Optional, Tuple
+
+from alpes_partners.config.settings import settings
+from alpes_partners.seedwork.infraestructura.database import sesion_actual
+from alpes_partners.seedwork.infraestructura.indices import IndicePrefijos
+from alpes_partners.seedwork.infraestructura.replay import FuenteReplay, Proyeccion, registrar_proyeccion
+from alpes_partners.seedwork.infraestructura.utils import time_millis
+from alpes_partners.modulos.influencers.infraestructura.modelos import InfluencerModelo
+from alpes_partners.modulos.campanas.infraestructura.schema.campanas import Campanas
+
+logger = logging.getLogger(__name__)
+
+# Índice compartido por la API y el lector de eventos del proceso
+indice_sugerencias = IndicePrefijos()
+
+TAMANO_LOTE_LECTURA = 10000
+
+
+def documentos_desde_bd() -> Iterator[Tuple[str, str, str]]:
+    """Recorre en streaming (id, nombre) de influencers y campanas."""
+    for id, nombre in sesion_actual().query(InfluencerModelo.id, InfluencerModelo.nombre).yield_per(TAMANO_LOTE_LECTURA):
+        yield 'influencer', str(id), nombre
+    for id, nombre in sesion_actual().query(Campanas.id, Campanas.nombre).yield_per(TAMANO_LOTE_LECTURA):
+        yield 'campana', str(id), nombre
+
+
+def construir_indice(indice: IndicePrefijos = indice_sugerencias, ruta: Optional[str] = None) -> int:
+    """Carga el índice y retorna el timestamp (ms) desde el cual reproducir eventos.
+
+    Usa el snapshot si existe y no supera la edad máxima configurada; si no,
+    reconstruye desde la base de datos y deja un snapshot nuevo.
+    """
+    ruta = ruta or settings.sugerencias_snapshot_ruta
+    
+    try:
+        timestamp = indice.cargar_snapshot(ruta)
+    except Exception as e:
+        logger.warning(f"SUGERENCIAS: Snapshot inválido, se reconstruye desde la base de datos: {e}")
+        timestamp = None
+    
+    if timestamp is not None and time_millis() - timestamp <= settings.sugerencias_snapshot_max_edad * 1000:
+        logger.info(f"SUGERENCIAS: Índice cargado desde snapshot - {len(indice)} nombres")
+        return timestamp
+    
+    # Los eventos posteriores al inicio de la lectura se reproducen (el índice es idempotente)
+    timestamp = time_millis()
+    indice.cargar(documentos_desde_bd())
+    logger.info(f"SUGERENCIAS: Índice construido desde la base de datos - {len(indice)} nombres")
+    
+    try:
+        indice.guardar_snapshot(ruta, timestamp)
+    except OSError as e:
+        logger.warning(f"SUGERENCIAS: No se pudo guardar el snapshot: {e}")
+    return timestamp
+
+
+@registrar_proyeccion('sugerencias')
+def proyeccion_sugerencias(ruta: Optional[str] = None) -> Proyeccion:
+    """Reconstruye el snapshot de sugerencias desde los eventos de registro.
+
+    Solo acumula los documentos (el índice de términos lo arma la API al
+    cargar el snapshot). Cada checkpoint deja lo acumulado en
+    ``<ruta>.replay``, de donde se retoma; al terminar se escribe el snapshot
+    que carga la API, con el instante de inicio de la reproducción.
+    """
+    from alpes_partners.modulos.influencers.infraestructura.schema.v1.eventos import EventoInfluencerRegistrado
+    from alpes_partners.modulos.campanas.infraestructura.schema.v1.eventos import EventoCampanaCreada
+
+    ruta = ruta or settings.sugerencias_snapshot_ruta
+    ruta_parcial = f"{ruta}.replay"
+    documentos: Dict[Tuple[str, str], str] = {}
+
+    def agregar(tipo: str, pares) -> None:
+        documentos.update(((tipo, str(id)), nombre) for id, nombre in pares)
+
+    def guardar(destino: str, timestamp: Optional[int] = None) -> None:
+        IndicePrefijos.escribir_snapshot(
+            destino, ((tipo, id, nombre) for (tipo, id), nombre in documentos.items()), timestamp
+        )
+
+    def preparar(reanudar: bool) -> None:
+        snapshot = IndicePrefijos.leer_snapshot(ruta_parcial) if reanudar else None
+        if snapshot is not None:
+            documentos.update(((tipo, id), nombre) for tipo, id, nombre in snapshot[1])
+            logger.info(f"SUGERENCIAS: Reproducción retomada con {len(documentos)} nombres")
+
+    def terminar(desde: int) -> None:
+        guardar(ruta, desde)
+        logger.info(f"SUGERENCIAS: Snapshot reconstruido - {len(documentos)} nombres")
+
+    return Proyeccion(
+        nombre='sugerencias',
+        fuentes=[
+            FuenteReplay(settings.eventos_topico_influencers, EventoInfluencerRegistrado, {
+                'InfluencerRegistrado': lambda eventos: agregar(
+                    'influencer', ((evento.data.id_influencer, evento.data.nombre) for evento in eventos)
+                )
+            }),
+            FuenteReplay(settings.eventos_topico_campanas, EventoCampanaCreada, {
+                'CampanaCreada': lambda eventos: agregar(
+                    'campana', ((evento.data.id_campana, evento.data.nombre) for evento in eventos)
+                )
+            })
+        ],
+        preparar=preparar,
+        confirmar=lambda: guardar(ruta_parcial),
+        terminar=terminar
+    )
@@ -1,9 +1,14 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Any, Dict
-from functools import singledispatch
+from functools import singledispatch, wraps
+import logging
+import random
+import time
 import uuid
 
+from ..dominio.excepciones import ExcepcionConcurrencia
+
 
 class Comando:
     """Clase base para comandos."""
@@ -33,3 +38,29 @@ def ejecutar_commando(comando):
     logger.error(f"DISPATCHER: Tipo del comando: {type(comando)}")
     logger.error(f"DISPATCHER: Registry actual: {ejecutar_commando.registry}")
     raise NotImplementedError(f'No existe implementación para el comando de tipo {type(comando).__name__}')
+
+
+
+def reintentar_en_conflicto(max_intentos: int = 3, espera_base: float = 0.05):
+    """Reintenta un handler de comando cuando falla por un conflicto de versión.
+
+    El handler debe volver a leer el agregado en cada intento; la UoW ya
+    descartó los batches del intento fallido al hacer rollback.
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            for intento in range(1, max_intentos + 1):
+                try:
+                    return funcion(*args, **kwargs)
+                except ExcepcionConcurrencia as e:
+                    if intento == max_intentos:
+                        raise
+                    espera = espera_base * (2 ** (intento - 1)) * random.uniform(0.5, 1.5)
+                    logging.getLogger(__name__).warning(
+                        f"DISPATCHER: Conflicto de concurrencia en {funcion.__name__} "
+                        f"(intento {intento}/{max_intentos}): {e}. Reintentando en {espera:.3f}s"
+                    )
+                    time.sleep(espera)
+        return envoltura
+    return decorador
@@ -1,16 +1,16 @@
 from abc import ABC
 from datetime import datetime
 from typing import List, Optional
-import uuid
 
 from .eventos import EventoDominio
+from .identificadores import nuevo_id
 
 
 class Entidad(ABC):
     """Clase base para todas las entidades del dominio."""
     
     def __init__(self, id: Optional[str] = None) -> None:
-        self.id = id or str(uuid.uuid4())
+        self.id = id or nuevo_id()
         self.fecha_creacion = datetime.utcnow()
         self.fecha_actualizacion = datetime.utcnow()
         self._eventos: List[EventoDominio] = []
@@ -1,14 +1,15 @@
 from abc import ABC
 from datetime import datetime
 from typing import Any, Dict
-import uuid
+
+from .identificadores import nuevo_id
 
 
 class EventoDominio(ABC):
     """Clase base para todos los eventos de dominio."""
     
     def __init__(self) -> None:
-        self.id = str(uuid.uuid4())
+        self.id = nuevo_id()
         self.fecha_creacion = datetime.utcnow()
         self.agregado_id: str = ""
         self.version: int = 1
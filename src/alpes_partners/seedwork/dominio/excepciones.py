@@ -29,3 +29,8 @@ class ExcepcionEstadoInvalido(ExcepcionDominio):
 class ExcepcionPermisosDenegados(ExcepcionDominio):
     """Excepción cuando no se tienen permisos para realizar una operación."""
     pass
+
+
+class ExcepcionConcurrencia(ExcepcionDominio):
+    """Excepción cuando otra transacción modificó la entidad (bloqueo optimista)."""
+    pass
@@ -0,0 +1,65 @@
+"""Generación de identificadores ordenados por tiempo (UUIDv7, RFC 9562).
+
+Los 48 bits altos son el timestamp Unix en milisegundos, por lo que los
+ids nuevos se insertan siempre al final del índice de la llave primaria
+en lugar de repartirse por todo el B-tree como ocurre con uuid4.
+"""
+
+import os
+import random
+import threading
+import time
+import uuid
+
+_MASCARA_48 = (1 << 48) - 1
+_MASCARA_62 = (1 << 62) - 1
+_CONTADOR_MAXIMO = 0xFFF
+
+_lock = threading.Lock()
+_ultimo_ms = 0
+_contador = 0
+
+
+def uuid7() -> uuid.UUID:
+    """Genera un UUIDv7 monótono dentro del proceso.
+
+    Los 12 bits de ``rand_a`` se usan como contador para que los ids
+    generados en el mismo milisegundo conserven el orden de creación.
+    """
+    global _ultimo_ms, _contador
+
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms <= _ultimo_ms:
+            # Mismo milisegundo (o reloj hacia atrás): avanzar el contador
+            _contador += 1
+            if _contador > _CONTADOR_MAXIMO:
+                _ultimo_ms += 1
+                _contador = 0
+            ms = _ultimo_ms
+        else:
+            _ultimo_ms = ms
+            # Arranque aleatorio en la mitad baja para dejar margen al contador
+            _contador = random.getrandbits(11)
+        contador = _contador
+
+    rand_b = int.from_bytes(os.urandom(8), 'big') & _MASCARA_62
+    valor = (
+        (ms & _MASCARA_48) << 80
+        | 0x7 << 76
+        | contador << 64
+        | 0b10 << 62
+        | rand_b
+    )
+    return uuid.UUID(int=valor)
+
+
+def nuevo_id() -> str:
+    """Identificador por defecto para agregados, eventos y comandos."""
+    return str(uuid7())
+
+
+def timestamp_ms(identificador) -> int:
+    """Obtiene el timestamp en milisegundos embebido en un UUIDv7."""
+    valor = identificador if isinstance(identificador, uuid.UUID) else uuid.UUID(str(identificador))
+    return valor.int >> 80
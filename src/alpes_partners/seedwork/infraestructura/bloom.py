@@ -0,0 +1,55 @@
+"""
+Filtro de Bloom en memoria.
+"""
+
+import hashlib
+import math
+import threading
+
+
+class FiltroBloom:
+    """Conjunto probabilístico: sin falsos negativos, con falsos positivos acotados.
+
+    Se dimensiona para ``capacidad`` elementos con una tasa de falsos
+    positivos ``tasa_error``. Sirve para responder "seguro que no lo he
+    visto" sin ir a la base de datos; un "quizás" se confirma con la fuente
+    de verdad. No admite eliminaciones: para olvidar elementos se
+    reconstruye con ``limpiar``.
+    """
+
+    def __init__(self, capacidad: int = 1_000_000, tasa_error: float = 0.01):
+        capacidad = max(1, capacidad)
+        self._num_bits = max(8, int(-capacidad * math.log(tasa_error) / (math.log(2) ** 2)))
+        self._num_hashes = max(1, round(self._num_bits / capacidad * math.log(2)))
+        self._bits = bytearray((self._num_bits + 7) // 8)
+        self._lock = threading.Lock()
+        self._elementos = 0
+
+    def __len__(self) -> int:
+        """Número de elementos agregados (incluye repetidos)."""
+        return self._elementos
+
+    def _posiciones(self, elemento: str):
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de dos hashes de 64 bits
+        digest = hashlib.blake2b(elemento.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self._num_bits for i in range(self._num_hashes)]
+
+    def agregar(self, elemento: str) -> None:
+        """Agrega un elemento."""
+        posiciones = self._posiciones(elemento)
+        with self._lock:
+            for posicion in posiciones:
+                self._bits[posicion >> 3] |= 1 << (posicion & 7)
+            self._elementos += 1
+
+    def __contains__(self, elemento: str) -> bool:
+        bits = self._bits
+        return all(bits[posicion >> 3] & (1 << (posicion & 7)) for posicion in self._posiciones(elemento))
+
+    def limpiar(self) -> None:
+        """Vacía el filtro."""
+        with self._lock:
+            self._bits = bytearray(len(self._bits))
+            self._elementos = 0
@@ -0,0 +1,54 @@
+"""
+Selección del broker de mensajería según ``settings.broker_tipo``.
+
+``pulsar`` (por defecto) conecta con el broker en PULSAR_ADDRESS;
+``memoria`` usa el broker en memoria del proceso, con la misma interfaz,
+para correr el flujo completo sin Pulsar.
+"""
+
+from typing import Optional
+
+from alpes_partners.config.settings import settings
+from . import utils
+
+
+def usa_broker_memoria() -> bool:
+    return settings.broker_tipo == 'memoria'
+
+
+def crear_cliente(**opciones):
+    """Cliente del broker configurado; ``opciones`` se pasan a ``pulsar.Client``."""
+    if usa_broker_memoria():
+        from .broker_memoria import broker_memoria
+        return broker_memoria.cliente()
+    import pulsar
+    return pulsar.Client(f'pulsar://{utils.broker_host()}:6650', **opciones)
+
+
+def politica_lote(max_mensajes: int, timeout_ms: int):
+    """Política de ``batch_receive``: hasta ``max_mensajes`` o lo llegado en ``timeout_ms``."""
+    if usa_broker_memoria():
+        from .broker_memoria import PoliticaLoteMemoria
+        return PoliticaLoteMemoria(max_mensajes, timeout_ms)
+    import pulsar
+    return pulsar.ConsumerBatchReceivePolicy(max_mensajes, -1, timeout_ms)
+
+
+def politica_dead_letter(max_reentregas: int, topico: Optional[str] = None):
+    """Política de dead letter: tras ``max_reentregas`` el mensaje pasa a ``topico`` (o al DLQ por defecto de Pulsar).
+
+    El broker en memoria no la aplica.
+    """
+    if usa_broker_memoria():
+        return None
+    import pulsar
+    return pulsar.ConsumerDeadLetterPolicy(max_reentregas, topico)
+
+
+def posicion_lector(datos: Optional[bytes] = None):
+    """Id de inicio para ``create_reader``: el serializado en ``datos`` (un checkpoint) o el primero del tópico."""
+    if usa_broker_memoria():
+        from .broker_memoria import IdMensajeMemoria
+        return IdMensajeMemoria.deserialize(datos) if datos else 'earliest'
+    import pulsar
+    return pulsar.MessageId.deserialize(datos) if datos else pulsar.MessageId.earliest
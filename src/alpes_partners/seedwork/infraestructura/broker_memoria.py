@@ -0,0 +1,501 @@
+"""
+Broker en memoria con la interfaz del cliente Pulsar que usa el proyecto.
+
+Sustituye a Pulsar dentro de un mismo proceso (``BROKER_TIPO=memoria``)
+para pruebas y benchmarks locales: productores con ``send``/``send_async``
+y deduplicación por sequence id, suscripciones Exclusive, Failover, Shared
+y KeyShared (sobre un tópico, una lista o un patrón) con ack, nack y
+reentrega, y lectores con ``seek`` por timestamp. Los mensajes se
+codifican con el schema del productor y se decodifican con el del
+consumidor, igual que con el broker real.
+
+Los tópicos conservan todos sus mensajes (los lectores pueden leer desde el
+inicio) mientras viva el proceso.
+"""
+
+import heapq
+import itertools
+import re
+import threading
+import time
+import zlib
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+def _resultado_ok():
+    try:
+        from pulsar import Result
+        return Result.Ok
+    except ImportError:
+        return 'Ok'
+
+
+RESULTADO_OK = _resultado_ok()
+
+
+class TimeoutMemoria(Exception):
+    """No llegó ningún mensaje dentro del tiempo de espera."""
+
+
+class ConsumidorOcupado(Exception):
+    """La suscripción exclusiva ya tiene un consumidor."""
+
+
+@dataclass(frozen=True, order=True)
+class IdMensajeMemoria:
+    topico: str
+    entrada: int
+
+    def __str__(self) -> str:
+        return f"{self.topico}:{self.entrada}"
+
+    def serialize(self) -> bytes:
+        return str(self).encode('utf-8')
+
+    @classmethod
+    def deserialize(cls, datos: bytes) -> 'IdMensajeMemoria':
+        topico, entrada = datos.decode('utf-8').rsplit(':', 1)
+        return cls(topico, int(entrada))
+
+
+@dataclass(frozen=True)
+class PoliticaLoteMemoria:
+    """Equivalente a ``ConsumerBatchReceivePolicy``: hasta ``max_mensajes`` o ``timeout_ms``."""
+    max_mensajes: int = 100
+    timeout_ms: int = 100
+
+
+@dataclass
+class _Entrada:
+    id: IdMensajeMemoria
+    datos: Any
+    clave: str
+    propiedades: Dict[str, str]
+    timestamp: int
+
+
+class MensajeMemoria:
+    """Mensaje entregado a un consumidor o lector."""
+
+    def __init__(self, entrada: _Entrada, schema=None, reentregas: int = 0):
+        self._entrada = entrada
+        self._schema = schema
+        self._reentregas = reentregas
+
+    def value(self):
+        if self._schema is not None and hasattr(self._schema, 'decode'):
+            return self._schema.decode(self._entrada.datos)
+        return self._entrada.datos
+
+    def data(self):
+        return self._entrada.datos
+
+    def message_id(self) -> IdMensajeMemoria:
+        return self._entrada.id
+
+    def partition_key(self) -> str:
+        return self._entrada.clave
+
+    def properties(self) -> Dict[str, str]:
+        return dict(self._entrada.propiedades)
+
+    def publish_timestamp(self) -> int:
+        return self._entrada.timestamp
+
+    def redelivery_count(self) -> int:
+        return self._reentregas
+
+
+def _nombre_tipo(tipo) -> str:
+    """Acepta ``'Shared'`` o el enum ``ConsumerType`` de Pulsar."""
+    if tipo is None:
+        return 'Exclusive'
+    if isinstance(tipo, str):
+        return tipo
+    return getattr(tipo, 'name', None) or str(tipo).rsplit('.', 1)[-1]
+
+
+def _leer_politica(politica) -> PoliticaLoteMemoria:
+    if politica is None:
+        return PoliticaLoteMemoria()
+    if isinstance(politica, PoliticaLoteMemoria):
+        return politica
+    try:
+        nativa = politica.policy()
+        return PoliticaLoteMemoria(nativa.getMaxNumMessages(), nativa.getTimeoutMs())
+    except Exception:
+        return PoliticaLoteMemoria()
+
+
+@dataclass
+class _Suscripcion:
+    nombre: str
+    tipo: str
+    consumidores: List['ConsumidorMemoria'] = field(default_factory=list)
+    pendientes: deque = field(default_factory=deque)            # (entrada, reentregas)
+    no_confirmados: Dict[IdMensajeMemoria, tuple] = field(default_factory=dict)
+    reentregas: list = field(default_factory=list)              # heap (cuando, n, entrada, reentregas)
+
+    def asignado(self, entrada: _Entrada) -> 'ConsumidorMemoria':
+        return self.consumidores[zlib.crc32(entrada.clave.encode('utf-8')) % len(self.consumidores)]
+
+    def reentregar_vencidos(self, ahora: float) -> None:
+        vencidos = []
+        while self.reentregas and self.reentregas[0][0] <= ahora:
+            _, _, entrada, reentregas = heapq.heappop(self.reentregas)
+            vencidos.append((entrada, reentregas))
+        for id_mensaje, (consumidor, entrada, reentregas, vence) in list(self.no_confirmados.items()):
+            if vence is not None and vence <= ahora:
+                del self.no_confirmados[id_mensaje]
+                vencidos.append((entrada, reentregas + 1))
+        # Las reentregas van antes que los mensajes nuevos, en orden de publicación
+        vencidos.sort(key=lambda item: item[0].id)
+        self.pendientes.extendleft(reversed(vencidos))
+
+    def proximo_vencimiento(self) -> Optional[float]:
+        candidatos = [vence for _, _, _, vence in self.no_confirmados.values() if vence is not None]
+        if self.reentregas:
+            candidatos.append(self.reentregas[0][0])
+        return min(candidatos) if candidatos else None
+
+    def siguiente(self, consumidor: 'ConsumidorMemoria') -> Optional[MensajeMemoria]:
+        self.reentregar_vencidos(time.monotonic())
+        if not self.pendientes:
+            return None
+        if self.tipo in ('Exclusive', 'Failover') and consumidor is not self.consumidores[0]:
+            return None
+
+        if self.tipo == 'KeyShared':
+            # Cada clave se entrega siempre al mismo consumidor, en orden
+            for indice, (entrada, reentregas) in enumerate(self.pendientes):
+                if self.asignado(entrada) is consumidor:
+                    del self.pendientes[indice]
+                    break
+            else:
+                return None
+        else:
+            entrada, reentregas = self.pendientes.popleft()
+
+        vence = (time.monotonic() + consumidor.timeout_ack) if consumidor.timeout_ack else None
+        self.no_confirmados[entrada.id] = (consumidor, entrada, reentregas, vence)
+        return MensajeMemoria(entrada, consumidor.schema, reentregas)
+
+
+class _Topico:
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.entradas: List[_Entrada] = []
+        self.timestamps: List[int] = []
+        self.suscripciones: Dict[str, _Suscripcion] = {}
+        self.secuencias: Dict[str, int] = {}
+
+
+class ProductorMemoria:
+
+    def __init__(self, broker: 'BrokerMemoria', topico: str, nombre: Optional[str], schema=None):
+        self._broker = broker
+        self._topico = topico
+        self._nombre = nombre or f"productor-{next(broker._contador)}"
+        self._schema = schema
+
+    def send(self, contenido, properties=None, partition_key=None, sequence_id=None, **_) -> IdMensajeMemoria:
+        datos = self._schema.encode(contenido) if self._schema is not None and hasattr(self._schema, 'encode') else contenido
+        return self._broker._publicar(self._topico, self._nombre, datos, partition_key or '', properties or {}, sequence_id)
+
+    def send_async(self, contenido, callback, **kwargs) -> None:
+        id_mensaje = self.send(contenido, **kwargs)
+        if callback:
+            callback(RESULTADO_OK, id_mensaje)
+
+    def last_sequence_id(self) -> int:
+        return self._broker._ultima_secuencia(self._topico, self._nombre)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class ConsumidorMemoria:
+    """Consumidor de una suscripción sobre uno o varios tópicos (lista o patrón)."""
+
+    def __init__(self, broker: 'BrokerMemoria', schema=None, politica=None,
+                 retraso_nack_ms: int = 60000, timeout_ack_ms: int = 0):
+        self._broker = broker
+        self._suscripciones: Dict[str, _Suscripcion] = {}
+        self._turno = 0
+        self._cerrado = False
+        self.schema = schema
+        self._politica = _leer_politica(politica)
+        self._retraso_nack = retraso_nack_ms / 1000.0
+        self.timeout_ack = timeout_ack_ms / 1000.0 if timeout_ack_ms else 0
+
+    def _siguiente(self) -> Optional[MensajeMemoria]:
+        # Turnos entre tópicos para que uno con mucho volumen no acapare al consumidor
+        suscripciones = list(self._suscripciones.values())
+        for desplazamiento in range(len(suscripciones)):
+            indice = (self._turno + desplazamiento) % len(suscripciones)
+            mensaje = suscripciones[indice].siguiente(self)
+            if mensaje is not None:
+                self._turno = indice + 1
+                return mensaje
+        return None
+
+    def _esperar(self, fin: Optional[float]) -> bool:
+        """Espera un aviso del broker; False si se alcanzó ``fin``."""
+        ahora = time.monotonic()
+        if fin is not None and ahora >= fin:
+            return False
+        espera = None if fin is None else fin - ahora
+        for suscripcion in self._suscripciones.values():
+            proximo = suscripcion.proximo_vencimiento()
+            if proximo is not None:
+                espera = max(0.0, proximo - ahora) if espera is None else min(espera, max(0.0, proximo - ahora))
+        self._broker._condicion.wait(espera)
+        return True
+
+    def receive(self, timeout_millis: Optional[int] = None) -> MensajeMemoria:
+        fin = time.monotonic() + timeout_millis / 1000.0 if timeout_millis is not None else None
+        with self._broker._condicion:
+            while True:
+                mensaje = self._siguiente()
+                if mensaje is not None:
+                    return mensaje
+                if not self._esperar(fin):
+                    raise TimeoutMemoria(f"Sin mensajes en {', '.join(self._suscripciones) or 'ningún tópico'}")
+
+    def batch_receive(self) -> List[MensajeMemoria]:
+        fin = time.monotonic() + self._politica.timeout_ms / 1000.0
+        mensajes = []
+        with self._broker._condicion:
+            while len(mensajes) < self._politica.max_mensajes:
+                mensaje = self._siguiente()
+                if mensaje is not None:
+                    mensajes.append(mensaje)
+                    continue
+                if not self._esperar(fin):
+                    break
+        return mensajes
+
+    @staticmethod
+    def _id(mensaje) -> IdMensajeMemoria:
+        return mensaje.message_id() if isinstance(mensaje, MensajeMemoria) else mensaje
+
+    def acknowledge(self, mensaje) -> None:
+        id_mensaje = self._id(mensaje)
+        with self._broker._condicion:
+            suscripcion = self._suscripciones.get(id_mensaje.topico)
+            if suscripcion is not None:
+                suscripcion.no_confirmados.pop(id_mensaje, None)
+
+    def negative_acknowledge(self, mensaje) -> None:
+        id_mensaje = self._id(mensaje)
+        with self._broker._condicion:
+            suscripcion = self._suscripciones.get(id_mensaje.topico)
+            pendiente = suscripcion.no_confirmados.pop(id_mensaje, None) if suscripcion is not None else None
+            if pendiente is not None:
+                _, entrada, reentregas, _ = pendiente
+                heapq.heappush(suscripcion.reentregas, (
+                    time.monotonic() + self._retraso_nack, next(self._broker._contador), entrada, reentregas + 1
+                ))
+            self._broker._condicion.notify_all()
+
+    def close(self) -> None:
+        with self._broker._condicion:
+            if self._cerrado:
+                return
+            self._cerrado = True
+            self._broker._olvidar_patron(self)
+            for suscripcion in self._suscripciones.values():
+                suscripcion.consumidores.remove(self)
+                # Lo que este consumidor no confirmó se reentrega a los demás
+                propios = [(entrada, reentregas + 1)
+                           for consumidor, entrada, reentregas, _ in suscripcion.no_confirmados.values()
+                           if consumidor is self]
+                for entrada, _ in propios:
+                    del suscripcion.no_confirmados[entrada.id]
+                propios.sort(key=lambda item: item[0].id)
+                suscripcion.pendientes.extendleft(reversed(propios))
+            self._broker._condicion.notify_all()
+
+
+class LectorMemoria:
+
+    def __init__(self, broker: 'BrokerMemoria', topico: _Topico, inicio, schema=None):
+        self._broker = broker
+        self._topico = topico
+        self._schema = schema
+        if isinstance(inicio, IdMensajeMemoria):
+            # Como en Pulsar, el lector empieza después del id indicado
+            self._posicion = inicio.entrada + 1
+        else:
+            self._posicion = len(topico.entradas) if _es_latest(inicio) else 0
+
+    def seek(self, destino) -> None:
+        """Posiciona en un id de mensaje o en el primer mensaje publicado desde un timestamp (ms)."""
+        with self._broker._condicion:
+            if isinstance(destino, IdMensajeMemoria):
+                self._posicion = destino.entrada
+            else:
+                self._posicion = bisect_left(self._topico.timestamps, int(destino))
+
+    def has_message_available(self) -> bool:
+        with self._broker._condicion:
+            return self._posicion < len(self._topico.entradas)
+
+    def read_next(self, timeout_millis: Optional[int] = None) -> MensajeMemoria:
+        fin = time.monotonic() + timeout_millis / 1000.0 if timeout_millis is not None else None
+        with self._broker._condicion:
+            while self._posicion >= len(self._topico.entradas):
+                restante = None if fin is None else fin - time.monotonic()
+                if restante is not None and restante <= 0:
+                    raise TimeoutMemoria(f"Sin mensajes en {self._topico.nombre}")
+                self._broker._condicion.wait(restante)
+            entrada = self._topico.entradas[self._posicion]
+            self._posicion += 1
+        return MensajeMemoria(entrada, self._schema)
+
+    def close(self) -> None:
+        pass
+
+
+class ClienteMemoria:
+    """Cliente con la misma interfaz que ``pulsar.Client`` sobre un ``BrokerMemoria``."""
+
+    def __init__(self, broker: 'BrokerMemoria'):
+        self._broker = broker
+        self._consumidores: List[ConsumidorMemoria] = []
+
+    def create_producer(self, topic: str, producer_name: Optional[str] = None, schema=None, **_) -> ProductorMemoria:
+        return ProductorMemoria(self._broker, topic, producer_name, schema)
+
+    def subscribe(self, topic, subscription_name: str, consumer_type=None, schema=None,
+                  batch_receive_policy=None, initial_position=None,
+                  negative_ack_redelivery_delay_ms: int = 60000,
+                  unacked_messages_timeout_ms: int = 0, **_) -> ConsumidorMemoria:
+        """``topic`` puede ser un nombre, una lista de nombres o un patrón ``re`` (como en Pulsar)."""
+        consumidor = ConsumidorMemoria(
+            self._broker, schema, batch_receive_policy, negative_ack_redelivery_delay_ms, unacked_messages_timeout_ms
+        )
+        self._broker._suscribir(
+            consumidor, topic, subscription_name, _nombre_tipo(consumer_type),
+            _nombre_tipo(initial_position) == 'Earliest'
+        )
+        self._consumidores.append(consumidor)
+        return consumidor
+
+    def create_reader(self, topic: str, start_message_id, schema=None, **_) -> LectorMemoria:
+        return LectorMemoria(self._broker, self._broker._topico(topic), start_message_id, schema)
+
+    def close(self) -> None:
+        for consumidor in self._consumidores:
+            consumidor.close()
+        self._consumidores.clear()
+
+
+def _es_latest(inicio) -> bool:
+    if isinstance(inicio, str):
+        return inicio.lower() == 'latest'
+    try:
+        import pulsar
+        return inicio == pulsar.MessageId.latest
+    except ImportError:
+        return False
+
+
+class BrokerMemoria:
+    """Tópicos y suscripciones compartidos por todos los clientes del proceso."""
+
+    def __init__(self):
+        self._condicion = threading.Condition()
+        self._topicos: Dict[str, _Topico] = {}
+        self._patrones: List[tuple] = []   # (patrón, consumidor, suscripción, tipo)
+        self._contador = itertools.count()
+
+    def cliente(self) -> ClienteMemoria:
+        return ClienteMemoria(self)
+
+    def reiniciar(self) -> None:
+        """Descarta todos los tópicos (entre pruebas)."""
+        with self._condicion:
+            self._topicos.clear()
+            self._patrones.clear()
+
+    def _topico(self, nombre: str, crear_suscripciones: bool = True) -> _Topico:
+        with self._condicion:
+            if nombre not in self._topicos:
+                self._topicos[nombre] = _Topico(nombre)
+                if crear_suscripciones:
+                    for patron, consumidor, suscripcion, tipo in list(self._patrones):
+                        if _coincide(patron, nombre):
+                            self._unir(consumidor, nombre, suscripcion, tipo, False)
+            return self._topicos[nombre]
+
+    def _ultima_secuencia(self, topico: str, productor: str) -> int:
+        with self._condicion:
+            return self._topico(topico).secuencias.get(productor, -1)
+
+    def _publicar(self, nombre: str, productor: str, datos, clave: str, propiedades: dict,
+                  secuencia: Optional[int]) -> IdMensajeMemoria:
+        with self._condicion:
+            topico = self._topico(nombre)
+            ultima = topico.secuencias.get(productor, -1)
+            if secuencia is None:
+                secuencia = ultima + 1
+            elif secuencia <= ultima:
+                # Deduplicación por productor + sequence id, como brokerDeduplicationEnabled
+                return IdMensajeMemoria(nombre, -1)
+            topico.secuencias[productor] = secuencia
+
+            timestamp = max(int(time.time() * 1000), topico.timestamps[-1] if topico.timestamps else 0)
+            entrada = _Entrada(IdMensajeMemoria(nombre, len(topico.entradas)), datos, clave, propiedades, timestamp)
+            topico.entradas.append(entrada)
+            topico.timestamps.append(timestamp)
+            for suscripcion in topico.suscripciones.values():
+                suscripcion.pendientes.append((entrada, 0))
+            self._condicion.notify_all()
+            return entrada.id
+
+    def _suscribir(self, consumidor: ConsumidorMemoria, topicos, suscripcion: str, tipo: str,
+                   desde_el_inicio: bool) -> None:
+        with self._condicion:
+            if isinstance(topicos, re.Pattern):
+                # Los tópicos que se creen después y coincidan también se suman al consumidor
+                self._patrones.append((topicos, consumidor, suscripcion, tipo))
+                nombres = [nombre for nombre in self._topicos if _coincide(topicos, nombre)]
+            else:
+                nombres = [topicos] if isinstance(topicos, str) else list(topicos)
+            for nombre in nombres:
+                self._unir(consumidor, nombre, suscripcion, tipo, desde_el_inicio)
+
+    def _unir(self, consumidor: ConsumidorMemoria, nombre: str, suscripcion: str, tipo: str,
+              desde_el_inicio: bool) -> None:
+        topico = self._topico(nombre, crear_suscripciones=False)
+        existente = topico.suscripciones.get(suscripcion)
+        if existente is None:
+            existente = _Suscripcion(suscripcion, tipo)
+            if desde_el_inicio:
+                existente.pendientes.extend((entrada, 0) for entrada in topico.entradas)
+            topico.suscripciones[suscripcion] = existente
+        elif existente.tipo != tipo:
+            raise ValueError(f"La suscripción {suscripcion} es {existente.tipo}, no {tipo}")
+        if existente.tipo == 'Exclusive' and existente.consumidores:
+            raise ConsumidorOcupado(f"La suscripción exclusiva {suscripcion} ya tiene consumidor")
+        existente.consumidores.append(consumidor)
+        consumidor._suscripciones[nombre] = existente
+
+    def _olvidar_patron(self, consumidor: ConsumidorMemoria) -> None:
+        self._patrones = [patron for patron in self._patrones if patron[1] is not consumidor]
+
+
+def _coincide(patron, nombre: str) -> bool:
+    # Los patrones de Pulsar se escriben sobre el nombre completo del tópico
+    return bool(patron.fullmatch(nombre) or patron.fullmatch(f"persistent://public/default/{nombre}"))
+
+
+# Broker compartido por el proceso
+broker_memoria = BrokerMemoria()
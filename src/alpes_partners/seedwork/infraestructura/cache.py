@@ -0,0 +1,75 @@
+"""
+Cache en memoria con expiración por tiempo (TTL).
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class CacheTTL:
+    """Cache clave/valor en memoria con expiración y tamaño máximo.
+
+    Pensado para resultados de consultas de lectura costosas que toleran
+    algunos segundos de desfase; los eventos de escritura relevantes
+    llaman a ``invalidar`` para no esperar a la expiración.
+    """
+
+    def __init__(self, ttl_segundos: float, max_entradas: int = 1024):
+        self._ttl = ttl_segundos
+        self._max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._entradas: Dict[Hashable, Tuple[float, Any]] = {}
+        # Se incrementa en cada invalidación para descartar cálculos que empezaron antes
+        self._generacion = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        """Retorna el valor vigente para la clave o None."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira < time.monotonic():
+                del self._entradas[clave]
+                return None
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any, generacion: Optional[int] = None) -> None:
+        """Guarda un valor; se ignora si hubo una invalidación desde ``generacion``."""
+        with self._lock:
+            if generacion is not None and generacion != self._generacion:
+                return
+            if len(self._entradas) >= self._max_entradas and clave not in self._entradas:
+                self._purgar()
+            self._entradas[clave] = (time.monotonic() + self._ttl, valor)
+
+    def obtener_o_calcular(self, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """Retorna el valor cacheado o lo calcula y lo guarda."""
+        valor = self.obtener(clave)
+        if valor is not None:
+            return valor
+        generacion = self._generacion
+        valor = calcular()
+        self.guardar(clave, valor, generacion)
+        return valor
+
+    def invalidar(self, clave: Optional[Hashable] = None) -> None:
+        """Invalida una clave, o todo el cache si no se indica ninguna."""
+        with self._lock:
+            if clave is None:
+                self._entradas.clear()
+                self._generacion += 1
+            else:
+                self._entradas.pop(clave, None)
+
+    def _purgar(self) -> None:
+        ahora = time.monotonic()
+        for clave in [c for c, (expira, _) in self._entradas.items() if expira < ahora]:
+            del self._entradas[clave]
+        if len(self._entradas) >= self._max_entradas:
+            # Descarta la entrada más próxima a expirar
+            del self._entradas[min(self._entradas, key=lambda c: self._entradas[c][0])]
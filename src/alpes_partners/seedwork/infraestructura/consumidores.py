@@ -0,0 +1,236 @@
+"""
+Runtime de consumidores de eventos de integración.
+
+Cada módulo declara sus suscripciones (tópico o patrón, schema y handlers
+por tipo de evento) y el runtime las atiende a todas desde un mismo
+proceso: un hilo por suscripción que recibe en lotes, agrupa los mensajes
+por el campo ``type`` del evento y entrega cada grupo a su handler.
+
+Los handlers reciben una lista de ``Entrega``. Al terminar sin error el
+runtime confirma las entregas que el handler no resolvió; si lanza una
+excepción, las rechaza (nack) para que el broker las reentregue; con
+``max_reentregas`` el broker deja de reentregarlas después de ese número
+de intentos y las mueve al tópico de dead letter. Con
+``confirmacion_manual`` el handler decide cuándo confirmar cada una (por
+ejemplo, después de un flush diferido).
+
+``detener`` deja de recibir, termina el lote en curso de cada suscripción
+y cierra los consumidores: lo que quedó sin confirmar lo reentrega el
+broker a otra instancia.
+"""
+
+import logging
+import re
+import signal
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Pattern, Union
+
+logger = logging.getLogger(__name__)
+
+# Handler para cualquier tipo sin handler propio
+TODOS_LOS_TIPOS = '*'
+
+
+class Entrega:
+    """Un evento recibido, con su confirmación pendiente."""
+
+    __slots__ = ('evento', 'mensaje', '_consumidor', 'resuelta')
+
+    def __init__(self, consumidor, mensaje, evento):
+        self._consumidor = consumidor
+        self.mensaje = mensaje
+        self.evento = evento
+        self.resuelta = False
+
+    @property
+    def mensaje_id(self) -> str:
+        """Id de idempotencia: el del evento, o el del broker si no viene."""
+        return str(getattr(self.evento, 'id', None) or self.mensaje.message_id())
+
+    def confirmar(self) -> None:
+        if not self.resuelta:
+            self.resuelta = True
+            self._consumidor.acknowledge(self.mensaje)
+
+    def rechazar(self) -> None:
+        if not self.resuelta:
+            self.resuelta = True
+            self._consumidor.negative_acknowledge(self.mensaje)
+
+
+@dataclass
+class Suscripcion:
+    """Declaración de un consumidor: de dónde lee y qué handler atiende cada tipo de evento."""
+    nombre: str
+    topico: Union[str, List[str], Pattern]  # nombre, lista, patrón compilado o 're:<patrón>'
+    schema: type
+    handlers: Dict[str, Callable[[List[Entrega]], None]]
+    tipo_consumidor: str = 'Shared'
+    max_lote: int = 100
+    espera_lote_ms: int = 100
+    prefetch: int = 1000
+    confirmacion_manual: bool = False
+    retraso_reentrega_ms: int = 10000
+    max_reentregas: Optional[int] = None  # sin límite si es None
+    topico_dlq: Optional[str] = None  # por defecto '<tópico>-<suscripción>-DLQ'
+    al_detener: Optional[Callable[[], None]] = None
+    opciones: dict = field(default_factory=dict)
+
+    def handler_para(self, tipo: Optional[str]) -> Optional[Callable]:
+        return self.handlers.get(tipo) or self.handlers.get(TODOS_LOS_TIPOS)
+
+
+def _tipo_consumidor(nombre: str):
+    try:
+        import _pulsar
+        return getattr(_pulsar.ConsumerType, nombre)
+    except ImportError:
+        return nombre
+
+
+class RuntimeConsumidores:
+    """Atiende un registro de suscripciones, cada una en su propio hilo."""
+
+    def __init__(self, crear_cliente: Optional[Callable] = None, crear_politica: Optional[Callable] = None,
+                 schema_de: Optional[Callable] = None, crear_politica_dlq: Optional[Callable] = None):
+        if crear_cliente is None or crear_politica is None or schema_de is None:
+            from .broker import crear_cliente as cliente_configurado, politica_lote
+            from .schema.registro import schema_de as schema_registrado
+            crear_cliente = crear_cliente or cliente_configurado
+            crear_politica = crear_politica or politica_lote
+            schema_de = schema_de or schema_registrado
+        self._crear_cliente = crear_cliente
+        self._crear_politica = crear_politica
+        self._schema_de = schema_de
+        self._crear_politica_dlq = crear_politica_dlq
+        self._suscripciones: List[Suscripcion] = []
+        self._detener = threading.Event()
+        self._hilos: List[threading.Thread] = []
+        self._cliente = None
+
+    def registrar(self, suscripcion: Suscripcion) -> 'RuntimeConsumidores':
+        if any(existente.nombre == suscripcion.nombre for existente in self._suscripciones):
+            raise ValueError(f"Suscripción ya registrada: {suscripcion.nombre}")
+        self._suscripciones.append(suscripcion)
+        return self
+
+    @property
+    def suscripciones(self) -> List[Suscripcion]:
+        return list(self._suscripciones)
+
+    def _suscribir(self, suscripcion: Suscripcion):
+        topico = suscripcion.topico
+        if isinstance(topico, str) and topico.startswith('re:'):
+            topico = re.compile(topico[3:])
+        opciones = dict(suscripcion.opciones)
+        if suscripcion.max_reentregas is not None:
+            crear_politica_dlq = self._crear_politica_dlq
+            if crear_politica_dlq is None:
+                from .broker import politica_dead_letter as crear_politica_dlq
+            opciones['dead_letter_policy'] = crear_politica_dlq(suscripcion.max_reentregas, suscripcion.topico_dlq)
+        return self._cliente.subscribe(
+            topico,
+            subscription_name=suscripcion.nombre,
+            consumer_type=_tipo_consumidor(suscripcion.tipo_consumidor),
+            schema=self._schema_de(suscripcion.schema),
+            receiver_queue_size=suscripcion.prefetch,
+            batch_receive_policy=self._crear_politica(suscripcion.max_lote, suscripcion.espera_lote_ms),
+            negative_ack_redelivery_delay_ms=suscripcion.retraso_reentrega_ms,
+            **opciones
+        )
+
+    def despachar(self, suscripcion: Suscripcion, consumidor, mensajes) -> None:
+        """Agrupa un lote por tipo de evento y lo entrega a los handlers."""
+        grupos: Dict[Callable, List[Entrega]] = defaultdict(list)
+        for mensaje in mensajes:
+            try:
+                evento = mensaje.value()
+            except Exception as e:
+                # Un mensaje que no se puede decodificar no mejora al reintentarlo
+                logger.error(f"CONSUMIDOR: Mensaje ilegible descartado en {suscripcion.nombre}: {e}")
+                consumidor.acknowledge(mensaje)
+                continue
+            tipo = getattr(evento, 'type', None)
+            handler = suscripcion.handler_para(tipo)
+            if handler is None:
+                logger.debug(f"CONSUMIDOR: Evento {tipo} sin handler en {suscripcion.nombre}, se ignora")
+                consumidor.acknowledge(mensaje)
+                continue
+            grupos[handler].append(Entrega(consumidor, mensaje, evento))
+
+        for handler, entregas in grupos.items():
+            try:
+                handler(entregas)
+            except Exception as e:
+                logger.error(f"CONSUMIDOR: Error en handler de {suscripcion.nombre}, "
+                             f"{len(entregas)} eventos se reentregarán: {e}")
+                for entrega in entregas:
+                    entrega.rechazar()
+                continue
+            if not suscripcion.confirmacion_manual:
+                for entrega in entregas:
+                    entrega.confirmar()
+
+    def _consumir(self, suscripcion: Suscripcion, consumidor) -> None:
+        logger.info(f"CONSUMIDOR: {suscripcion.nombre} escuchando {suscripcion.topico}")
+        try:
+            while not self._detener.is_set():
+                try:
+                    mensajes = consumidor.batch_receive()
+                except Exception as e:
+                    logger.error(f"CONSUMIDOR: Error recibiendo en {suscripcion.nombre}: {e}")
+                    self._detener.wait(1)
+                    continue
+                if mensajes:
+                    self.despachar(suscripcion, consumidor, mensajes)
+        finally:
+            # Drenado: el lote en curso ya terminó; lo que dependa de un flush se confirma aquí
+            if suscripcion.al_detener is not None:
+                try:
+                    suscripcion.al_detener()
+                except Exception as e:
+                    logger.error(f"CONSUMIDOR: Error deteniendo {suscripcion.nombre}: {e}")
+            consumidor.close()
+            logger.info(f"CONSUMIDOR: {suscripcion.nombre} detenido")
+
+    def iniciar(self) -> 'RuntimeConsumidores':
+        """Se suscribe a todo el registro e inicia un hilo por suscripción."""
+        self._detener.clear()
+        self._cliente = self._crear_cliente()
+        for suscripcion in self._suscripciones:
+            consumidor = self._suscribir(suscripcion)
+            hilo = threading.Thread(
+                target=self._consumir, args=(suscripcion, consumidor),
+                name=f"consumidor-{suscripcion.nombre}", daemon=True
+            )
+            hilo.start()
+            self._hilos.append(hilo)
+        logger.info(f"CONSUMIDOR: Runtime iniciado con {len(self._suscripciones)} suscripciones")
+        return self
+
+    def detener(self, timeout: float = 30.0) -> None:
+        """Deja de recibir y espera a que cada suscripción termine su lote en curso."""
+        self._detener.set()
+        limite = time.monotonic() + timeout
+        for hilo in self._hilos:
+            hilo.join(max(0.0, limite - time.monotonic()))
+        pendientes = [hilo.name for hilo in self._hilos if hilo.is_alive()]
+        if pendientes:
+            logger.warning(f"CONSUMIDOR: Sin terminar tras {timeout}s: {', '.join(pendientes)}")
+        self._hilos = []
+        if self._cliente is not None:
+            self._cliente.close()
+            self._cliente = None
+
+    def ejecutar(self) -> None:
+        """Inicia el runtime y bloquea hasta SIGINT/SIGTERM; luego drena y se detiene."""
+        self.iniciar()
+        for senal in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(senal, lambda *_: self._detener.set())
+        while not self._detener.wait(1):
+            pass
+        logger.info("CONSUMIDOR: Deteniendo runtime...")
+        self.detener()
@@ -0,0 +1,38 @@
+"""
+Contexto de trabajo para procesos sin Flask (consumidores, tareas).
+
+Dentro de la API la sesión y la unidad de trabajo viven en el contexto de
+la app (``db.session`` y ``flask.g``). Un worker no necesita levantar la
+app para eso: ``contexto_trabajo`` abre una sesión propia para procesar
+un mensaje y la publica en un ``ContextVar``, donde la encuentran
+``sesion_actual`` y ``unidad_de_trabajo``. Al salir la sesión se cierra
+(lo no confirmado se descarta) y se restaura el contexto anterior.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+# Sesión y unidad de trabajo del contexto de trabajo activo (None fuera de él)
+sesion_contexto: ContextVar[Optional[Any]] = ContextVar('sesion_contexto', default=None)
+uow_contexto: ContextVar[Optional[Any]] = ContextVar('uow_contexto', default=None)
+
+
+def en_contexto_trabajo() -> bool:
+    return sesion_contexto.get() is not None
+
+
+@contextmanager
+def contexto_trabajo(crear_sesion: Optional[Callable] = None) -> Iterator[Any]:
+    """Sesión (y unidad de trabajo) propias para procesar un mensaje fuera de Flask."""
+    if crear_sesion is None:
+        from .database import SesionWorker as crear_sesion
+    sesion = crear_sesion()
+    token_sesion = sesion_contexto.set(sesion)
+    token_uow = uow_contexto.set(None)
+    try:
+        yield sesion
+    finally:
+        uow_contexto.reset(token_uow)
+        sesion_contexto.reset(token_sesion)
+        sesion.close()
@@ -5,6 +5,7 @@ from typing import Generator
 import logging
 
 from ...config.settings import settings
+from .contexto import sesion_contexto
 
 # Para Flask-SQLAlchemy
 from flask_sqlalchemy import SQLAlchemy
@@ -28,6 +29,25 @@ SessionLocal = sessionmaker(
     autoflush=False
 )
 
+# Motor con pool para los workers: una sesión por mensaje sin abrir una conexión cada vez
+engine_workers = create_engine(
+    settings.database_url,
+    pool_pre_ping=True,
+    echo=settings.debug,
+)
+
+SesionWorker = sessionmaker(
+    bind=engine_workers,
+    autocommit=False,
+    autoflush=False
+)
+
+
+def sesion_actual() -> Session:
+    """Sesión del contexto de trabajo activo; dentro de la API, la de Flask-SQLAlchemy."""
+    sesion = sesion_contexto.get()
+    return sesion if sesion is not None else db.session
+
 
 def get_db_session() -> Generator[Session, None, None]:
     """Generador de sesiones de base de datos síncronas."""
@@ -46,6 +66,7 @@ def init_db():
     # Importar todos los modelos para que se registren en Base.metadata
     from ...modulos.influencers.infraestructura.modelos import Base
     from ...modulos.campanas.infraestructura.schema.campanas import Campanas
+    from .idempotencia import MensajeProcesado
     
     logger.info("Modelos registrados:")
     logger.info(f"   - Influencers: {len([t for t in Base.metadata.tables.keys() if 'influencer' in t.lower()])} tablas")
@@ -69,6 +90,7 @@ def init_db_flask_tables():
     # Importar todos los modelos
     from ...modulos.influencers.infraestructura.modelos import Base
     from ...modulos.campanas.infraestructura.schema.campanas import Campanas
+    from .idempotencia import MensajeProcesado
     
     # Crear todas las tablas definidas en los modelos
     Base.metadata.create_all(bind=engine)
@@ -84,4 +106,5 @@ def init_db_flask(app):
 def close_db():
     """Cierra las conexiones de base de datos."""
     engine.dispose()
+    engine_workers.dispose()
     logger.info("Conexiones de base de datos cerradas")
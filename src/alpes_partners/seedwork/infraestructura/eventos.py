@@ -1,9 +1,27 @@
+"""
+Bus de eventos sobre Redis Streams.
+
+Cada tópico es un stream; los consumidores leen en grupos (cada entrada la
+procesa un solo consumidor del grupo) y confirman con XACK. Lo que un
+consumidor leyó y no confirmó queda pendiente y otro lo reclama tras
+``reclamar_tras_ms``; tras ``max_entregas`` intentos la entrada pasa al
+stream ``<topico>:dlq``. Si Redis se cae, el consumidor espera (con
+backoff) y al reconectar recrea los grupos y retoma sus pendientes.
+"""
+
 from abc import ABC, abstractmethod
-from typing import Dict, List, Callable, Any
+from typing import Dict, List, Callable, Any, Optional, Tuple
+import asyncio
 import json
+import logging
+import os
+import socket
 import redis.asyncio as redis
+from redis.exceptions import ConnectionError as ErrorConexionRedis, ResponseError, TimeoutError as TimeoutRedis
 from ..dominio.eventos import EventoDominio
 
+logger = logging.getLogger(__name__)
+
 
 class DespachadorEventos(ABC):
     """Interfaz para despachador de eventos."""
@@ -21,6 +39,11 @@ class PublicadorEventos(ABC):
     async def publicar(self, topico: str, mensaje: Dict[str, Any]) -> None:
         """Publica un mensaje en un tópico."""
         pass
+    
+    async def publicar_lote(self, topico: str, mensajes: List[Dict[str, Any]]) -> None:
+        """Publica varios mensajes en un tópico."""
+        for mensaje in mensajes:
+            await self.publicar(topico, mensaje)
 
 
 class ConsumidorEventos(ABC):
@@ -33,23 +56,65 @@ class ConsumidorEventos(ABC):
 
 
 class PublicadorEventosRedis(PublicadorEventos):
-    """Publicador de eventos usando Redis."""
+    """Publicador de eventos sobre Redis Streams (XADD)."""
     
-    def __init__(self, redis_url: str):
-        self.redis_client = redis.from_url(redis_url)
+    def __init__(self, redis_url: str, max_longitud: Optional[int] = 1_000_000):
+        self.redis_client = redis.from_url(redis_url, decode_responses=True)
+        # Recorte aproximado (MAXLEN ~): Redis lo aplica por nodos enteros, sin costo extra
+        self.max_longitud = max_longitud
     
-    async def publicar(self, topico: str, mensaje: Dict[str, Any]) -> None:
-        """Publica un mensaje en Redis."""
-        mensaje_json = json.dumps(mensaje, default=str)
-        await self.redis_client.publish(topico, mensaje_json)
+    @staticmethod
+    def _campos(mensaje: Dict[str, Any]) -> Dict[str, str]:
+        return {'datos': json.dumps(mensaje, default=str)}
+    
+    async def publicar(self, topico: str, mensaje: Dict[str, Any]) -> str:
+        """Agrega un mensaje al stream del tópico. Retorna el id de la entrada."""
+        return await self.redis_client.xadd(
+            topico, self._campos(mensaje), maxlen=self.max_longitud, approximate=True
+        )
+    
+    async def publicar_lote(self, topico: str, mensajes: List[Dict[str, Any]]) -> List[str]:
+        """Agrega varios mensajes con un solo viaje de ida y vuelta (pipeline sin transacción)."""
+        if not mensajes:
+            return []
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for mensaje in mensajes:
+                pipe.xadd(topico, self._campos(mensaje), maxlen=self.max_longitud, approximate=True)
+            return await pipe.execute()
+    
+    async def cerrar(self) -> None:
+        await self.redis_client.aclose()
 
 
 class ConsumidorEventosRedis(ConsumidorEventos):
-    """Consumidor de eventos usando Redis."""
+    """Consumidor de eventos en un grupo de Redis Streams.
+    
+    Lee en lotes con XREADGROUP, ejecuta los handlers de cada lote en
+    paralelo (hasta ``concurrencia`` entradas a la vez) y confirma con un
+    solo XACK por tópico las entradas cuyos handlers terminaron sin error.
+    """
     
-    def __init__(self, redis_url: str):
-        self.redis_client = redis.from_url(redis_url)
+    def __init__(self,
+                 redis_url: str,
+                 grupo: str,
+                 consumidor: Optional[str] = None,
+                 tamano_lote: int = 100,
+                 bloqueo_ms: int = 1000,
+                 reclamar_tras_ms: int = 60000,
+                 max_entregas: int = 5,
+                 concurrencia: int = 32,
+                 espera_reconexion_s: float = 1.0):
+        self.redis_client = redis.from_url(redis_url, decode_responses=True)
         self.handlers: Dict[str, List[Callable]] = {}
+        self.grupo = grupo
+        self.consumidor = consumidor or f"{socket.gethostname()}-{os.getpid()}"
+        self.tamano_lote = tamano_lote
+        self.bloqueo_ms = bloqueo_ms
+        self.reclamar_tras_ms = reclamar_tras_ms
+        self.max_entregas = max_entregas
+        self.espera_reconexion_s = espera_reconexion_s
+        self._semaforo = asyncio.Semaphore(concurrencia)
+        self._activo = False
     
     async def suscribirse(self, topico: str, handler: Callable) -> None:
         """Se suscribe a un tópico."""
@@ -57,23 +122,137 @@ class ConsumidorEventosRedis(ConsumidorEventos):
             self.handlers[topico] = []
         self.handlers[topico].append(handler)
     
+    async def _asegurar_grupos(self) -> None:
+        for topico in self.handlers:
+            try:
+                # Un grupo nuevo lee desde el inicio del stream
+                await self.redis_client.xgroup_create(topico, self.grupo, id='0', mkstream=True)
+            except ResponseError as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
+    
+    async def _procesar_entrada(self, topico: str, id_entrada: str, campos: Dict[str, str]) -> Optional[str]:
+        """Ejecuta los handlers del tópico. Retorna el id si se puede confirmar."""
+        async with self._semaforo:
+            try:
+                datos = json.loads(campos['datos'])
+            except (KeyError, TypeError, ValueError) as e:
+                # Una entrada ilegible no mejora al reintentarla
+                logger.warning(f"EVENTOS: Entrada inválida {id_entrada} en {topico} descartada: {e}")
+                return id_entrada
+            try:
+                for handler in self.handlers.get(topico, []):
+                    await handler(datos)
+                return id_entrada
+            except Exception as e:
+                logger.error(f"EVENTOS: Error procesando {id_entrada} en {topico}, queda pendiente: {e}")
+                return None
+    
+    async def _procesar(self, lotes: List[Tuple[str, List[Tuple[str, Dict[str, str]]]]]) -> int:
+        """Procesa lotes ``(topico, entradas)`` y confirma las exitosas. Retorna cuántas confirmó."""
+        confirmadas = 0
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for topico, entradas in lotes:
+                # Una entrada pendiente ya borrada del stream llega sin campos: solo se confirma
+                resultados = await asyncio.gather(*[
+                    self._procesar_entrada(topico, id_entrada, campos) if campos is not None else asyncio.sleep(0, id_entrada)
+                    for id_entrada, campos in entradas
+                ])
+                ids = [id_entrada for id_entrada in resultados if id_entrada]
+                if ids:
+                    pipe.xack(topico, self.grupo, *ids)
+                    confirmadas += len(ids)
+            await pipe.execute()
+        return confirmadas
+    
+    async def _leer(self, desde: str) -> List[Tuple[str, List[Tuple[str, Dict[str, str]]]]]:
+        return await self.redis_client.xreadgroup(
+            self.grupo, self.consumidor,
+            {topico: desde for topico in self.handlers},
+            count=self.tamano_lote,
+            block=self.bloqueo_ms if desde == '>' else None
+        ) or []
+    
+    async def _a_dlq(self, topico: str, id_entrada: str) -> None:
+        entradas = await self.redis_client.xrange(topico, min=id_entrada, max=id_entrada)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            if entradas:
+                pipe.xadd(f"{topico}:dlq", {**entradas[0][1], 'id_original': id_entrada})
+            pipe.xack(topico, self.grupo, id_entrada)
+            await pipe.execute()
+        logger.error(f"EVENTOS: {id_entrada} en {topico} superó {self.max_entregas} entregas, enviado a {topico}:dlq")
+    
+    async def reclamar_pendientes(self) -> int:
+        """Toma las entradas que otros consumidores dejaron sin confirmar y las procesa."""
+        total = 0
+        for topico in self.handlers:
+            pendientes = await self.redis_client.xpending_range(
+                topico, self.grupo, min='-', max='+', count=self.tamano_lote, idle=self.reclamar_tras_ms
+            )
+            for pendiente in pendientes:
+                if pendiente['times_delivered'] >= self.max_entregas:
+                    await self._a_dlq(topico, pendiente['message_id'])
+
+            inicio = '0-0'
+            while True:
+                respuesta = await self.redis_client.xautoclaim(
+                    topico, self.grupo, self.consumidor, self.reclamar_tras_ms,
+                    start_id=inicio, count=self.tamano_lote
+                )
+                inicio, entradas = respuesta[0], respuesta[1]
+                if entradas:
+                    total += await self._procesar([(topico, entradas)])
+                if inicio == '0-0':
+                    break
+        if total:
+            logger.info(f"EVENTOS: {total} entradas pendientes reclamadas por {self.consumidor}")
+        return total
+    
+    async def _procesar_propios(self) -> None:
+        """Procesa lo que este mismo consumidor leyó y no confirmó (antes de reiniciarse o de una caída)."""
+        while self._activo and (lotes := [(t, e) for t, e in await self._leer('0') if e]):
+            if not await self._procesar(lotes):
+                break
+    
     async def iniciar_consumo(self) -> None:
-        """Inicia el consumo de mensajes."""
-        pubsub = self.redis_client.pubsub()
-        
-        # Suscribirse a todos los tópicos
-        for topico in self.handlers.keys():
-            await pubsub.subscribe(topico)
-        
-        async for mensaje in pubsub.listen():
-            if mensaje['type'] == 'message':
-                topico = mensaje['channel'].decode('utf-8')
-                datos = json.loads(mensaje['data'].decode('utf-8'))
+        """Inicia el consumo de mensajes; sigue reintentando mientras Redis no esté disponible."""
+        self._activo = True
+        preparar = True
+        espera = self.espera_reconexion_s
+        ultimo_reclamo = 0.0
+        bucle = asyncio.get_running_loop()
+        while self._activo:
+            try:
+                if preparar:
+                    await self._asegurar_grupos()
+                    await self._procesar_propios()
+                    preparar = False
+                
+                if bucle.time() - ultimo_reclamo >= self.reclamar_tras_ms / 1000:
+                    ultimo_reclamo = bucle.time()
+                    try:
+                        await self.reclamar_pendientes()
+                    except ResponseError as e:
+                        logger.error(f"EVENTOS: Error reclamando pendientes: {e}")
                 
-                # Ejecutar handlers
-                if topico in self.handlers:
-                    for handler in self.handlers[topico]:
-                        await handler(datos)
+                lotes = await self._leer('>')
+                if lotes:
+                    await self._procesar(lotes)
+                espera = self.espera_reconexion_s
+            except (ErrorConexionRedis, TimeoutRedis) as e:
+                logger.warning(f"EVENTOS: Redis no disponible, se reintenta en {espera:.1f}s: {e}")
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, 30.0)
+                # Redis pudo reiniciarse sin los grupos; lo leído sin confirmar se retoma
+                preparar = True
+            except ResponseError as e:
+                if 'NOGROUP' not in str(e):
+                    raise
+                logger.warning(f"EVENTOS: Grupo {self.grupo} inexistente, se recrea: {e}")
+                preparar = True
+    
+    def detener(self) -> None:
+        self._activo = False
 
 
 class DespachadorEventosRedis(DespachadorEventos):
@@ -86,3 +265,23 @@ class DespachadorEventosRedis(DespachadorEventos):
         """Despacha un evento a Redis."""
         topico = f"{evento.__class__.__module__.split('.')[-2]}.{evento.__class__.__name__}"
         await self.publicador.publicar(topico, evento.to_dict())
+
+
+def publicador_eventos_redis() -> PublicadorEventosRedis:
+    """Publicador sobre ``settings.redis_url``."""
+    from alpes_partners.config.settings import settings
+    return PublicadorEventosRedis(settings.redis_url, settings.eventos_redis_max_longitud)
+
+
+def consumidor_eventos_redis(grupo: str, consumidor: Optional[str] = None) -> ConsumidorEventosRedis:
+    """Consumidor del grupo ``grupo`` sobre ``settings.redis_url``."""
+    from alpes_partners.config.settings import settings
+    return ConsumidorEventosRedis(
+        settings.redis_url,
+        grupo,
+        consumidor=consumidor,
+        tamano_lote=settings.eventos_redis_tamano_lote,
+        bloqueo_ms=settings.eventos_redis_bloqueo_ms,
+        reclamar_tras_ms=settings.eventos_redis_reclamar_ms,
+        max_entregas=settings.eventos_redis_max_entregas
+    )
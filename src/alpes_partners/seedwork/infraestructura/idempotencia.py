@@ -0,0 +1,170 @@
+"""
+Registro de idempotencia para consumidores de eventos.
+
+Pulsar entrega al menos una vez: un mensaje puede llegar repetido tras un
+reinicio o un ack perdido. Cada consumidor reclama el id del evento en la
+tabla mensajes_procesados dentro de la misma transacción que su efecto,
+así que el efecto y la marca de "procesado" se confirman o se revierten
+juntos. Un filtro de Bloom en memoria descarta sin ir a la base de datos
+los ids que seguro son nuevos (la gran mayoría).
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Set
+
+from sqlalchemy import Column, String, DateTime, Index, delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+
+from alpes_partners.config.settings import settings
+from alpes_partners.modulos.influencers.infraestructura.modelos import Base
+from .bloom import FiltroBloom
+from .database import SessionLocal, sesion_actual
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE_LIMPIEZA = 10000
+
+
+class MensajeProcesado(Base):
+    """Tabla de mensajes ya procesados por suscripción."""
+
+    __tablename__ = 'mensajes_procesados'
+
+    suscripcion = Column(String(200), primary_key=True)
+    mensaje_id = Column(String(100), primary_key=True)
+    fecha_procesamiento = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+# Para la limpieza por antigüedad
+Index('idx_mensajes_procesados_fecha', MensajeProcesado.fecha_procesamiento)
+
+
+class RegistroIdempotencia:
+    """Registro de eventos procesados de una suscripción (tabla + filtro de Bloom).
+
+    ``reclamar`` y ``reclamar_lote`` escriben en la sesión recibida (por
+    defecto ``sesion_actual``) sin confirmar: el commit del efecto confirma
+    también la marca, y un rollback la descarta.
+    """
+
+    def __init__(self,
+                 suscripcion: str,
+                 sesion: Callable = sesion_actual,
+                 ttl_horas: int = None,
+                 capacidad_bloom: int = None):
+        self._suscripcion = suscripcion
+        self._sesion = sesion
+        self._ttl = timedelta(hours=ttl_horas or settings.idempotencia_ttl_horas)
+        self._capacidad_bloom = capacidad_bloom or settings.idempotencia_bloom_capacidad
+        self._bloom = FiltroBloom(self._capacidad_bloom)
+
+    @property
+    def suscripcion(self) -> str:
+        return self._suscripcion
+
+    def cargar(self) -> int:
+        """Reconstruye el filtro con los ids vigentes de la tabla. Retorna cuántos cargó."""
+        bloom = FiltroBloom(self._capacidad_bloom)
+        with SessionLocal() as sesion:
+            filas = sesion.execute(
+                select(MensajeProcesado.mensaje_id)
+                .where(MensajeProcesado.suscripcion == self._suscripcion)
+                .execution_options(yield_per=TAMANO_LOTE_LIMPIEZA)
+            )
+            for fila in filas:
+                bloom.agregar(fila.mensaje_id)
+        self._bloom = bloom
+        logger.info(f"IDEMPOTENCIA: {len(bloom)} mensajes cargados para {self._suscripcion}")
+        return len(bloom)
+
+    def reclamar(self, mensaje_id: str) -> bool:
+        """Marca el mensaje como procesado. Retorna False si ya lo estaba (duplicado)."""
+        return mensaje_id in self.reclamar_lote([mensaje_id])
+
+    def reclamar_lote(self, mensaje_ids: Iterable[str]) -> Set[str]:
+        """Marca varios mensajes con un solo INSERT. Retorna los que no estaban procesados."""
+        ids = {str(mensaje_id) for mensaje_id in mensaje_ids}
+        if not ids:
+            return set()
+
+        # ON CONFLICT resuelve también la carrera con otro consumidor de la suscripción
+        resultado = self._sesion().execute(
+            insert(MensajeProcesado)
+            .values([{'suscripcion': self._suscripcion, 'mensaje_id': mensaje_id} for mensaje_id in ids])
+            .on_conflict_do_nothing(index_elements=['suscripcion', 'mensaje_id'])
+            .returning(MensajeProcesado.mensaje_id)
+        )
+        nuevos = {fila.mensaje_id for fila in resultado}
+        for mensaje_id in ids:
+            self._bloom.agregar(mensaje_id)
+
+        duplicados = len(ids) - len(nuevos)
+        if duplicados:
+            logger.warning(f"IDEMPOTENCIA: {duplicados} mensajes duplicados omitidos en {self._suscripcion}")
+        return nuevos
+
+    def es_nuevo(self, mensaje_id: str) -> bool:
+        """Consulta previa sin escribir, para descartar duplicados antes de preparar el efecto.
+        
+        El filtro no tiene falsos negativos: si no contiene el id, es nuevo sin
+        consultar la tabla. Solo los "quizás" (duplicados reales o falsos
+        positivos) van a la base de datos.
+        """
+        if mensaje_id not in self._bloom:
+            return True
+        fila = self._sesion().execute(
+            select(MensajeProcesado.mensaje_id).where(
+                MensajeProcesado.suscripcion == self._suscripcion,
+                MensajeProcesado.mensaje_id == mensaje_id
+            )
+        ).first()
+        return fila is None
+
+    def limpiar(self) -> int:
+        """Borra por lotes las marcas más antiguas que el TTL y reconstruye el filtro."""
+        limite = datetime.now(timezone.utc) - self._ttl
+        total = 0
+        with SessionLocal() as sesion:
+            while True:
+                antiguos = (
+                    select(MensajeProcesado.mensaje_id)
+                    .where(
+                        MensajeProcesado.suscripcion == self._suscripcion,
+                        MensajeProcesado.fecha_procesamiento < limite
+                    )
+                    .limit(TAMANO_LOTE_LIMPIEZA)
+                )
+                borrados = sesion.execute(
+                    delete(MensajeProcesado).where(
+                        MensajeProcesado.suscripcion == self._suscripcion,
+                        MensajeProcesado.mensaje_id.in_(antiguos.scalar_subquery())
+                    )
+                ).rowcount
+                sesion.commit()
+                total += borrados
+                if borrados < TAMANO_LOTE_LIMPIEZA:
+                    break
+        if total:
+            logger.info(f"IDEMPOTENCIA: {total} marcas vencidas borradas en {self._suscripcion}")
+            self.cargar()
+        return total
+
+    def iniciar_limpieza(self, intervalo: int = None) -> threading.Thread:
+        """Limpia periódicamente en un hilo daemon."""
+        intervalo = intervalo or settings.idempotencia_limpieza_intervalo
+
+        def ejecutar():
+            while True:
+                time.sleep(intervalo)
+                try:
+                    self.limpiar()
+                except Exception as e:
+                    logger.error(f"IDEMPOTENCIA: Error limpiando {self._suscripcion}: {e}")
+
+        hilo = threading.Thread(target=ejecutar, name=f"idempotencia-{self._suscripcion}", daemon=True)
+        hilo.start()
+        return hilo
@@ -0,0 +1,149 @@
+"""
+Índices en memoria para consultas de lectura de baja latencia.
+"""
+
+import gzip
+import json
+import os
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .utils import normalizar_texto, time_millis
+
+# Separador mayor a cualquier carácter de un texto normalizado: delimita el rango de un prefijo
+_FIN_PREFIJO = '￿'
+
+
+class IndicePrefijos:
+    """Índice de prefijos sobre nombres normalizados (arreglo ordenado + bisect).
+
+    Cada documento se indexa por cada sufijo de palabras de su nombre
+    ("ana maria lopez", "maria lopez", "lopez"), de modo que un prefijo
+    encuentra coincidencias al inicio de cualquier palabra. Las entradas son
+    tuplas ``(termino, tipo, id)`` en un único arreglo ordenado: una búsqueda
+    es un ``bisect`` más un recorrido corto, sin ir a la base de datos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entradas: List[Tuple[str, str, str]] = []
+        self._documentos: Dict[Tuple[str, str], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._documentos)
+
+    @staticmethod
+    def _terminos(nombre: str) -> List[str]:
+        palabras = normalizar_texto(nombre).split()
+        return [' '.join(palabras[i:]) for i in range(len(palabras))]
+
+    def cargar(self, documentos: Iterable[Tuple[str, str, str]]) -> None:
+        """Reemplaza el contenido del índice con ``(tipo, id, nombre)`` en una sola pasada."""
+        nuevos_documentos = {}
+        for tipo, id, nombre in documentos:
+            nuevos_documentos[(tipo, str(id))] = nombre
+
+        nuevas_entradas = [
+            (termino, tipo, id)
+            for (tipo, id), nombre in nuevos_documentos.items()
+            for termino in self._terminos(nombre)
+        ]
+        nuevas_entradas.sort()
+
+        with self._lock:
+            self._entradas = nuevas_entradas
+            self._documentos = nuevos_documentos
+
+    def agregar(self, tipo: str, id: str, nombre: str) -> None:
+        """Agrega o reemplaza un documento. Es idempotente."""
+        clave = (tipo, str(id))
+        with self._lock:
+            anterior = self._documentos.get(clave)
+            if anterior == nombre:
+                return
+            if anterior is not None:
+                self._quitar_entradas(clave, anterior)
+            self._documentos[clave] = nombre
+            for termino in self._terminos(nombre):
+                insort(self._entradas, (termino, clave[0], clave[1]))
+
+    def eliminar(self, tipo: str, id: str) -> None:
+        """Elimina un documento del índice si existe."""
+        clave = (tipo, str(id))
+        with self._lock:
+            nombre = self._documentos.pop(clave, None)
+            if nombre is not None:
+                self._quitar_entradas(clave, nombre)
+
+    def _quitar_entradas(self, clave: Tuple[str, str], nombre: str) -> None:
+        for termino in self._terminos(nombre):
+            entrada = (termino, clave[0], clave[1])
+            posicion = bisect_left(self._entradas, entrada)
+            if posicion < len(self._entradas) and self._entradas[posicion] == entrada:
+                del self._entradas[posicion]
+
+    def buscar(self, prefijo: str, limite: int = 10, tipo: Optional[str] = None) -> List[Dict[str, str]]:
+        """Retorna hasta ``limite`` documentos cuyo nombre tenga una palabra que empiece por ``prefijo``."""
+        termino = normalizar_texto(prefijo)
+        if not termino or limite <= 0:
+            return []
+
+        resultados = []
+        vistos = set()
+        with self._lock:
+            entradas = self._entradas
+            inicio = bisect_left(entradas, (termino,))
+            fin = bisect_left(entradas, (termino + _FIN_PREFIJO,), inicio)
+            for posicion in range(inicio, fin):
+                _, tipo_entrada, id = entradas[posicion]
+                if tipo and tipo_entrada != tipo:
+                    continue
+                clave = (tipo_entrada, id)
+                if clave in vistos:
+                    continue
+                vistos.add(clave)
+                resultados.append({'tipo': tipo_entrada, 'id': id, 'nombre': self._documentos[clave]})
+                if len(resultados) >= limite:
+                    break
+        return resultados
+
+    def guardar_snapshot(self, ruta: str, timestamp: Optional[int] = None) -> None:
+        """Guarda un snapshot compacto (solo documentos, sin términos) de forma atómica.
+
+        ``timestamp`` (ms) indica hasta qué evento está al día el snapshot; al
+        restaurarlo se reanuda el consumo de eventos desde ese instante.
+        """
+        with self._lock:
+            documentos = [[tipo, id, nombre] for (tipo, id), nombre in self._documentos.items()]
+        self.escribir_snapshot(ruta, documentos, timestamp)
+
+    @staticmethod
+    def escribir_snapshot(ruta: str, documentos: Iterable[Sequence[str]], timestamp: Optional[int] = None) -> None:
+        """Escribe un snapshot de ``(tipo, id, nombre)`` sin construir el índice (reconstrucciones)."""
+        contenido = {
+            'timestamp': timestamp if timestamp is not None else time_millis(),
+            'documentos': [list(documento) for documento in documentos]
+        }
+        temporal = f"{ruta}.tmp"
+        with gzip.open(temporal, 'wt', encoding='utf-8') as archivo:
+            json.dump(contenido, archivo, separators=(',', ':'))
+        os.replace(temporal, ruta)
+
+    @staticmethod
+    def leer_snapshot(ruta: str) -> Optional[Tuple[int, List[Tuple[str, str, str]]]]:
+        """``(timestamp, documentos)`` del snapshot, o None si no existe."""
+        if not os.path.exists(ruta):
+            return None
+        with gzip.open(ruta, 'rt', encoding='utf-8') as archivo:
+            contenido = json.load(archivo)
+        return int(contenido['timestamp']), [tuple(documento) for documento in contenido['documentos']]
+
+    def cargar_snapshot(self, ruta: str) -> Optional[int]:
+        """Restaura el índice desde un snapshot. Retorna su timestamp (ms) o None si no existe."""
+        snapshot = self.leer_snapshot(ruta)
+        if snapshot is None:
+            return None
+        timestamp, documentos = snapshot
+        self.cargar(documentos)
+        return timestamp
@@ -0,0 +1,80 @@
+"""
+Lectores de tópicos para proyecciones en memoria.
+
+Usan Readers de Pulsar (sin suscripción durable): cada proceso mantiene su
+propia proyección y reproduce los eventos desde un timestamp. Con una
+``PosicionLector`` el lector registra hasta qué timestamp de publicación
+ya aplicó los eventos, para guardar snapshots desde ese punto.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+import pulsar
+
+from . import utils
+from .schema.registro import schema_de
+
+logger = logging.getLogger(__name__)
+
+
+class PosicionLector:
+    """Timestamp de publicación (ms) hasta el que un lector aplicó los eventos.
+
+    Avanza con cada evento aplicado y, cuando el lector está al día con el
+    tópico, hasta ahora menos ``margen_ms`` (lo publicado y aún no entregado).
+    """
+
+    def __init__(self, desde: Optional[int] = None, margen_ms: int = 0):
+        self.timestamp = desde or 0
+        self._margen_ms = margen_ms
+
+    def avanzar(self, timestamp: int) -> None:
+        if timestamp > self.timestamp:
+            self.timestamp = timestamp
+
+    def al_dia(self) -> None:
+        self.avanzar(utils.time_millis() - self._margen_ms)
+
+
+def _crear_lector(cliente, topico: str, schema, desde: Optional[int]):
+    lector = cliente.create_reader(topico, pulsar.MessageId.earliest, schema=schema_de(schema))
+    if desde is not None:
+        lector.seek(desde)
+    logger.info(f"LECTOR: Leyendo {topico} desde {desde if desde is not None else 'el inicio'}")
+    return lector
+
+
+def _leer(cliente, topico: str, schema, manejador: Callable, desde: Optional[int],
+          posicion: Optional[PosicionLector] = None):
+    lector = None
+    while True:
+        try:
+            # Si el broker no está disponible al arrancar, la creación se reintenta como las lecturas
+            if lector is None:
+                lector = _crear_lector(cliente, topico, schema, desde)
+            if posicion is not None and not lector.has_message_available():
+                posicion.al_dia()
+            mensaje = lector.read_next()
+            manejador(mensaje.value())
+            if posicion is not None:
+                posicion.avanzar(mensaje.publish_timestamp())
+        except Exception as e:
+            logger.error(f"LECTOR: Error leyendo {topico}: {e}")
+            time.sleep(5)
+
+
+def iniciar_lector(cliente, topico: str, schema, manejador: Callable,
+                   desde: Optional[int] = None, nombre: Optional[str] = None,
+                   posicion: Optional[PosicionLector] = None) -> threading.Thread:
+    """Inicia en un hilo daemon la lectura de ``topico`` aplicando ``manejador`` a cada evento."""
+    hilo = threading.Thread(
+        target=_leer,
+        args=(cliente, topico, schema, manejador, desde, posicion),
+        name=nombre or f"lector-{topico}",
+        daemon=True
+    )
+    hilo.start()
+    return hilo
@@ -0,0 +1,563 @@
+"""
+Publicación de mensajes en Pulsar con deduplicación del lado del broker.
+
+Cada proceso mantiene un cliente y un productor con nombre estable por
+tópico. Los mensajes llevan un sequence id creciente que el productor
+retoma desde el último que el broker tiene registrado para ese nombre;
+con la deduplicación habilitada en el broker, reenviar un mensaje con el
+mismo sequence id (un reintento tras un timeout, o tras un reinicio) no
+lo publica dos veces.
+
+Los productores agrupan mensajes en lotes comprimidos (tamaño, bytes y
+retraso máximo configurables) y admiten envío asíncrono: ``publicar_async``
+no espera el ack del broker y el callback de confirmación alimenta las
+métricas del publicador.
+
+Si el broker no está disponible, los mensajes se guardan en un spool en
+disco local y un hilo drenador los republica en orden cuando el broker
+vuelve. Mientras el spool tenga pendientes, los mensajes nuevos también van
+a él (sin esperar al broker), así que la latencia de quien publica no
+depende de la caída. Una entrada que no se puede decodificar o cuyo schema
+ya no está registrado no se arreglará reintentando: se aparta a un archivo
+de descartados junto al spool y el drenado sigue con la próxima.
+"""
+
+import atexit
+import base64
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+import pulsar
+
+from alpes_partners.config.settings import settings
+from .broker import crear_cliente
+from .schema.registro import registro_schemas, schema_de
+from .spool import SpoolSegmentos, abrir_spool, desempaquetar_entrada, empaquetar_entrada
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cliente = None
+_publicadores: Dict[Tuple[str, type], 'PublicadorPulsar'] = {}
+_spool = None
+
+TAMANO_LOTE_DRENADO = 500
+# Espera máxima por los acks de un lote drenado (por encima del timeout de envío del productor)
+ESPERA_ACKS_DRENADO_S = 30.0
+
+COMPRESIONES = {
+    'NONE': pulsar.CompressionType.NONE,
+    'LZ4': pulsar.CompressionType.LZ4,
+    'ZSTD': pulsar.CompressionType.ZSTD,
+    'ZLIB': pulsar.CompressionType.ZLib,
+    'SNAPPY': pulsar.CompressionType.SNAPPY,
+}
+
+
+def obtener_cliente() -> pulsar.Client:
+    """Cliente Pulsar compartido por el proceso."""
+    global _cliente
+    with _lock:
+        if _cliente is None:
+            _cliente = crear_cliente(
+                # Con el broker caído, fallar pronto y desviar al spool en lugar de bloquear al llamador
+                operation_timeout_seconds=settings.publicador_timeout_operacion,
+                connection_timeout_ms=settings.publicador_timeout_operacion * 1000
+            )
+        return _cliente
+
+
+def nombre_productor(servicio: str, topico: str, schema: type, ranura: Optional[int] = None) -> str:
+    """Nombre estable del productor: mismo servicio, host, proceso, tópico y schema => mismo nombre tras reiniciar.
+
+    Varios procesos en un mismo host (los workers del servidor) se
+    distinguen por la ranura de spool que cada uno tiene tomada, que un
+    proceso reiniciado retoma; sin spool se usa el pid, que no sobrevive al
+    reinicio (el productor nuevo retoma igual la secuencia del broker, pero
+    los reintentos del proceso anterior ya no se deduplican).
+    """
+    instancia = os.getenv('PRODUCTOR_INSTANCIA') or socket.gethostname()
+    proceso = f"r{ranura}" if ranura is not None else f"p{os.getpid()}"
+    return f"{servicio}-{instancia}-{proceso}-{topico}-{schema.__name__}"
+
+
+@dataclass(frozen=True)
+class ConfiguracionProductor:
+    """Parámetros de batching, compresión y cola de envíos pendientes."""
+    batching: bool = True
+    lote_max_mensajes: int = 1000
+    lote_max_bytes: int = 128 * 1024
+    lote_max_retraso_ms: int = 10
+    compresion: str = 'LZ4'
+    max_pendientes: int = 10000
+    timeout_envio_ms: int = 10000
+
+    @classmethod
+    def desde_settings(cls) -> 'ConfiguracionProductor':
+        return cls(
+            batching=settings.publicador_batching,
+            lote_max_mensajes=settings.publicador_lote_max_mensajes,
+            lote_max_bytes=settings.publicador_lote_max_bytes,
+            lote_max_retraso_ms=settings.publicador_lote_max_retraso_ms,
+            compresion=settings.publicador_compresion,
+            max_pendientes=settings.publicador_max_pendientes
+        )
+
+    def argumentos_productor(self) -> dict:
+        compresion = self.compresion.upper()
+        if compresion not in COMPRESIONES:
+            raise ValueError(f"Compresión no soportada: {self.compresion} (opciones: {', '.join(COMPRESIONES)})")
+        return {
+            'batching_enabled': self.batching,
+            'batching_max_messages': self.lote_max_mensajes,
+            'batching_max_allowed_size_in_bytes': self.lote_max_bytes,
+            'batching_max_publish_delay_ms': self.lote_max_retraso_ms,
+            'compression_type': COMPRESIONES[compresion],
+            'max_pending_messages': self.max_pendientes,
+            # Con la cola llena, publicar espera en lugar de fallar (contrapresión)
+            'block_if_queue_full': True,
+            'send_timeout_millis': self.timeout_envio_ms
+        }
+
+
+class MetricasPublicador:
+    """Contadores de envíos confirmados, fallidos y latencia hasta el ack."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enviados = 0
+        self.confirmados = 0
+        self.fallidos = 0
+        self.reintentos = 0
+        self._latencia_total_ms = 0.0
+        self.latencia_max_ms = 0.0
+
+    def registrar_envio(self) -> None:
+        with self._lock:
+            self.enviados += 1
+
+    def registrar_reintento(self) -> None:
+        with self._lock:
+            self.reintentos += 1
+
+    def registrar_resultado(self, ok: bool, latencia_ms: float) -> None:
+        with self._lock:
+            if ok:
+                self.confirmados += 1
+                self._latencia_total_ms += latencia_ms
+                self.latencia_max_ms = max(self.latencia_max_ms, latencia_ms)
+            else:
+                self.fallidos += 1
+
+    @property
+    def pendientes(self) -> int:
+        return self.enviados - self.confirmados - self.fallidos
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                'enviados': self.enviados,
+                'confirmados': self.confirmados,
+                'fallidos': self.fallidos,
+                'reintentos': self.reintentos,
+                'pendientes': self.enviados - self.confirmados - self.fallidos,
+                'latencia_promedio_ms': round(self._latencia_total_ms / self.confirmados, 3) if self.confirmados else 0.0,
+                'latencia_max_ms': round(self.latencia_max_ms, 3)
+            }
+
+
+class SpoolPublicacion:
+    """Guarda en el spool los mensajes que no llegaron al broker y los republica en orden.
+
+    Cada entrada lleva el tópico, el tipo y versión registrados del mensaje,
+    el servicio que lo publicó y el mensaje codificado en Avro.
+    """
+
+    ARCHIVO_DESCARTADOS = 'descartados.jsonl'
+
+    def __init__(self, spool: SpoolSegmentos, intervalo: float = 2.0):
+        self._spool = spool
+        self._intervalo = intervalo
+        self._lock = threading.Lock()
+        self._aviso = threading.Event()
+        self._activo = not spool.vacio
+        self.desviados = 0
+        self.descartados = 0
+
+    @property
+    def ranura(self) -> Optional[int]:
+        return self._spool.ranura
+
+    @property
+    def activo(self) -> bool:
+        """True mientras haya mensajes en el spool: los nuevos deben ir detrás de ellos."""
+        return self._activo
+
+    def desviar(self, publicador: 'PublicadorPulsar', mensaje) -> None:
+        version = registro_schemas.version_de(publicador.schema)
+        if version is None:
+            raise ValueError(f"{publicador.schema.__name__} no tiene schema registrado; no se puede guardar en el spool")
+        tipo, numero = version
+        entrada = empaquetar_entrada(
+            [publicador.topico, tipo, str(numero), publicador.servicio],
+            schema_de(publicador.schema).encode(mensaje)
+        )
+        with self._lock:
+            self._spool.agregar(entrada)
+            self._activo = True
+            self.desviados += 1
+        self._aviso.set()
+
+    def _descartar(self, entrada: bytes, error: Exception) -> None:
+        """Aparta una entrada irrecuperable (con el motivo) para no bloquear el drenado."""
+        ruta = os.path.join(self._spool.directorio, self.ARCHIVO_DESCARTADOS)
+        registro = {'error': repr(error), 'entrada': base64.b64encode(entrada).decode('ascii')}
+        with open(ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write(json.dumps(registro) + '\n')
+        self.descartados += 1
+        logger.error(f"PUBLICADOR: Entrada del spool irrecuperable apartada en {ruta}: {error!r}")
+
+    def _resolver(self, entrada: bytes):
+        """Tópico, clase, servicio y mensaje decodificado de una entrada."""
+        (topico, tipo, version, servicio), datos = desempaquetar_entrada(entrada)
+        clase = registro_schemas.clase(tipo, int(version))
+        return topico, clase, servicio, schema_de(clase).decode(datos)
+
+    def drenar(self) -> int:
+        """Republica todo lo pendiente. Retorna cuántos mensajes publicó; propaga el error si el broker falla.
+
+        Cada lote leído se publica de forma asíncrona, con un ``flush`` por
+        publicador al final, y el cursor avanza solo hasta la última entrada
+        con ack (las siguientes se republican en el próximo drenado). Solo
+        un error del broker detiene el drenado: las entradas que no se
+        pueden decodificar o resolver se apartan y el cursor avanza.
+        """
+        total = 0
+        while True:
+            registros = self._spool.leer(TAMANO_LOTE_DRENADO)
+            if not registros:
+                with self._lock:
+                    # Bajo el mismo lock que desviar: no se pierde un mensaje agregado justo ahora
+                    if self._spool.vacio:
+                        self._activo = False
+                        if total:
+                            logger.info(f"PUBLICADOR: Spool drenado, {total} mensajes republicados")
+                        return total
+                continue
+
+            confirmadas, error = self._republicar_lote(registros)
+            if confirmadas:
+                self._spool.confirmar(registros[confirmadas - 1][0])
+                total += confirmadas
+            if error is not None:
+                raise error
+
+    def _republicar_lote(self, registros) -> Tuple[int, Optional[Exception]]:
+        """Publica un lote del spool y espera sus acks.
+
+        Retorna cuántas entradas del inicio del lote quedaron resueltas (con
+        ack o apartadas) y el error que cortó el lote, si hubo uno.
+        """
+        resultados: Dict[int, object] = {}
+        completos = threading.Condition()
+        publicadores = {}
+        error = None
+
+        def al_completar(indice):
+            def registrar(ok, detalle):
+                with completos:
+                    resultados[indice] = True if ok else detalle
+                    completos.notify_all()
+            return registrar
+
+        esperados = 0
+        for indice, (_, entrada) in enumerate(registros):
+            esperados += 1
+            try:
+                topico, clase, servicio, mensaje = self._resolver(entrada)
+            except Exception as e:
+                self._descartar(entrada, e)
+                al_completar(indice)(True, None)
+                continue
+            publicador = obtener_publicador(topico, clase, servicio)
+            try:
+                publicador.publicar_async(mensaje, al_completar(indice), desde_spool=True)
+            except Exception as e:
+                esperados -= 1
+                error = e
+                break
+            publicadores[id(publicador)] = publicador
+
+        for publicador in publicadores.values():
+            try:
+                publicador.flush()
+            except Exception as e:
+                error = error or e
+        with completos:
+            completos.wait_for(lambda: len(resultados) >= esperados, timeout=ESPERA_ACKS_DRENADO_S)
+
+        resueltas = 0
+        for indice in range(len(registros)):
+            resultado = resultados.get(indice)
+            if resultado is not True:
+                if error is None:
+                    error = RuntimeError(f"Sin ack del broker para la entrada {indice} del lote: {resultado}")
+                break
+            resueltas += 1
+        return resueltas, error
+
+    def _ejecutar(self) -> None:
+        while True:
+            self._aviso.wait(self._intervalo)
+            self._aviso.clear()
+            if not self._activo:
+                continue
+            try:
+                self.drenar()
+            except Exception as e:
+                logger.warning(f"PUBLICADOR: Broker aún no disponible, el spool sigue pendiente: {e}")
+                time.sleep(self._intervalo)
+
+    def iniciar(self) -> threading.Thread:
+        hilo = threading.Thread(target=self._ejecutar, name="publicador-spool", daemon=True)
+        hilo.start()
+        return hilo
+
+
+def obtener_spool() -> Optional[SpoolPublicacion]:
+    """Spool del proceso (con su drenador en marcha), o None si está deshabilitado."""
+    global _spool
+    if not settings.spool_habilitado:
+        return None
+    with _lock:
+        if _spool is None:
+            _spool = SpoolPublicacion(
+                abrir_spool(settings.spool_directorio, settings.spool_tamano_segmento),
+                settings.spool_drenado_intervalo
+            )
+            _spool.iniciar()
+        return _spool
+
+
+class PublicadorPulsar:
+    """Productor con nombre y sequence ids explícitos para un tópico."""
+
+    def __init__(self, topico: str, schema: type, servicio: str, reintentos: int = 3,
+                 configuracion: Optional[ConfiguracionProductor] = None,
+                 spool: Optional[SpoolPublicacion] = None):
+        self._topico = topico
+        self._schema = schema
+        self._servicio = servicio
+        self._spool = spool
+        self._nombre = nombre_productor(servicio, topico, schema, spool.ranura if spool is not None else None)
+        self._reintentos = reintentos
+        self._configuracion = configuracion or ConfiguracionProductor.desde_settings()
+        self._lock = threading.Lock()
+        self._productor = None
+        self._secuencia = -1
+        self.metricas = MetricasPublicador()
+
+    @property
+    def topico(self) -> str:
+        return self._topico
+
+    @property
+    def schema(self) -> type:
+        return self._schema
+
+    @property
+    def servicio(self) -> str:
+        return self._servicio
+
+    def _desviar(self, mensaje, error=None) -> None:
+        if error is not None:
+            logger.warning(f"PUBLICADOR: No se pudo publicar en {self._topico}, se guarda en el spool: {error}")
+        self._spool.desviar(self, mensaje)
+
+    def _obtener_productor(self):
+        if self._productor is None:
+            self._productor = obtener_cliente().create_producer(
+                self._topico,
+                producer_name=self._nombre,
+                schema=schema_de(self._schema),
+                **self._configuracion.argumentos_productor()
+            )
+            # Retoma la numeración donde la dejó el último productor con este nombre
+            self._secuencia = max(self._secuencia, self._productor.last_sequence_id())
+            logger.info(
+                f"PUBLICADOR: Productor '{self._nombre}' listo (secuencia {self._secuencia}, "
+                f"batching={self._configuracion.batching}, compresión={self._configuracion.compresion})"
+            )
+        return self._productor
+
+    def publicar(self, mensaje, desde_spool: bool = False) -> Optional[int]:
+        """Publica y espera el ack; los reintentos reusan el mismo sequence id.
+
+        Retorna el sequence id, o None si el mensaje quedó en el spool.
+        Con spool, el primer error ya desvía el mensaje (no se reintenta
+        contra un broker caído); ``desde_spool`` lo usa el drenador para
+        publicar directamente y propagar el error.
+        """
+        usar_spool = self._spool is not None and not desde_spool
+        if usar_spool and self._spool.activo:
+            self._desviar(mensaje)
+            return None
+
+        with self._lock:
+            try:
+                productor = self._obtener_productor()
+            except Exception as e:
+                if not usar_spool:
+                    raise
+                self._desviar(mensaje, e)
+                return None
+            self._secuencia += 1
+            secuencia = self._secuencia
+
+            for intento in range(1, self._reintentos + 1):
+                inicio = time.perf_counter()
+                self.metricas.registrar_envio()
+                try:
+                    productor.send(mensaje, sequence_id=secuencia)
+                    self.metricas.registrar_resultado(True, (time.perf_counter() - inicio) * 1000)
+                    return secuencia
+                except Exception as e:
+                    self.metricas.registrar_resultado(False, 0.0)
+                    if usar_spool:
+                        self._desviar(mensaje, e)
+                        return None
+                    if intento == self._reintentos:
+                        raise
+                    self.metricas.registrar_reintento()
+                    logger.warning(
+                        f"PUBLICADOR: Error publicando en {self._topico} (intento {intento}/{self._reintentos}), "
+                        f"se reintenta con la misma secuencia {secuencia}: {e}"
+                    )
+                    time.sleep(0.2 * intento)
+
+    def publicar_async(self, mensaje, al_completar: Optional[Callable[[bool, object], None]] = None,
+                       intento: int = 1, desde_spool: bool = False) -> Optional[int]:
+        """Publica sin esperar el ack. Retorna el sequence id asignado, o None si quedó en el spool.
+
+        El resultado llega en el hilo del cliente Pulsar: se registra en las
+        métricas y, si falla, el mensaje va al spool o, sin spool, se reenvía
+        (con un sequence id nuevo, porque los posteriores ya pueden estar
+        persistidos y el broker descartaría uno menor).
+        ``al_completar(ok, id_mensaje_o_error)`` se invoca con el resultado
+        final; un mensaje en el spool aún no tiene resultado. Con
+        ``desde_spool`` (el drenador) no se desvía ni se reintenta: un error
+        se propaga o llega a ``al_completar``.
+        """
+        usar_spool = self._spool is not None and not desde_spool
+        if usar_spool and self._spool.activo:
+            self._desviar(mensaje)
+            return None
+
+        with self._lock:
+            try:
+                productor = self._obtener_productor()
+            except Exception as e:
+                if not usar_spool:
+                    raise
+                self._desviar(mensaje, e)
+                return None
+            self._secuencia += 1
+            secuencia = self._secuencia
+            inicio = time.perf_counter()
+            self.metricas.registrar_envio()
+
+            def callback(resultado, id_mensaje):
+                ok = resultado == pulsar.Result.Ok
+                self.metricas.registrar_resultado(ok, (time.perf_counter() - inicio) * 1000)
+                if ok:
+                    if al_completar:
+                        al_completar(True, id_mensaje)
+                    return
+                if usar_spool:
+                    try:
+                        self._desviar(mensaje, resultado)
+                        return
+                    except Exception as e:
+                        logger.error(f"PUBLICADOR: No se pudo guardar en el spool: {e}")
+                elif desde_spool:
+                    # La entrada sigue en el spool: el próximo drenado la republica
+                    al_completar(False, resultado)
+                    return
+                elif intento < self._reintentos:
+                    self.metricas.registrar_reintento()
+                    logger.warning(
+                        f"PUBLICADOR: Error asíncrono en {self._topico} (secuencia {secuencia}, "
+                        f"intento {intento}/{self._reintentos}): {resultado}"
+                    )
+                    # Fuera del hilo del cliente: publicar puede bloquear si la cola está llena
+                    threading.Timer(
+                        0.2 * intento, self.publicar_async, args=(mensaje, al_completar, intento + 1)
+                    ).start()
+                    return
+                logger.error(f"PUBLICADOR: Mensaje descartado en {self._topico} tras {intento} intentos: {resultado}")
+                if al_completar:
+                    al_completar(False, resultado)
+
+            try:
+                productor.send_async(mensaje, callback, sequence_id=secuencia)
+            except Exception as e:
+                self.metricas.registrar_resultado(False, 0.0)
+                if not usar_spool:
+                    raise
+                self._desviar(mensaje, e)
+                return None
+            return secuencia
+
+    def flush(self) -> None:
+        """Envía los lotes abiertos y espera sus acks."""
+        with self._lock:
+            if self._productor is not None:
+                self._productor.flush()
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if self._productor is not None:
+                try:
+                    self._productor.flush()
+                    self._productor.close()
+                finally:
+                    self._productor = None
+        logger.info(f"PUBLICADOR: Productor '{self._nombre}' cerrado: {self.metricas.resumen()}")
+
+
+def obtener_publicador(topico: str, schema: type, servicio: str) -> PublicadorPulsar:
+    """Publicador compartido del proceso para ``(topico, schema)``."""
+    clave = (topico, schema)
+    publicador = _publicadores.get(clave)
+    if publicador is not None:
+        return publicador
+    # Fuera del lock del registro: obtener_spool también lo toma
+    spool = obtener_spool()
+    with _lock:
+        return _publicadores.setdefault(clave, PublicadorPulsar(topico, schema, servicio, spool=spool))
+
+
+def metricas_publicadores() -> Dict[str, dict]:
+    """Métricas por tópico de los publicadores del proceso."""
+    with _lock:
+        publicadores = list(_publicadores.items())
+    return {f"{topico}:{schema.__name__}": publicador.metricas.resumen()
+            for (topico, schema), publicador in publicadores}
+
+
+@atexit.register
+def cerrar_publicadores() -> None:
+    """Vacía los lotes pendientes antes de salir del proceso."""
+    with _lock:
+        publicadores = list(_publicadores.values())
+    for publicador in publicadores:
+        try:
+            publicador.cerrar()
+        except Exception as e:
+            logger.error(f"PUBLICADOR: Error cerrando productor de {publicador.topico}: {e}")
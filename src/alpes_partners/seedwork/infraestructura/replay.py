@@ -0,0 +1,229 @@
+"""
+Reproducción de tópicos para construir o reconstruir modelos de lectura.
+
+Una ``Proyeccion`` declara de qué tópicos se alimenta (schema y handlers
+por tipo de evento, como las suscripciones del runtime de consumidores) y
+cómo dejar durable su estado. El ``Reproductor`` lee cada tópico con un
+Reader (sin suscripción: no afecta a los consumidores) desde el inicio, un
+timestamp o el último checkpoint, decodifica en lotes y entrega cada lote,
+agrupado por tipo, a los handlers en modo masivo.
+
+Cada ``intervalo_checkpoint`` eventos pide a la proyección que confirme su
+estado y recién entonces guarda la posición: al reanudar se relee a lo
+sumo lo posterior al último checkpoint, así que los handlers deben ser
+idempotentes.
+"""
+
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from .utils import time_millis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FuenteReplay:
+    """Un tópico que alimenta la proyección y el handler masivo de cada tipo de evento."""
+    topico: str
+    schema: type
+    handlers: Dict[str, Callable[[List[Any]], None]]
+
+    def handler_para(self, tipo: Optional[str]) -> Optional[Callable]:
+        return self.handlers.get(tipo) or self.handlers.get('*')
+
+
+@dataclass
+class Proyeccion:
+    """Modelo de lectura reconstruible a partir de eventos."""
+    nombre: str
+    fuentes: List[FuenteReplay]
+    preparar: Optional[Callable[[bool], None]] = None   # recibe si se reanuda desde un checkpoint
+    confirmar: Optional[Callable[[], None]] = None      # deja durable lo aplicado antes de cada checkpoint
+    terminar: Optional[Callable[[int], None]] = None    # recibe el timestamp (ms) de inicio de la reproducción
+
+
+class RegistroProyecciones:
+    """Fábricas de proyecciones por nombre."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fabricas: Dict[str, Callable[..., Proyeccion]] = {}
+
+    def registrar(self, nombre: str):
+        """Decorador que registra la fábrica de la proyección ``nombre``."""
+        def decorador(fabrica):
+            with self._lock:
+                existente = self._fabricas.get(nombre)
+                if existente is not None and existente is not fabrica:
+                    raise ValueError(f"Proyección ya registrada: {nombre}")
+                self._fabricas[nombre] = fabrica
+            return fabrica
+        return decorador
+
+    def nombres(self) -> List[str]:
+        return sorted(self._fabricas)
+
+    def crear(self, nombre: str, **opciones) -> Proyeccion:
+        try:
+            fabrica = self._fabricas[nombre]
+        except KeyError:
+            raise KeyError(f"Proyección no registrada: {nombre}") from None
+        return fabrica(**opciones)
+
+
+# Registro global del proceso
+registro_proyecciones = RegistroProyecciones()
+registrar_proyeccion = registro_proyecciones.registrar
+
+
+class CheckpointsReplay:
+    """Última posición aplicada por proyección y tópico, en un JSON por proyección."""
+
+    def __init__(self, directorio: str):
+        self._directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, proyeccion: str) -> str:
+        return os.path.join(self._directorio, f"{proyeccion}.json")
+
+    def leer(self, proyeccion: str) -> Dict[str, dict]:
+        try:
+            with open(self._ruta(proyeccion), 'r', encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except FileNotFoundError:
+            return {}
+
+    def posicion(self, checkpoint: dict) -> Optional[bytes]:
+        return base64.b64decode(checkpoint['id']) if checkpoint.get('id') else None
+
+    def guardar(self, proyeccion: str, estado: Dict[str, dict]) -> None:
+        ruta = self._ruta(proyeccion)
+        with open(ruta + '.tmp', 'w', encoding='utf-8') as archivo:
+            json.dump(estado, archivo)
+        os.replace(ruta + '.tmp', ruta)
+
+    def borrar(self, proyeccion: str) -> None:
+        try:
+            os.remove(self._ruta(proyeccion))
+        except FileNotFoundError:
+            pass
+
+
+class Reproductor:
+    """Reproduce los tópicos de una proyección hasta alcanzar el final de cada uno."""
+
+    def __init__(self, cliente, checkpoints: CheckpointsReplay, tamano_lote: int = 10000,
+                 intervalo_checkpoint: int = 100000, schema_de: Optional[Callable] = None,
+                 posicion_lector: Optional[Callable] = None):
+        if schema_de is None or posicion_lector is None:
+            from .broker import posicion_lector as posicion_configurada
+            from .schema.registro import schema_de as schema_registrado
+            schema_de = schema_de or schema_registrado
+            posicion_lector = posicion_lector or posicion_configurada
+        self._cliente = cliente
+        self._checkpoints = checkpoints
+        self._tamano_lote = tamano_lote
+        self._intervalo_checkpoint = intervalo_checkpoint
+        self._schema_de = schema_de
+        self._posicion_lector = posicion_lector
+
+    def reproducir(self, proyeccion: Proyeccion, desde: Optional[int] = None,
+                   reiniciar: bool = False) -> Dict[str, int]:
+        """Aplica los eventos de cada fuente y retorna cuántos se aplicaron por tópico.
+
+        Sin checkpoint (o con ``reiniciar``) lee desde ``desde`` (timestamp en
+        ms) o desde el inicio del tópico; con checkpoint, desde la posición
+        guardada.
+        """
+        inicio = time_millis()
+        if reiniciar:
+            self._checkpoints.borrar(proyeccion.nombre)
+        estado = self._checkpoints.leer(proyeccion.nombre)
+        if proyeccion.preparar is not None:
+            proyeccion.preparar(bool(estado))
+
+        aplicados = {}
+        for fuente in proyeccion.fuentes:
+            aplicados[fuente.topico] = self._reproducir_fuente(proyeccion, fuente, estado, desde)
+
+        if proyeccion.terminar is not None:
+            proyeccion.terminar(inicio)
+        logger.info(f"REPLAY: {proyeccion.nombre} terminada - {sum(aplicados.values())} eventos")
+        return aplicados
+
+    def _crear_lector(self, fuente: FuenteReplay, checkpoint: Optional[dict], desde: Optional[int]):
+        posicion = self._checkpoints.posicion(checkpoint) if checkpoint else None
+        lector = self._cliente.create_reader(
+            fuente.topico, self._posicion_lector(posicion),
+            schema=self._schema_de(fuente.schema),
+            receiver_queue_size=self._tamano_lote
+        )
+        if posicion is None and desde is not None:
+            lector.seek(desde)
+        return lector
+
+    def _reproducir_fuente(self, proyeccion: Proyeccion, fuente: FuenteReplay,
+                           estado: Dict[str, dict], desde: Optional[int]) -> int:
+        checkpoint = estado.get(fuente.topico)
+        lector = self._crear_lector(fuente, checkpoint, desde)
+        total = checkpoint['eventos'] if checkpoint else 0
+        aplicados = sin_confirmar = 0
+        comienzo = time.monotonic()
+        origen = 'el checkpoint' if checkpoint else (desde if desde is not None else 'el inicio')
+        logger.info(f"REPLAY: {proyeccion.nombre} leyendo {fuente.topico} desde {origen}")
+        try:
+            while True:
+                lote = []
+                while len(lote) < self._tamano_lote and lector.has_message_available():
+                    lote.append(lector.read_next())
+                if not lote:
+                    break
+                self._aplicar(fuente, lote)
+                aplicados += len(lote)
+                sin_confirmar += len(lote)
+                ultimo = lote[-1]
+                if sin_confirmar >= self._intervalo_checkpoint:
+                    self._confirmar(proyeccion, fuente, estado, ultimo, total + aplicados)
+                    sin_confirmar = 0
+                    logger.info(f"REPLAY: {proyeccion.nombre} {fuente.topico}: {total + aplicados} eventos "
+                                f"({aplicados / max(time.monotonic() - comienzo, 1e-9):.0f}/s)")
+            if sin_confirmar:
+                self._confirmar(proyeccion, fuente, estado, ultimo, total + aplicados)
+        finally:
+            lector.close()
+        return aplicados
+
+    def _aplicar(self, fuente: FuenteReplay, lote: list) -> None:
+        """Decodifica el lote y entrega a cada handler todos los eventos de sus tipos."""
+        grupos: Dict[Callable, List[Any]] = defaultdict(list)
+        for mensaje in lote:
+            try:
+                evento = mensaje.value()
+            except Exception as e:
+                logger.error(f"REPLAY: Mensaje ilegible omitido en {fuente.topico}: {e}")
+                continue
+            handler = fuente.handler_para(getattr(evento, 'type', None))
+            if handler is not None:
+                grupos[handler].append(evento)
+        for handler, eventos in grupos.items():
+            handler(eventos)
+
+    def _confirmar(self, proyeccion: Proyeccion, fuente: FuenteReplay, estado: Dict[str, dict],
+                   mensaje, total: int) -> None:
+        # Primero el estado de la proyección y después la posición: un corte entre ambos solo relee
+        if proyeccion.confirmar is not None:
+            proyeccion.confirmar()
+        estado[fuente.topico] = {
+            'id': base64.b64encode(mensaje.message_id().serialize()).decode('ascii'),
+            'timestamp': mensaje.publish_timestamp(),
+            'eventos': total
+        }
+        self._checkpoints.guardar(proyeccion.nombre, estado)
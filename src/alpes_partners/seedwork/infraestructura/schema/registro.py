@@ -0,0 +1,83 @@
+"""
+Registro de schemas de los mensajes de integración.
+
+Cada clase ``Record`` se registra con su tipo de evento y su versión
+(``schema/v1``, ``schema/v2``, ...). El objeto ``AvroSchema`` de cada clase
+se construye una sola vez (la definición se obtiene por reflexión sobre la
+clase) y lo comparten todos los productores, consumidores y lectores del
+proceso.
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def _avro_schema(clase):
+    from pulsar.schema import AvroSchema
+    return AvroSchema(clase)
+
+
+class RegistroSchemas:
+    """Clases de mensajes por ``(tipo, version)`` y schemas construidos por clase."""
+
+    def __init__(self, constructor: Callable = _avro_schema):
+        self._constructor = constructor
+        self._lock = threading.Lock()
+        self._clases: Dict[Tuple[str, int], type] = {}
+        self._versiones: Dict[type, Tuple[str, int]] = {}
+        self._schemas: Dict[type, object] = {}
+
+    def registrar(self, tipo: str, version: int = 1):
+        """Decorador que registra la clase como versión ``version`` del mensaje ``tipo``."""
+        def decorador(clase):
+            with self._lock:
+                existente = self._clases.get((tipo, version))
+                if existente is not None and existente is not clase:
+                    raise ValueError(
+                        f"{tipo} v{version} ya está registrado con {existente.__module__}.{existente.__name__}"
+                    )
+                self._clases[(tipo, version)] = clase
+                self._versiones[clase] = (tipo, version)
+            return clase
+        return decorador
+
+    def versiones(self, tipo: str) -> List[int]:
+        """Versiones registradas de ``tipo``, de menor a mayor."""
+        return sorted(version for t, version in self._clases if t == tipo)
+
+    def clase(self, tipo: str, version: Optional[int] = None) -> type:
+        """Clase registrada para ``tipo``; sin versión, la más reciente."""
+        if version is None:
+            versiones = self.versiones(tipo)
+            if not versiones:
+                raise KeyError(f"Tipo de mensaje no registrado: {tipo}")
+            version = versiones[-1]
+        try:
+            return self._clases[(tipo, version)]
+        except KeyError:
+            raise KeyError(f"Tipo de mensaje no registrado: {tipo} v{version}") from None
+
+    def version_de(self, clase: type) -> Optional[Tuple[str, int]]:
+        """``(tipo, version)`` con que se registró la clase, o None."""
+        return self._versiones.get(clase)
+
+    def schema(self, clase: type):
+        """Schema de la clase, construido la primera vez y reutilizado después."""
+        schema = self._schemas.get(clase)
+        if schema is None:
+            with self._lock:
+                schema = self._schemas.get(clase)
+                if schema is None:
+                    schema = self._constructor(clase)
+                    self._schemas[clase] = schema
+        return schema
+
+
+# Registro global del proceso
+registro_schemas = RegistroSchemas()
+registrar_schema = registro_schemas.registrar
+
+
+def schema_de(clase: type):
+    """``AvroSchema`` compartido para ``clase``."""
+    return registro_schemas.schema(clase)
@@ -1,13 +1,16 @@
-import uuid
-
 from pulsar.schema import *
+from alpes_partners.seedwork.dominio.identificadores import nuevo_id
 from alpes_partners.seedwork.infraestructura.utils import time_millis
 
 class Mensaje(Record):
-    id = String(default=str(uuid.uuid4()))
+    id = String()
     time = Long()
-    ingestion = Long(default=time_millis())
+    ingestion = Long()
     specversion = String()
     type = String()
     datacontenttype = String()
     service_name = String()
+
+    def __init__(self, *args, id=None, ingestion=None, **kwargs):
+        # Id y marca de ingesta por mensaje (un default de campo se evaluaría una sola vez al importar)
+        super().__init__(*args, id=id or nuevo_id(), ingestion=ingestion or time_millis(), **kwargs)
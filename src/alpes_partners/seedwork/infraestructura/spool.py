@@ -0,0 +1,239 @@
+"""
+Spool en disco local para mensajes que no se pudieron publicar.
+
+Es un log de solo escritura al final, repartido en segmentos de tamaño fijo
+mapeados en memoria. Cada registro es ``longitud | crc32 | datos``; un
+registro con longitud cero (la zona aún no escrita del segmento) o con CRC
+inválido (escritura cortada por una caída) marca el final de lo escrito.
+
+Un cursor persistido indica hasta dónde se consumió. Los segmentos que
+quedan completamente detrás del cursor se borran.
+"""
+
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CABECERA = struct.Struct('<II')      # longitud de los datos, crc32 de los datos
+CURSOR = struct.Struct('<QQ')        # segmento, offset
+CAMPO = struct.Struct('<H')          # longitud de un campo de texto de la entrada
+
+Posicion = Tuple[int, int]
+
+
+def empaquetar_entrada(campos: List[str], datos: bytes) -> bytes:
+    """Serializa campos de texto cortos seguidos de los datos."""
+    partes = [bytes([len(campos)])]
+    for campo in campos:
+        codificado = campo.encode('utf-8')
+        partes.append(CAMPO.pack(len(codificado)))
+        partes.append(codificado)
+    partes.append(datos)
+    return b''.join(partes)
+
+
+def desempaquetar_entrada(entrada: bytes) -> Tuple[List[str], bytes]:
+    """Inversa de ``empaquetar_entrada``."""
+    vista = memoryview(entrada)
+    cantidad = vista[0]
+    offset = 1
+    campos = []
+    for _ in range(cantidad):
+        (longitud,) = CAMPO.unpack_from(vista, offset)
+        offset += CAMPO.size
+        campos.append(bytes(vista[offset:offset + longitud]).decode('utf-8'))
+        offset += longitud
+    return campos, bytes(vista[offset:])
+
+
+class SpoolSegmentos:
+    """Log en disco de registros binarios, en segmentos mapeados en memoria.
+
+    Lo usa un solo proceso a la vez (``abrir_spool`` toma un lock sobre el
+    directorio); dentro del proceso es seguro entre hilos.
+    """
+
+    def __init__(self, directorio: str, tamano_segmento: int = 16 * 1024 * 1024):
+        if tamano_segmento <= CABECERA.size:
+            raise ValueError("El tamaño de segmento no admite ningún registro")
+        self._directorio = directorio
+        self._tamano = tamano_segmento
+        self._lock = threading.Lock()
+        # Ranura tomada por ``abrir_spool`` (estable para el proceso mientras tenga el lock)
+        self.ranura: Optional[int] = None
+        os.makedirs(directorio, exist_ok=True)
+
+        segmentos = self._segmentos()
+        self._cursor = self._leer_cursor() or (segmentos[0] if segmentos else 0, 0)
+        self._escritura_segmento = segmentos[-1] if segmentos else self._cursor[0]
+        self._escritura = self._mapear(self._escritura_segmento)
+        self._escritura_offset = self._recuperar_final(self._escritura)
+        self._lectura: Optional[Tuple[int, mmap.mmap]] = None
+
+    @property
+    def directorio(self) -> str:
+        return self._directorio
+
+    # Archivos
+
+    def _ruta_segmento(self, indice: int) -> str:
+        return os.path.join(self._directorio, f"{indice:010d}.seg")
+
+    def _segmentos(self) -> List[int]:
+        return sorted(int(nombre[:-4]) for nombre in os.listdir(self._directorio) if nombre.endswith('.seg'))
+
+    def _mapear(self, indice: int) -> mmap.mmap:
+        with open(self._ruta_segmento(indice), 'a+b') as archivo:
+            tamano = os.fstat(archivo.fileno()).st_size
+            if tamano < self._tamano:
+                archivo.truncate(self._tamano)
+            # Un segmento escrito con un tamaño configurado mayor se mapea completo
+            return mmap.mmap(archivo.fileno(), max(tamano, self._tamano))
+
+    def _leer_cursor(self) -> Optional[Posicion]:
+        try:
+            with open(os.path.join(self._directorio, 'cursor'), 'rb') as archivo:
+                return CURSOR.unpack(archivo.read(CURSOR.size))
+        except (FileNotFoundError, struct.error):
+            return None
+
+    def _guardar_cursor(self) -> None:
+        ruta = os.path.join(self._directorio, 'cursor')
+        with open(ruta + '.tmp', 'wb') as archivo:
+            archivo.write(CURSOR.pack(*self._cursor))
+        os.replace(ruta + '.tmp', ruta)
+
+    # Registros
+
+    def _registro_en(self, mapa, offset: int) -> Optional[bytes]:
+        """Datos del registro en ``offset``, o None si ahí termina lo escrito."""
+        if offset + CABECERA.size > len(mapa):
+            return None
+        longitud, crc = CABECERA.unpack_from(mapa, offset)
+        inicio = offset + CABECERA.size
+        if longitud == 0 or inicio + longitud > len(mapa):
+            return None
+        datos = mapa[inicio:inicio + longitud]
+        if zlib.crc32(datos) != crc:
+            return None
+        return datos
+
+    def _recuperar_final(self, mapa) -> int:
+        """Offset tras el último registro válido; limpia una cola cortada por una caída."""
+        offset = 0
+        while (datos := self._registro_en(mapa, offset)) is not None:
+            offset += CABECERA.size + len(datos)
+        if offset + CABECERA.size <= len(mapa) and mapa[offset:offset + CABECERA.size] != bytes(CABECERA.size):
+            logger.warning(f"SPOOL: Registro incompleto descartado en {self._directorio} (offset {offset})")
+            mapa[offset:] = bytes(len(mapa) - offset)
+        return offset
+
+    def agregar(self, datos: bytes) -> None:
+        """Agrega un registro al final del log."""
+        tamano = CABECERA.size + len(datos)
+        if tamano > self._tamano:
+            raise ValueError(f"Registro de {len(datos)} bytes mayor que el segmento ({self._tamano} bytes)")
+        with self._lock:
+            if self._escritura_offset + tamano > len(self._escritura):
+                self._escritura.flush()
+                self._escritura.close()
+                self._escritura_segmento += 1
+                self._escritura = self._mapear(self._escritura_segmento)
+                self._escritura_offset = 0
+            offset = self._escritura_offset
+            # Primero los datos y al final la cabecera: un registro a medias no es legible
+            self._escritura[offset + CABECERA.size:offset + tamano] = datos
+            self._escritura[offset:offset + CABECERA.size] = CABECERA.pack(len(datos), zlib.crc32(datos))
+            self._escritura_offset += tamano
+
+    def _mapa_lectura(self, indice: int):
+        if indice == self._escritura_segmento:
+            return self._escritura
+        if self._lectura is None or self._lectura[0] != indice:
+            if self._lectura is not None:
+                self._lectura[1].close()
+            self._lectura = (indice, self._mapear(indice))
+        return self._lectura[1]
+
+    def leer(self, maximo: int = 100) -> List[Tuple[Posicion, bytes]]:
+        """Hasta ``maximo`` registros desde el cursor, cada uno con la posición que sigue a él."""
+        registros = []
+        with self._lock:
+            segmento, offset = self._cursor
+            while len(registros) < maximo:
+                if (segmento, offset) == (self._escritura_segmento, self._escritura_offset):
+                    break
+                datos = self._registro_en(self._mapa_lectura(segmento), offset)
+                if datos is None:
+                    if segmento >= self._escritura_segmento:
+                        break
+                    # Fin de un segmento cerrado: se sigue con el próximo
+                    segmento, offset = segmento + 1, 0
+                    continue
+                offset += CABECERA.size + len(datos)
+                registros.append(((segmento, offset), datos))
+        return registros
+
+    def confirmar(self, posicion: Posicion) -> None:
+        """Avanza el cursor hasta ``posicion`` y borra los segmentos ya consumidos."""
+        with self._lock:
+            anterior = self._cursor[0]
+            self._cursor = posicion
+            self._guardar_cursor()
+            for indice in range(anterior, posicion[0]):
+                if self._lectura is not None and self._lectura[0] == indice:
+                    self._lectura[1].close()
+                    self._lectura = None
+                try:
+                    os.remove(self._ruta_segmento(indice))
+                except FileNotFoundError:
+                    pass
+
+    @property
+    def vacio(self) -> bool:
+        """True si no quedan registros por leer."""
+        return not self.leer(1)
+
+    def sincronizar(self) -> None:
+        """Fuerza a disco las páginas escritas del segmento actual."""
+        with self._lock:
+            self._escritura.flush()
+
+    def cerrar(self) -> None:
+        with self._lock:
+            self._escritura.flush()
+            self._escritura.close()
+            if self._lectura is not None:
+                self._lectura[1].close()
+                self._lectura = None
+
+
+def abrir_spool(directorio_base: str, tamano_segmento: int, max_ranuras: int = 64) -> SpoolSegmentos:
+    """Abre el spool en la primera ranura del directorio que no use otro proceso.
+
+    Cada proceso (por ejemplo, cada worker del servidor) toma un lock
+    exclusivo sobre una ranura ``0``, ``1``, ...; al reiniciar retoma una
+    ranura libre, con lo que quedó pendiente en ella.
+    """
+    for ranura in range(max_ranuras):
+        directorio = os.path.join(directorio_base, str(ranura))
+        os.makedirs(directorio, exist_ok=True)
+        archivo_lock = open(os.path.join(directorio, 'lock'), 'a+b')
+        try:
+            fcntl.flock(archivo_lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            archivo_lock.close()
+            continue
+        spool = SpoolSegmentos(directorio, tamano_segmento)
+        # El lock se mantiene mientras viva el spool
+        spool._archivo_lock = archivo_lock
+        spool.ranura = ranura
+        return spool
+    raise RuntimeError(f"No hay ranuras de spool libres en {directorio_base}")
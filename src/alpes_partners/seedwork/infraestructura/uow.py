@@ -2,12 +2,18 @@ from abc import ABC, abstractmethod
 from enum import Enum
 
 from ..dominio.entidades import AgregacionRaiz
+from .contexto import en_contexto_trabajo, uow_contexto
 from pydispatch import dispatcher
 
 import pickle
 
 
 class Lock(Enum):
+    """Estrategia de bloqueo con la que el repositorio aplica un batch.
+
+    OPTIMISTA: UPDATE condicionado a la versión leída, sin bloquear filas.
+    PESIMISTA: SELECT ... FOR UPDATE antes de escribir.
+    """
     OPTIMISTA = 1
     PESIMISTA = 2
 
@@ -28,11 +34,19 @@ class UnidadTrabajo(ABC):
 
     def _obtener_eventos(self, batches=None):
         batches = self.batches if batches is None else batches
+        eventos = list()
+        vistos = set()
         for batch in batches:
             for arg in batch.args:
-                if isinstance(arg, AgregacionRaiz):
-                    return arg.eventos
-        return list()
+                # Un batch puede operar sobre un agregado o sobre una lista de agregados
+                agregados = arg if isinstance(arg, (list, tuple)) else [arg]
+                for agregado in agregados:
+                    if isinstance(agregado, AgregacionRaiz):
+                        for evento in agregado.eventos:
+                            if id(evento) not in vistos:
+                                vistos.add(id(evento))
+                                eventos.append(evento)
+        return eventos
 
     @abstractmethod
     def _limpiar_batches(self):
@@ -58,7 +72,7 @@ class UnidadTrabajo(ABC):
     def savepoint(self):
         raise NotImplementedError
 
-    def registrar_batch(self, operacion, *args, lock=Lock.PESIMISTA, **kwargs):
+    def registrar_batch(self, operacion, *args, lock=Lock.OPTIMISTA, **kwargs):
         batch = Batch(operacion, lock, *args, **kwargs)
         self.batches.append(batch)
         self._publicar_eventos_dominio(batch)
@@ -73,14 +87,22 @@ class UnidadTrabajo(ABC):
 
 def is_flask():
     try:
-        from flask import session
-        return True
+        from flask import has_app_context
+        return has_app_context()
     except Exception as e:
         return False
 
 # Funciones simplificadas sin pickle
 
 def unidad_de_trabajo() -> UnidadTrabajo:
+    # En un worker la unidad de trabajo vive en el contexto de trabajo del mensaje
+    if en_contexto_trabajo():
+        uow = uow_contexto.get()
+        if uow is None:
+            from ...config.uow import UnidadTrabajoSQLAlchemy
+            uow = UnidadTrabajoSQLAlchemy()
+            uow_contexto.set(uow)
+        return uow
     if is_flask():
         from flask import g
         if not hasattr(g, 'uow'):
@@ -91,7 +113,9 @@ def unidad_de_trabajo() -> UnidadTrabajo:
         raise Exception('No hay unidad de trabajo')
 
 def guardar_unidad_trabajo(uow: UnidadTrabajo):
-    if is_flask():
+    if en_contexto_trabajo():
+        uow_contexto.set(uow)
+    elif is_flask():
         from flask import g
         g.uow = uow
     else:
@@ -124,7 +148,7 @@ class UnidadTrabajoPuerto:
         return uow.savepoints()
 
     @staticmethod
-    def registrar_batch(operacion, *args, lock=Lock.PESIMISTA, **kwargs):
+    def registrar_batch(operacion, *args, lock=Lock.OPTIMISTA, **kwargs):
         uow = unidad_de_trabajo()
         uow.registrar_batch(operacion, *args, lock=lock, **kwargs)
         guardar_unidad_trabajo(uow)
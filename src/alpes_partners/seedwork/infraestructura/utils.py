@@ -1,5 +1,6 @@
 import time
 import os
+import unicodedata
 
 
 def time_millis():
@@ -8,3 +9,12 @@ def time_millis():
 
 def broker_host():
     return os.getenv('PULSAR_ADDRESS', default="localhost")
+
+
+def normalizar_texto(texto: str) -> str:
+    """Normaliza un texto para búsquedas: sin acentos, minúsculas y espacios simples."""
+    if not texto:
+        return ""
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    sin_acentos = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(sin_acentos.lower().split())
@@ -0,0 +1,157 @@
+import pytest
+from src.alpes_partners.modulos.campanas.infraestructura.emparejamiento import (
+    MotorEmparejamiento, PerfilInfluencerEmparejamiento, PerfilCampanaEmparejamiento
+)
+from src.alpes_partners.modulos.campanas.infraestructura.agregador import AgregadorMetricas
+from src.alpes_partners.modulos.campanas.dominio.objetos_valor import IncrementoMetricas, MetricasCampana, TipoComision
+from src.alpes_partners.modulos.campanas.dominio.entidades import Campana
+from datetime import datetime
+
+
+def _influencer(id, categorias=(), paises=(), tipo=None, seguidores=0, engagement=0.0):
+    return PerfilInfluencerEmparejamiento.crear(
+        id=id, categorias=list(categorias), paises=list(paises),
+        tipo=tipo, seguidores=seguidores, engagement=engagement
+    )
+
+
+class TestMotorEmparejamiento:
+    """Tests para el motor de emparejamiento campana–influencer."""
+
+    @pytest.fixture
+    def motor(self):
+        motor = MotorEmparejamiento()
+        motor.reconstruir(
+            influencers=[
+                _influencer('i1', ['Moda', 'lifestyle'], ['CO'], 'micro', 50000, 4.0),
+                _influencer('i2', ['tecnologia'], ['MX'], 'macro', 500000, 2.0),
+                _influencer('i3', ['moda'], ['MX'], 'nano', 5000, 8.0),
+            ],
+            campanas=[
+                PerfilCampanaEmparejamiento.desde_criterios(
+                    'c-moda', tipos_permitidos=['influencer'], categorias_requeridas=['moda']
+                ),
+                PerfilCampanaEmparejamiento.desde_criterios(
+                    'c-mx-grandes', tipos_permitidos=['macro', 'mega'], paises_permitidos=['mx'],
+                    metricas_minimas={'seguidores': 100000}
+                ),
+                PerfilCampanaEmparejamiento.desde_criterios('c-abierta'),
+                PerfilCampanaEmparejamiento.desde_criterios('c-empresas', tipos_permitidos=['empresa']),
+            ]
+        )
+        return motor
+
+    def test_campanas_para_influencer(self, motor):
+        """Test que se aplican categoría (cualquiera), país, tier y métricas mínimas."""
+        assert motor.campanas_para_influencer('i1') == ['c-abierta', 'c-moda']
+        assert motor.campanas_para_influencer('i2') == ['c-abierta', 'c-mx-grandes']
+        assert motor.campanas_para_influencer('i3') == ['c-abierta', 'c-moda']
+        assert motor.campanas_para_influencer('desconocido') is None
+
+    def test_influencers_para_campana_paginado(self, motor):
+        """Test que la búsqueda inversa pagina con cursor."""
+        pagina, cursor = motor.influencers_para_campana('c-moda', limite=1)
+        assert pagina == ['i1']
+        pagina, cursor = motor.influencers_para_campana('c-moda', limite=1, cursor=cursor)
+        assert pagina == ['i3']
+        assert motor.influencers_para_campana('c-moda', limite=5, cursor=cursor + 1) == ([], None)
+        assert motor.influencers_para_campana('c-empresas') is None
+
+    def test_actualizaciones_incrementales(self, motor):
+        """Test que actualizar un influencer o campana reindexa sin reconstruir."""
+        motor.actualizar_influencer(_influencer('i2', ['moda'], ['MX'], 'macro', 500000, 2.0))
+        assert 'c-moda' in motor.campanas_para_influencer('i2')
+        motor.registrar_influencer(_influencer('i2', ['deportes']))
+        assert 'c-moda' in motor.campanas_para_influencer('i2')
+
+        motor.eliminar_campana('c-moda')
+        assert motor.campanas_para_influencer('i1') == ['c-abierta']
+        assert motor.influencers_para_campana('c-moda') is None
+
+
+class TestAgregadorMetricas:
+    """Tests para la agregación en memoria de eventos de tracking."""
+
+    def test_acumula_por_campana_y_confirma_tras_persistir(self):
+        """Test que los eventos se suman por campana y se confirman después del flush."""
+        persistidos = []
+        confirmados = []
+        agregador = AgregadorMetricas(persistidos.extend, num_shards=4)
+
+        for _ in range(3):
+            agregador.registrar(IncrementoMetricas('c1', clics=1, inversion=0.5), confirmar=lambda: confirmados.append(1))
+        agregador.registrar(IncrementoMetricas('c2', conversiones=1, ingresos=20.0))
+        assert confirmados == []
+
+        assert agregador.flush() == 2
+        por_campana = {incremento.campana_id: incremento for incremento in persistidos}
+        assert por_campana['c1'] == IncrementoMetricas('c1', clics=3, inversion=1.5)
+        assert por_campana['c2'] == IncrementoMetricas('c2', conversiones=1, ingresos=20.0)
+        assert len(confirmados) == 3
+        assert agregador.pendientes() == 0
+
+    def test_reincorpora_deltas_si_falla_la_persistencia(self):
+        """Test que un flush fallido no pierde deltas ni confirma eventos."""
+        intentos = []
+        confirmados = []
+
+        def persistir(incrementos):
+            intentos.append(incrementos)
+            if len(intentos) == 1:
+                raise RuntimeError("base de datos no disponible")
+
+        agregador = AgregadorMetricas(persistir)
+        agregador.registrar(IncrementoMetricas('c1', clics=2), confirmar=lambda: confirmados.append(1))
+        with pytest.raises(RuntimeError):
+            agregador.flush()
+        assert confirmados == []
+
+        agregador.registrar(IncrementoMetricas('c1', clics=1))
+        agregador.flush()
+        assert intentos[-1] == [IncrementoMetricas('c1', clics=3)]
+        assert confirmados == [1]
+
+    def test_metricas_aplican_incremento(self):
+        """Test que ROI y tasa de conversión se calculan sobre las métricas incrementadas."""
+        metricas = MetricasCampana().aplicar_incremento(
+            IncrementoMetricas('c1', clics=200, conversiones=10, inversion=100.0, ingresos=150.0)
+        )
+        assert metricas.calcular_tasa_conversion() == 5.0
+        assert metricas.calcular_roi() == 50.0
+
+
+class TestAfiliadosCampana:
+    """Tests para el registro de cambios de afiliados en la entidad Campana."""
+
+    def _campana(self):
+        return Campana.crear(
+            nombre="Campana Test",
+            descripcion="Descripcion",
+            tipo_comision=TipoComision.CPA,
+            valor_comision=10.0,
+            moneda="USD",
+            fecha_inicio=datetime(2024, 1, 1)
+        )
+
+    def test_registra_solo_los_cambios_netos(self):
+        """Test que asignar y retirar el mismo afiliado deja solo la última operación."""
+        campana = self._campana()
+        campana.asignar_afiliados(['a', 'b', 'c'])
+        campana.retirar_afiliados(['b', 'z'])
+
+        por_asignar, por_retirar = campana.cambios_afiliados()
+        assert por_asignar == {'a', 'c'}
+        assert por_retirar == {'b', 'z'}
+
+    def test_confirmar_cambios_actualiza_total(self):
+        """Test que al confirmar se limpian los cambios y se actualiza el contador."""
+        campana = self._campana()
+        campana.asignar_afiliados(['a', 'b'])
+        campana.confirmar_cambios_afiliados(2)
+
+        assert campana.cambios_afiliados() == (set(), set())
+        assert campana.metricas.afiliados_asignados == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,5 +1,6 @@
 import pytest
 from datetime import datetime
+from types import SimpleNamespace
 from src.alpes_partners.modulos.influencers.dominio.entidades import Influencer
 from src.alpes_partners.modulos.influencers.dominio.objetos_valor import EstadoInfluencer, CategoriaInfluencer
 from src.alpes_partners.seedwork.dominio.objetos_valor import Email, Telefono
@@ -130,7 +131,51 @@ class TestInfluencer:
         )
         
         assert influencer.obtener_tipo_principal() is None
-
+    
+    def test_registro_por_comando_publica_resumen_de_audiencia(self, monkeypatch):
+        """Test que el handler de RegistrarInfluencer lleva la audiencia del comando al evento de registro."""
+        for dependencia in ('pydantic', 'email_validator', 'sqlalchemy', 'pydispatch'):
+            pytest.importorskip(dependencia)
+        from src.alpes_partners.modulos.influencers.aplicacion.comandos import registrar_influencer
+        
+        registrados = []
+        repositorio = SimpleNamespace(existe_email=lambda email: False, agregar=lambda influencer: None)
+        monkeypatch.setattr(registrar_influencer, 'UnidadTrabajoPuerto', SimpleNamespace(
+            registrar_batch=lambda operacion, influencer: registrados.append(influencer),
+            savepoint=lambda: None,
+            commit=lambda: None
+        ))
+        handler = registrar_influencer.RegistrarInfluencerHandler()
+        handler._fabrica_repositorio = SimpleNamespace(crear_objeto=lambda *args: repositorio)
+        
+        ahora = datetime.utcnow().isoformat()
+        comando = registrar_influencer.RegistrarInfluencer(
+            fecha_creacion=ahora,
+            fecha_actualizacion=ahora,
+            id="6f1c1b9e-3c55-4a8e-9a57-0d2f1f0c8e11",
+            nombre="Test Influencer",
+            email="test@example.com",
+            categorias=["tecnologia"],
+            descripcion="Test description",
+            audiencia=[
+                {"plataforma": "instagram", "seguidores": 50000, "engagement_rate": 4.0},
+                {"plataforma": "tiktok", "seguidores": 150000, "engagement_rate": 6.0}
+            ],
+            demografia={
+                "distribucion_genero": {"femenino": 100.0},
+                "distribucion_edad": {"18-24": 100.0},
+                "paises_principales": ["CO", "MX"]
+            }
+        )
+        handler.handle(comando)
+        
+        evento = registrados[0].eventos[-1]
+        assert evento.influencer_id == comando.id
+        assert evento.plataformas == ["instagram", "tiktok"]
+        assert evento.total_seguidores == 200000
+        assert evento.tipo_principal == "macro"
+        assert evento.paises_principales == ["CO", "MX"]
+        assert evento.engagement_promedio == 5.0
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,748 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from src.alpes_partners.seedwork.aplicacion.comandos import reintentar_en_conflicto
+from src.alpes_partners.seedwork.dominio.excepciones import ExcepcionConcurrencia
+from src.alpes_partners.seedwork.dominio.identificadores import uuid7, nuevo_id, timestamp_ms
+from src.alpes_partners.seedwork.infraestructura.utils import normalizar_texto
+from src.alpes_partners.seedwork.infraestructura.indices import IndicePrefijos
+from src.alpes_partners.seedwork.infraestructura.cache import CacheTTL
+from src.alpes_partners.seedwork.infraestructura.bloom import FiltroBloom
+from src.alpes_partners.seedwork.infraestructura.schema.registro import RegistroSchemas
+from src.alpes_partners.seedwork.infraestructura.broker_memoria import (
+    BrokerMemoria, IdMensajeMemoria, PoliticaLoteMemoria, TimeoutMemoria
+)
+from src.alpes_partners.seedwork.infraestructura.consumidores import RuntimeConsumidores, Suscripcion
+from src.alpes_partners.seedwork.infraestructura.contexto import (
+    contexto_trabajo, en_contexto_trabajo, sesion_contexto, uow_contexto
+)
+from src.alpes_partners.seedwork.infraestructura.replay import (
+    CheckpointsReplay, FuenteReplay, Proyeccion, Reproductor
+)
+from src.alpes_partners.seedwork.infraestructura.spool import (
+    SpoolSegmentos, abrir_spool, empaquetar_entrada, desempaquetar_entrada
+)
+
+
+class TestReintentarEnConflicto:
+    """Tests para el helper de reintentos ante conflictos de versión."""
+
+    def test_reintenta_hasta_tener_exito(self):
+        """Test que el handler se reejecuta tras un conflicto."""
+        intentos = []
+
+        @reintentar_en_conflicto(max_intentos=3, espera_base=0)
+        def handler():
+            intentos.append(1)
+            if len(intentos) < 3:
+                raise ExcepcionConcurrencia("versión obsoleta")
+            return "ok"
+
+        assert handler() == "ok"
+        assert len(intentos) == 3
+
+    def test_propaga_conflicto_al_agotar_intentos(self):
+        """Test que el último conflicto se propaga al llamador."""
+        @reintentar_en_conflicto(max_intentos=2, espera_base=0)
+        def handler():
+            raise ExcepcionConcurrencia("versión obsoleta")
+
+        with pytest.raises(ExcepcionConcurrencia):
+            handler()
+
+    def test_no_reintenta_otros_errores(self):
+        """Test que errores distintos a concurrencia no se reintentan."""
+        intentos = []
+
+        @reintentar_en_conflicto(max_intentos=3, espera_base=0)
+        def handler():
+            intentos.append(1)
+            raise ValueError("datos inválidos")
+
+        with pytest.raises(ValueError):
+            handler()
+        assert len(intentos) == 1
+
+
+class TestUUID7:
+    """Tests para la generación de identificadores ordenados por tiempo."""
+
+    def test_version_y_variante(self):
+        """Test que el id cumple el formato UUIDv7."""
+        identificador = uuid7()
+        assert identificador.version == 7
+        assert identificador.variant == uuid.RFC_4122
+
+    def test_ids_monotonos(self):
+        """Test que ids generados en secuencia quedan ordenados."""
+        ids = [uuid7() for _ in range(5000)]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+
+    def test_timestamp_embebido(self):
+        """Test que el timestamp del id corresponde al momento de creación."""
+        antes = time.time_ns() // 1_000_000
+        identificador = nuevo_id()
+        despues = time.time_ns() // 1_000_000
+        assert antes <= timestamp_ms(identificador) <= despues + 1
+
+
+class TestNormalizarTexto:
+    """Tests para la normalización de nombres usada en búsquedas."""
+
+    def test_quita_acentos_y_mayusculas(self):
+        """Test que la búsqueda no distingue acentos ni mayúsculas."""
+        assert normalizar_texto("José Ñúñez") == "jose nunez"
+
+    def test_colapsa_espacios(self):
+        """Test que los espacios extra no afectan la búsqueda."""
+        assert normalizar_texto("  Ana   María ") == "ana maria"
+
+    def test_texto_vacio(self):
+        """Test que un texto vacío o nulo se normaliza a cadena vacía."""
+        assert normalizar_texto("") == ""
+        assert normalizar_texto(None) == ""
+
+
+class TestIndicePrefijos:
+    """Tests para el índice de prefijos del autocompletado."""
+
+    def _indice(self):
+        indice = IndicePrefijos()
+        indice.cargar([
+            ('influencer', '1', 'Ana María López'),
+            ('influencer', '2', 'Andrés Pérez'),
+            ('campana', '3', 'Campana de Ana'),
+        ])
+        return indice
+
+    def test_busca_por_prefijo_de_cualquier_palabra(self):
+        """Test que el prefijo coincide al inicio de cualquier palabra, sin acentos."""
+        ids = {r['id'] for r in self._indice().buscar('lop')}
+        assert ids == {'1'}
+        ids = {r['id'] for r in self._indice().buscar('AN')}
+        assert ids == {'1', '2', '3'}
+
+    def test_filtra_por_tipo_y_limite(self):
+        """Test que se respetan el tipo y el límite."""
+        indice = self._indice()
+        assert [r['id'] for r in indice.buscar('an', tipo='campana')] == ['3']
+        assert len(indice.buscar('an', limite=1)) == 1
+
+    def test_agregar_es_idempotente_y_reemplaza(self):
+        """Test que reindexar un documento reemplaza sus términos anteriores."""
+        indice = self._indice()
+        indice.agregar('influencer', '2', 'Beatriz Pérez')
+        indice.agregar('influencer', '2', 'Beatriz Pérez')
+        assert [r['id'] for r in indice.buscar('beat')] == ['2']
+        assert '2' not in {r['id'] for r in indice.buscar('andres')}
+        assert len(indice) == 3
+
+    def test_snapshot(self, tmp_path):
+        """Test que el snapshot restaura los documentos y su timestamp."""
+        ruta = str(tmp_path / 'sugerencias.json.gz')
+        self._indice().guardar_snapshot(ruta, timestamp=1234)
+        restaurado = IndicePrefijos()
+        assert restaurado.cargar_snapshot(ruta) == 1234
+        assert {r['id'] for r in restaurado.buscar('an')} == {'1', '2', '3'}
+
+    def test_escribir_snapshot_sin_indice(self, tmp_path):
+        """Test que un snapshot escrito desde documentos se carga igual que uno guardado por el índice."""
+        ruta = str(tmp_path / 'sugerencias.json.gz')
+        IndicePrefijos.escribir_snapshot(ruta, [('influencer', '7', 'Beatriz Pérez')], timestamp=99)
+        assert IndicePrefijos.leer_snapshot(ruta) == (99, [('influencer', '7', 'Beatriz Pérez')])
+        restaurado = IndicePrefijos()
+        assert restaurado.cargar_snapshot(ruta) == 99
+        assert [r['id'] for r in restaurado.buscar('beat')] == ['7']
+
+
+class TestCacheTTL:
+    """Tests para el cache con expiración."""
+
+    def test_expira_tras_ttl(self):
+        """Test que un valor vencido ya no se retorna."""
+        cache = CacheTTL(ttl_segundos=0.01)
+        cache.guardar('clave', 1)
+        assert cache.obtener('clave') == 1
+        time.sleep(0.02)
+        assert cache.obtener('clave') is None
+
+    def test_obtener_o_calcular_reutiliza_valor(self):
+        """Test que el cálculo solo se ejecuta una vez mientras el valor esté vigente."""
+        cache = CacheTTL(ttl_segundos=60)
+        llamadas = []
+        calcular = lambda: llamadas.append(1) or {'total': len(llamadas)}
+        assert cache.obtener_o_calcular('clave', calcular) == {'total': 1}
+        assert cache.obtener_o_calcular('clave', calcular) == {'total': 1}
+        cache.invalidar()
+        assert cache.obtener_o_calcular('clave', calcular) == {'total': 2}
+
+    def test_descarta_calculo_anterior_a_invalidacion(self):
+        """Test que un cálculo iniciado antes de invalidar no se guarda."""
+        cache = CacheTTL(ttl_segundos=60)
+
+        def calcular():
+            cache.invalidar()
+            return 'obsoleto'
+
+        assert cache.obtener_o_calcular('clave', calcular) == 'obsoleto'
+        assert cache.obtener('clave') is None
+
+
+class TestFiltroBloom:
+    """Tests para el filtro de Bloom del registro de idempotencia."""
+
+    def test_sin_falsos_negativos(self):
+        """Test que todo elemento agregado se reporta como presente."""
+        filtro = FiltroBloom(capacidad=1000)
+        ids = [str(uuid.uuid4()) for _ in range(1000)]
+        for mensaje_id in ids:
+            filtro.agregar(mensaje_id)
+        assert all(mensaje_id in filtro for mensaje_id in ids)
+
+    def test_tasa_de_falsos_positivos_acotada(self):
+        """Test que a capacidad nominal los falsos positivos rondan la tasa configurada."""
+        filtro = FiltroBloom(capacidad=5000, tasa_error=0.01)
+        for _ in range(5000):
+            filtro.agregar(str(uuid.uuid4()))
+        falsos_positivos = sum(1 for _ in range(10000) if str(uuid.uuid4()) in filtro)
+        assert falsos_positivos < 300
+
+    def test_limpiar(self):
+        """Test que limpiar olvida los elementos."""
+        filtro = FiltroBloom(capacidad=10)
+        filtro.agregar('evento-1')
+        filtro.limpiar()
+        assert 'evento-1' not in filtro
+        assert len(filtro) == 0
+
+
+class TestRegistroSchemas:
+    """Tests para el registro de schemas por tipo y versión."""
+
+    def _registro(self):
+        construidos = []
+        registro = RegistroSchemas(constructor=lambda clase: construidos.append(clase) or f"schema-{clase.__name__}")
+        return registro, construidos
+
+    def test_schema_se_construye_una_vez(self):
+        """Test que el schema de una clase se reutiliza."""
+        registro, construidos = self._registro()
+
+        class EventoV1:
+            pass
+
+        assert registro.schema(EventoV1) == "schema-EventoV1"
+        assert registro.schema(EventoV1) == "schema-EventoV1"
+        assert construidos == [EventoV1]
+
+    def test_versiones_por_tipo(self):
+        """Test que sin versión se obtiene la más reciente."""
+        registro, _ = self._registro()
+
+        @registro.registrar('CampanaCreada', version=1)
+        class EventoV1:
+            pass
+
+        @registro.registrar('CampanaCreada', version=2)
+        class EventoV2:
+            pass
+
+        assert registro.versiones('CampanaCreada') == [1, 2]
+        assert registro.clase('CampanaCreada') is EventoV2
+        assert registro.clase('CampanaCreada', 1) is EventoV1
+        assert registro.version_de(EventoV1) == ('CampanaCreada', 1)
+        with pytest.raises(KeyError):
+            registro.clase('CampanaCreada', 3)
+
+    def test_rechaza_version_duplicada(self):
+        """Test que no se puede registrar otra clase con el mismo tipo y versión."""
+        registro, _ = self._registro()
+        registro.registrar('Tracking')(type('EventoA', (), {}))
+        with pytest.raises(ValueError):
+            registro.registrar('Tracking')(type('EventoB', (), {}))
+
+
+class TestSpoolSegmentos:
+    """Tests para el spool en disco de mensajes pendientes."""
+
+    def test_lee_en_orden_y_confirma(self, tmp_path):
+        """Test que los registros se leen en orden y el cursor avanza al confirmar."""
+        spool = SpoolSegmentos(str(tmp_path), tamano_segmento=1024)
+        for i in range(3):
+            spool.agregar(f"mensaje-{i}".encode())
+        registros = spool.leer(2)
+        assert [datos for _, datos in registros] == [b"mensaje-0", b"mensaje-1"]
+        spool.confirmar(registros[-1][0])
+        assert [datos for _, datos in spool.leer()] == [b"mensaje-2"]
+        assert not spool.vacio
+
+    def test_rota_segmentos_y_borra_consumidos(self, tmp_path):
+        """Test que se abren segmentos nuevos y se borran los ya consumidos."""
+        spool = SpoolSegmentos(str(tmp_path), tamano_segmento=64)
+        for i in range(10):
+            spool.agregar(bytes([i]) * 20)
+        registros = spool.leer(100)
+        assert [datos[0] for _, datos in registros] == list(range(10))
+        assert len(list(tmp_path.glob('*.seg'))) == 5
+        spool.confirmar(registros[-1][0])
+        assert spool.vacio
+        assert len(list(tmp_path.glob('*.seg'))) == 1
+
+    def test_retoma_tras_reabrir(self, tmp_path):
+        """Test que el cursor y lo pendiente sobreviven a un reinicio."""
+        spool = SpoolSegmentos(str(tmp_path), tamano_segmento=1024)
+        spool.agregar(b"uno")
+        spool.agregar(b"dos")
+        spool.confirmar(spool.leer(1)[0][0])
+        spool.cerrar()
+
+        reabierto = SpoolSegmentos(str(tmp_path), tamano_segmento=1024)
+        assert [datos for _, datos in reabierto.leer()] == [b"dos"]
+        reabierto.agregar(b"tres")
+        assert [datos for _, datos in reabierto.leer()] == [b"dos", b"tres"]
+
+    def test_descarta_registro_incompleto(self, tmp_path):
+        """Test que una cola cortada por una caída se ignora y se sobrescribe."""
+        spool = SpoolSegmentos(str(tmp_path), tamano_segmento=1024)
+        spool.agregar(b"completo")
+        spool.cerrar()
+        segmento = next(tmp_path.glob('*.seg'))
+        with open(segmento, 'r+b') as archivo:
+            archivo.seek(8 + len(b"completo"))
+            archivo.write(b"\x09\x00\x00\x00\xff\xff\xff\xffbasura")
+
+        reabierto = SpoolSegmentos(str(tmp_path), tamano_segmento=1024)
+        reabierto.agregar(b"nuevo")
+        assert [datos for _, datos in reabierto.leer()] == [b"completo", b"nuevo"]
+
+    def test_empaquetar_entrada(self):
+        """Test que los campos y los datos de una entrada se recuperan."""
+        entrada = empaquetar_entrada(["eventos-campanas", "CampanaCreada", "1"], b"\x00avro")
+        assert desempaquetar_entrada(entrada) == (["eventos-campanas", "CampanaCreada", "1"], b"\x00avro")
+
+    def test_cada_proceso_toma_su_ranura(self, tmp_path):
+        """Test que dos spools abiertos a la vez toman ranuras distintas (identifican al productor)."""
+        primero = abrir_spool(str(tmp_path), 1024)
+        segundo = abrir_spool(str(tmp_path), 1024)
+        assert (primero.ranura, segundo.ranura) == (0, 1)
+
+
+class TestBrokerMemoria:
+    """Tests para el broker en memoria."""
+
+    def _recibir_todos(self, consumidor):
+        mensajes = []
+        while True:
+            try:
+                mensajes.append(consumidor.receive(timeout_millis=10))
+            except TimeoutMemoria:
+                return mensajes
+
+    def test_suscripcion_compartida_reparte_mensajes(self):
+        """Test que en una suscripción Shared cada mensaje llega a un solo consumidor."""
+        cliente = BrokerMemoria().cliente()
+        productor = cliente.create_producer('eventos')
+        uno = cliente.subscribe('eventos', 'sub', consumer_type='Shared')
+        dos = cliente.subscribe('eventos', 'sub', consumer_type='Shared')
+        for i in range(4):
+            productor.send(i)
+
+        assert uno.receive(timeout_millis=10).value() == 0
+        assert dos.receive(timeout_millis=10).value() == 1
+        recibidos = self._recibir_todos(uno) + self._recibir_todos(dos)
+        assert sorted(m.value() for m in recibidos) == [2, 3]
+
+    def test_key_shared_mantiene_clave_en_un_consumidor(self):
+        """Test que los mensajes de una misma clave van siempre al mismo consumidor."""
+        cliente = BrokerMemoria().cliente()
+        productor = cliente.create_producer('eventos')
+        consumidores = [cliente.subscribe('eventos', 'sub', consumer_type='KeyShared') for _ in range(3)]
+        for i in range(30):
+            productor.send(i, partition_key=f"campana-{i % 5}")
+
+        for consumidor in consumidores:
+            mensajes = self._recibir_todos(consumidor)
+            for clave in {m.partition_key() for m in mensajes}:
+                valores = [m.value() for m in mensajes if m.partition_key() == clave]
+                assert len(valores) == 6 and valores == sorted(valores)
+
+    def test_nack_y_cierre_reentregan(self):
+        """Test que un nack o un consumidor cerrado sin ack provocan la reentrega."""
+        cliente = BrokerMemoria().cliente()
+        productor = cliente.create_producer('eventos')
+        consumidor = cliente.subscribe('eventos', 'sub', consumer_type='Shared', negative_ack_redelivery_delay_ms=0)
+        productor.send('a')
+        productor.send('b')
+
+        a = consumidor.receive(timeout_millis=10)
+        consumidor.negative_acknowledge(a)
+        reentregado = consumidor.receive(timeout_millis=10)
+        assert reentregado.value() == 'a' and reentregado.redelivery_count() == 1
+        consumidor.acknowledge(reentregado)
+
+        assert consumidor.receive(timeout_millis=10).value() == 'b'
+        consumidor.close()
+        otro = cliente.subscribe('eventos', 'sub', consumer_type='Shared')
+        assert [m.value() for m in self._recibir_todos(otro)] == ['b']
+
+    def test_deduplica_por_secuencia_del_productor(self):
+        """Test que un reenvío con el mismo sequence id no se publica dos veces."""
+        broker = BrokerMemoria()
+        cliente = broker.cliente()
+        consumidor = cliente.subscribe('eventos', 'sub', consumer_type='Shared',
+                                       batch_receive_policy=PoliticaLoteMemoria(10, 10))
+        productor = cliente.create_producer('eventos', producer_name='api-1')
+        productor.send('x', sequence_id=0)
+        productor.send('x', sequence_id=0)
+        productor.send('y', sequence_id=1)
+
+        assert [m.value() for m in consumidor.batch_receive()] == ['x', 'y']
+        assert broker.cliente().create_producer('eventos', producer_name='api-1').last_sequence_id() == 1
+
+    def test_lector_desde_timestamp(self):
+        """Test que un lector reproduce el tópico desde un timestamp."""
+        cliente = BrokerMemoria().cliente()
+        productor = cliente.create_producer('eventos')
+        productor.send('viejo')
+        time.sleep(0.01)
+        corte = int(time.time() * 1000)
+        productor.send('nuevo')
+
+        lector = cliente.create_reader('eventos', 'earliest')
+        lector.seek(corte)
+        assert lector.read_next(timeout_millis=10).value() == 'nuevo'
+        with pytest.raises(TimeoutMemoria):
+            lector.read_next(timeout_millis=10)
+
+
+class TestRuntimeConsumidores:
+    """Tests para el runtime de consumidores sobre el broker en memoria."""
+
+    def _runtime(self, broker):
+        return RuntimeConsumidores(
+            crear_cliente=broker.cliente,
+            crear_politica=lambda maximo, espera_ms: PoliticaLoteMemoria(maximo, espera_ms),
+            schema_de=lambda clase: None
+        )
+
+    def _esperar(self, condicion, timeout=2.0):
+        limite = time.monotonic() + timeout
+        while not condicion() and time.monotonic() < limite:
+            time.sleep(0.01)
+        return condicion()
+
+    def test_despacha_por_tipo_y_confirma(self):
+        """Test que cada tipo va a su handler y los tipos sin handler se confirman sin procesar."""
+        broker = BrokerMemoria()
+        creados, pagados = [], []
+        runtime = self._runtime(broker).registrar(Suscripcion(
+            nombre='sub', topico='eventos', schema=object, espera_lote_ms=10,
+            handlers={
+                'Creado': lambda entregas: creados.extend(e.evento.id for e in entregas),
+                'Pagado': lambda entregas: pagados.extend(e.evento.id for e in entregas)
+            }
+        )).iniciar()
+        productor = broker.cliente().create_producer('eventos')
+        for i, tipo in enumerate(['Creado', 'Pagado', 'Otro', 'Creado']):
+            productor.send(SimpleNamespace(id=i, type=tipo))
+
+        assert self._esperar(lambda: len(creados) + len(pagados) == 3)
+        runtime.detener()
+        assert creados == [0, 3] and pagados == [1]
+        sin_pendientes = broker.cliente().subscribe('eventos', 'sub', consumer_type='Shared',
+                                                    batch_receive_policy=PoliticaLoteMemoria(10, 10))
+        assert sin_pendientes.batch_receive() == []
+
+    def test_max_reentregas_pasa_politica_dead_letter(self):
+        """Test que una suscripción con máximo de reentregas se suscribe con política de dead letter."""
+        recibido = {}
+        runtime = RuntimeConsumidores(
+            crear_cliente=lambda: None,
+            crear_politica=lambda maximo, espera_ms: None,
+            schema_de=lambda clase: None,
+            crear_politica_dlq=lambda maximo, topico: (maximo, topico)
+        )
+        runtime._cliente = SimpleNamespace(subscribe=lambda topico, **kwargs: recibido.update(kwargs))
+
+        runtime._suscribir(Suscripcion(nombre='sub', topico='eventos', schema=object, handlers={}, max_reentregas=5))
+        assert recibido['dead_letter_policy'] == (5, None)
+
+        recibido.clear()
+        runtime._suscribir(Suscripcion(nombre='sub', topico='eventos', schema=object, handlers={}))
+        assert 'dead_letter_policy' not in recibido
+
+    def test_error_en_handler_reentrega(self):
+        """Test que si el handler falla el lote se rechaza y el broker lo reentrega."""
+        broker = BrokerMemoria()
+        intentos = []
+
+        def handler(entregas):
+            intentos.append([e.evento.id for e in entregas])
+            if len(intentos) == 1:
+                raise RuntimeError("falla transitoria")
+
+        runtime = self._runtime(broker).registrar(Suscripcion(
+            nombre='sub', topico='eventos', schema=object, handlers={'*': handler},
+            espera_lote_ms=10, retraso_reentrega_ms=0
+        )).iniciar()
+        broker.cliente().create_producer('eventos').send(SimpleNamespace(id='a', type='Creado'))
+
+        assert self._esperar(lambda: len(intentos) == 2)
+        runtime.detener()
+        assert intentos == [['a'], ['a']]
+
+    def test_suscripcion_por_patron(self):
+        """Test que una suscripción por patrón recibe de los tópicos existentes y de los nuevos."""
+        broker = BrokerMemoria()
+        cliente = broker.cliente()
+        cliente.create_producer('eventos-campanas')
+        recibidos = []
+        runtime = self._runtime(broker).registrar(Suscripcion(
+            nombre='sub', topico='re:eventos-.*', schema=object, espera_lote_ms=10,
+            handlers={'*': lambda entregas: recibidos.extend(e.evento.id for e in entregas)}
+        )).iniciar()
+        cliente.create_producer('eventos-campanas').send(SimpleNamespace(id=1, type='A'))
+        cliente.create_producer('eventos-tracking').send(SimpleNamespace(id=2, type='B'))
+        cliente.create_producer('otros').send(SimpleNamespace(id=3, type='C'))
+
+        assert self._esperar(lambda: len(recibidos) == 2)
+        runtime.detener()
+        assert sorted(recibidos) == [1, 2]
+
+    def test_detener_drena_confirmaciones_manuales(self):
+        """Test que al detener se ejecuta al_detener, que confirma lo que el handler dejó pendiente."""
+        broker = BrokerMemoria()
+        pendientes, recibido = [], threading.Event()
+
+        def handler(entregas):
+            pendientes.extend(entregas)
+            recibido.set()
+
+        def drenar():
+            for entrega in pendientes:
+                entrega.confirmar()
+
+        runtime = self._runtime(broker).registrar(Suscripcion(
+            nombre='sub', topico='eventos', schema=object, handlers={'*': handler},
+            espera_lote_ms=10, confirmacion_manual=True, al_detener=drenar
+        )).iniciar()
+        broker.cliente().create_producer('eventos').send(SimpleNamespace(id='a', type='A'))
+
+        assert recibido.wait(2)
+        runtime.detener()
+        assert all(entrega.resuelta for entrega in pendientes)
+        otro = broker.cliente().subscribe('eventos', 'sub', consumer_type='Shared',
+                                          batch_receive_policy=PoliticaLoteMemoria(10, 10))
+        assert otro.batch_receive() == []
+
+
+class SesionFalsa:
+    def __init__(self):
+        self.cerrada = False
+
+    def close(self):
+        self.cerrada = True
+
+
+class TestContextoTrabajo:
+    """Tests para el contexto de trabajo sin Flask."""
+
+    def test_publica_y_cierra_la_sesion(self):
+        """Test que la sesión es visible dentro del contexto y se cierra al salir."""
+        assert not en_contexto_trabajo()
+        with contexto_trabajo(SesionFalsa) as sesion:
+            assert en_contexto_trabajo() and sesion_contexto.get() is sesion
+            uow_contexto.set('uow')
+        assert sesion.cerrada and not en_contexto_trabajo() and uow_contexto.get() is None
+
+    def test_contextos_anidados_y_por_hilo(self):
+        """Test que un contexto anidado restaura el anterior y otro hilo no lo ve."""
+        vistas = []
+        with contexto_trabajo(SesionFalsa) as externa:
+            with contexto_trabajo(SesionFalsa) as interna:
+                assert sesion_contexto.get() is interna
+            assert sesion_contexto.get() is externa and not externa.cerrada
+            hilo = threading.Thread(target=lambda: vistas.append(sesion_contexto.get()))
+            hilo.start()
+            hilo.join()
+        assert vistas == [None]
+
+
+class TestReproductor:
+    """Tests para la reproducción de tópicos sobre el broker en memoria."""
+
+    def _reproductor(self, broker, directorio, **opciones):
+        return Reproductor(
+            broker.cliente(), CheckpointsReplay(str(directorio)),
+            schema_de=lambda clase: None,
+            posicion_lector=lambda datos: IdMensajeMemoria.deserialize(datos) if datos else 'earliest',
+            **opciones
+        )
+
+    def _proyeccion(self, aplicados, preparados):
+        return Proyeccion(
+            nombre='prueba',
+            fuentes=[FuenteReplay('eventos', object, {
+                'Creado': lambda eventos: aplicados.append([e.id for e in eventos])
+            })],
+            preparar=preparados.append
+        )
+
+    def test_aplica_en_lotes_y_retoma_desde_checkpoint(self, tmp_path):
+        """Test que los handlers reciben lotes de su tipo y una segunda pasada solo lee lo nuevo."""
+        broker = BrokerMemoria()
+        productor = broker.cliente().create_producer('eventos')
+        for i in range(5):
+            productor.send(SimpleNamespace(id=i, type='Creado' if i != 2 else 'Otro'))
+        aplicados, preparados = [], []
+
+        conteo = self._reproductor(broker, tmp_path, tamano_lote=2, intervalo_checkpoint=2).reproducir(
+            self._proyeccion(aplicados, preparados)
+        )
+        assert conteo == {'eventos': 5} and aplicados == [[0, 1], [3], [4]]
+
+        productor.send(SimpleNamespace(id=5, type='Creado'))
+        aplicados.clear()
+        conteo = self._reproductor(broker, tmp_path).reproducir(self._proyeccion(aplicados, preparados))
+        assert conteo == {'eventos': 1} and aplicados == [[5]]
+        assert preparados == [False, True]
+        assert CheckpointsReplay(str(tmp_path)).leer('prueba')['eventos']['eventos'] == 6
+
+    def test_desde_timestamp_y_reiniciar(self, tmp_path):
+        """Test que sin checkpoint se lee desde el timestamp indicado."""
+        broker = BrokerMemoria()
+        productor = broker.cliente().create_producer('eventos')
+        productor.send(SimpleNamespace(id='viejo', type='Creado'))
+        time.sleep(0.01)
+        corte = int(time.time() * 1000)
+        productor.send(SimpleNamespace(id='nuevo', type='Creado'))
+        aplicados = []
+
+        self._reproductor(broker, tmp_path).reproducir(self._proyeccion(aplicados, []), desde=corte)
+        assert aplicados == [['nuevo']]
+        aplicados.clear()
+        self._reproductor(broker, tmp_path).reproducir(self._proyeccion(aplicados, []), reiniciar=True)
+        assert aplicados == [['viejo', 'nuevo']]
+
+
+class TestConsumidorEventosRedis:
+    """Tests para el consumidor del bus de eventos sobre Redis Streams."""
+
+    TOPICO = 'topico-test'
+
+    @pytest.fixture
+    def eventos(self):
+        return pytest.importorskip('src.alpes_partners.seedwork.infraestructura.eventos')
+
+    @pytest.fixture
+    def crear(self, eventos):
+        fakeredis = pytest.importorskip('fakeredis')
+        servidor = fakeredis.FakeServer()
+
+        def crear(**opciones):
+            consumidor = eventos.ConsumidorEventosRedis(
+                'redis://localhost', 'grupo-test', consumidor='consumidor-1', bloqueo_ms=10, **opciones
+            )
+            consumidor.redis_client = fakeredis.aioredis.FakeRedis(server=servidor, decode_responses=True)
+            return consumidor
+        return crear
+
+    async def _preparar(self, consumidor, handler, *mensajes):
+        await consumidor.suscribirse(self.TOPICO, handler)
+        await consumidor._asegurar_grupos()
+        for mensaje in mensajes:
+            await consumidor.redis_client.xadd(self.TOPICO, {'datos': json.dumps(mensaje)})
+
+    async def _pendientes(self, consumidor) -> int:
+        return (await consumidor.redis_client.xpending(self.TOPICO, 'grupo-test'))['pending']
+
+    def test_crea_grupo_y_confirma_exitosos(self, crear):
+        """Test que el grupo se crea una vez y las entradas procesadas se confirman."""
+        recibidos = []
+        consumidor = crear()
+
+        async def handler(datos):
+            recibidos.append(datos)
+
+        async def escenario():
+            await self._preparar(consumidor, handler, {'n': 1}, {'n': 2})
+            # Volver a crear el grupo (BUSYGROUP) no falla
+            await consumidor._asegurar_grupos()
+            confirmadas = await consumidor._procesar(await consumidor._leer('>'))
+            return confirmadas, await self._pendientes(consumidor)
+
+        assert asyncio.run(escenario()) == (2, 0)
+        assert recibidos == [{'n': 1}, {'n': 2}]
+
+    def test_fallo_queda_pendiente(self, crear):
+        """Test que una entrada cuyo handler falla no se confirma."""
+        consumidor = crear()
+
+        async def handler(datos):
+            raise RuntimeError("falla")
+
+        async def escenario():
+            await self._preparar(consumidor, handler, {'n': 1})
+            confirmadas = await consumidor._procesar(await consumidor._leer('>'))
+            return confirmadas, await self._pendientes(consumidor)
+
+        assert asyncio.run(escenario()) == (0, 1)
+
+    def test_pasa_a_dlq_tras_max_entregas(self, crear):
+        """Test que una entrada que agota sus entregas se mueve a <topico>:dlq y se confirma."""
+        consumidor = crear(max_entregas=2, reclamar_tras_ms=0)
+
+        async def handler(datos):
+            raise RuntimeError("falla")
+
+        async def escenario():
+            await self._preparar(consumidor, handler, {'n': 1})
+            await consumidor._procesar(await consumidor._leer('>'))   # entrega 1
+            await consumidor.reclamar_pendientes()                      # entrega 2 (reclamada)
+            await consumidor.reclamar_pendientes()                      # agotada: a la DLQ
+            dlq = await consumidor.redis_client.xrange(f"{self.TOPICO}:dlq")
+            return dlq, await self._pendientes(consumidor)
+
+        dlq, pendientes = asyncio.run(escenario())
+        assert pendientes == 0
+        assert len(dlq) == 1
+        assert json.loads(dlq[0][1]['datos']) == {'n': 1}
+        assert 'id_original' in dlq[0][1]
+
+    def test_sigue_consumiendo_tras_error_de_conexion(self, crear, eventos):
+        """Test que un ConnectionError al leer no termina el consumo: reintenta y procesa."""
+        recibidos = []
+        consumidor = crear(espera_reconexion_s=0)
+        leer = consumidor._leer
+        lecturas = []
+
+        async def handler(datos):
+            recibidos.append(datos)
+
+        async def leer_con_caida(desde):
+            if desde == '>':
+                lecturas.append(desde)
+                if len(lecturas) == 1:
+                    raise eventos.ErrorConexionRedis("Redis caído")
+                consumidor.detener()
+            return await leer(desde)
+
+        async def escenario():
+            await self._preparar(consumidor, handler, {'n': 1})
+            consumidor._leer = leer_con_caida
+            await asyncio.wait_for(consumidor.iniciar_consumo(), timeout=5)
+            return await self._pendientes(consumidor)
+
+        assert asyncio.run(escenario()) == 0
+        assert recibidos == [{'n': 1}]
+        assert len(lecturas) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])